@@ -0,0 +1,159 @@
+# Utils/glb.py
+import json
+import struct
+
+# GLB(바이너리 glTF 2.0) 컨테이너: 12바이트 헤더 + JSON 청크 + (선택) BIN 청크
+# BIN 청크와 bufferView는 memoryview로 다루므로 파싱 시 데이터를 복사하지 않는다.
+
+GLB_MAGIC = 0x46546C67        # b"glTF"
+CHUNK_JSON = 0x4E4F534A       # b"JSON"
+CHUNK_BIN = 0x004E4942        # b"BIN\0"
+
+_HEADER = struct.Struct("<III")
+_CHUNK_HEADER = struct.Struct("<II")
+
+
+class GLB:
+    """파싱된 GLB (json: glTF dict, bin: BIN 청크 memoryview 또는 None)"""
+
+    __slots__ = ("json", "bin")
+
+    def __init__(self, gltf: dict, bin_chunk: memoryview = None):
+        self.json = gltf
+        self.bin = bin_chunk
+
+    def buffer_view(self, index: int) -> memoryview:
+        """bufferView 데이터 (BIN 청크의 memoryview 슬라이스, 복사 없음)"""
+        view = self.json["bufferViews"][index]
+        if view.get("buffer", 0) != 0 or self.bin is None:
+            raise ValueError(f"bufferView {index}는 GLB BIN 청크를 가리키지 않습니다.")
+        start = view.get("byteOffset", 0)
+        return self.bin[start:start + view["byteLength"]]
+
+
+def read_glb(data) -> GLB:
+    """GLB 바이트 → GLB (data는 bytes/bytearray/memoryview/mmap)"""
+    buffer = memoryview(data)
+    if len(buffer) < _HEADER.size:
+        raise ValueError("GLB 헤더가 너무 짧습니다.")
+    magic, version, length = _HEADER.unpack_from(buffer, 0)
+    if magic != GLB_MAGIC:
+        raise ValueError("GLB 파일이 아닙니다.")
+    if version != 2:
+        raise ValueError(f"지원하지 않는 GLB 버전: {version}")
+    length = min(length, len(buffer))
+
+    gltf, bin_chunk = None, None
+    offset = _HEADER.size
+    while offset + _CHUNK_HEADER.size <= length:
+        chunk_length, chunk_type = _CHUNK_HEADER.unpack_from(buffer, offset)
+        offset += _CHUNK_HEADER.size
+        chunk = buffer[offset:offset + chunk_length]
+        if chunk_type == CHUNK_JSON and gltf is None:
+            gltf = json.loads(bytes(chunk).decode("utf-8"))
+        elif chunk_type == CHUNK_BIN and bin_chunk is None:
+            bin_chunk = chunk
+        offset += chunk_length + (-chunk_length % 4)
+
+    if gltf is None:
+        raise ValueError("GLB에 JSON 청크가 없습니다.")
+    return GLB(gltf, bin_chunk)
+
+
+def write_glb(gltf: dict, bin_chunk=None) -> bytes:
+    """glTF dict + BIN 데이터 → GLB 바이트"""
+    json_bytes = json.dumps(gltf, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    json_bytes += b" " * (-len(json_bytes) % 4)
+
+    parts = [None, _CHUNK_HEADER.pack(len(json_bytes), CHUNK_JSON), json_bytes]
+    if bin_chunk is not None and len(bin_chunk):
+        padding = -len(bin_chunk) % 4
+        parts += [_CHUNK_HEADER.pack(len(bin_chunk) + padding, CHUNK_BIN), bin_chunk, b"\0" * padding]
+
+    total = _HEADER.size + sum(len(part) for part in parts[1:])
+    parts[0] = _HEADER.pack(GLB_MAGIC, 2, total)
+    return b"".join(parts)
+
+
+def _buffer_view_refs(node, refs: list):
+    """JSON 트리에서 "bufferView" 참조를 가진 dict 수집 (accessor, image, 확장 포함)"""
+    if isinstance(node, dict):
+        if isinstance(node.get("bufferView"), int):
+            refs.append(node)
+        for key, value in node.items():
+            if key != "bufferViews":
+                _buffer_view_refs(value, refs)
+    elif isinstance(node, list):
+        for value in node:
+            _buffer_view_refs(value, refs)
+
+
+def repack(glb: GLB, replacements: dict = None, alignment: int = 4, gltf: dict = None):
+    """
+    사용 중인 bufferView만 새 BIN 버퍼로 다시 배치
+
+    Args:
+        replacements: {bufferView index: 새 데이터} (예: 재인코딩한 텍스처)
+                      gltf에 새로 추가한 bufferView의 데이터도 여기로 전달
+        gltf: 수정한 glTF dict (None이면 glb.json 사본, 전달하면 직접 수정됨)
+
+    Returns:
+        (새 glTF dict, 새 BIN bytearray)
+        참조되지 않는 bufferView는 제거되고 인덱스가 다시 매겨진다.
+    """
+    replacements = replacements or {}
+    if gltf is None:
+        gltf = json.loads(json.dumps(glb.json))
+    buffers = gltf.get("buffers", [])
+    if len(buffers) > 1 or (buffers and "uri" in buffers[0]):
+        raise ValueError("외부 버퍼를 사용하는 GLB는 다시 배치할 수 없습니다.")
+
+    refs = []
+    _buffer_view_refs({k: v for k, v in gltf.items() if k != "bufferViews"}, refs)
+    used = sorted({ref["bufferView"] for ref in refs})
+
+    old_views = gltf.get("bufferViews", [])
+    new_views, remap = [], {}
+    out = bytearray()
+    for old_index in used:
+        view = dict(old_views[old_index])
+        data = replacements.get(old_index)
+        if data is None:
+            data = glb.buffer_view(old_index)
+        out += b"\0" * (-len(out) % alignment)
+        view["buffer"] = 0
+        view["byteOffset"] = len(out)
+        view["byteLength"] = len(data)
+        out += data
+        remap[old_index] = len(new_views)
+        new_views.append(view)
+
+    for ref in refs:
+        ref["bufferView"] = remap[ref["bufferView"]]
+
+    if new_views:
+        gltf["bufferViews"] = new_views
+        gltf["buffers"] = [{"byteLength": len(out)}]
+    else:
+        gltf.pop("bufferViews", None)
+        gltf.pop("buffers", None)
+    return gltf, out
+
+
+def base_color_image(glb: GLB):
+    """
+    첫 번째 머티리얼의 baseColor 텍스처 이미지 (GLB에 임베드된 경우)
+
+    Returns:
+        (memoryview, mimeType) 또는 None
+    """
+    gltf = glb.json
+    for material in gltf.get("materials", []):
+        info = material.get("pbrMetallicRoughness", {}).get("baseColorTexture")
+        if not info:
+            continue
+        texture = gltf.get("textures", [])[info["index"]]
+        image = gltf.get("images", [])[texture["source"]]
+        if "bufferView" in image:
+            return glb.buffer_view(image["bufferView"]), image.get("mimeType")
+    return None
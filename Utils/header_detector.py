@@ -0,0 +1,151 @@
+# Utils/header_detector.py
+import math
+
+import numpy as np
+from PIL import Image
+
+# 분석용 축소 크기 (헤더 축 방향 픽셀 수)
+_ANALYSIS_SIZE = 400
+
+
+def _ink_profile(img: Image.Image, orientation: str) -> np.ndarray:
+    """
+    헤더 축(세로 이미지는 행, 가로 이미지는 열)별 잉크 비율 프로파일 계산
+
+    Returns:
+        0~1 범위의 1차원 배열 (index 0 = 헤더 쪽 가장자리)
+    """
+    gray = img.convert("L")
+    scale = _ANALYSIS_SIZE / max(gray.size)
+    if scale < 1:
+        gray = gray.resize(
+            (max(1, round(gray.size[0] * scale)), max(1, round(gray.size[1] * scale))),
+            Image.Resampling.BILINEAR,
+        )
+
+    pixels = np.asarray(gray, dtype=np.float32)
+    if orientation == "landscape":
+        pixels = pixels.T  # 좌측 헤더 → 상단 헤더로 취급
+
+    # 종이 밝기를 기준으로 어두운 픽셀(잉크) 판정 (조명 차이 보정)
+    background = np.percentile(pixels, 90)
+    ink = pixels < background * 0.6
+    return ink.mean(axis=1)
+
+
+def _smooth(profile: np.ndarray, window: int) -> np.ndarray:
+    if window <= 1:
+        return profile
+    kernel = np.ones(window, dtype=np.float32) / window
+    return np.convolve(profile, kernel, mode="same")
+
+
+def detect_header_boundary(
+    img: Image.Image,
+    orientation: str = "auto",
+    min_ratio: float = 0.05,
+    max_ratio: float = 0.35,
+    fallback_ratio: float = 0.15,
+    line_threshold: float = 0.45,
+    text_threshold: float = 0.02,
+    blank_threshold: float = 0.005,
+    min_gap_ratio: float = 0.01,
+) -> dict:
+    """
+    행 투영(row-projection) 프로파일로 손글씨 헤더와 그림 사이의 경계를 찾는다.
+
+    1. 폭 대부분을 가로지르는 인쇄 구분선이 있으면 그 아래를 경계로 사용
+    2. 없으면 글씨 띠(text band) 다음에 오는 첫 빈 여백의 중간을 경계로 사용
+    3. 둘 다 없으면 고정 비율(fallback_ratio)로 폴백
+
+    Args:
+        img: 회전이 끝난 이미지 (크기 무관, 내부에서 축소 후 분석)
+        orientation: "auto", "portrait" (상단 헤더), "landscape" (좌측 헤더)
+
+    Returns:
+        {"orientation": ..., "ratio": 경계 위치 비율, "method": "line" | "gap" | "fallback"}
+    """
+    width, height = img.size
+    if orientation == "auto":
+        orientation = "landscape" if width > height else "portrait"
+
+    profile = _ink_profile(img, orientation)
+    length = len(profile)
+    lo = max(1, int(length * min_ratio))
+    hi = min(length - 1, int(length * max_ratio))
+
+    result = {"orientation": orientation, "ratio": fallback_ratio, "method": "fallback"}
+    if hi <= lo:
+        return result
+
+    # 1️⃣ 인쇄 구분선: 잉크 비율이 매우 높은 행
+    line_rows = np.nonzero(profile[lo:hi] >= line_threshold)[0]
+    if line_rows.size:
+        row = lo + int(line_rows[0])
+        # 선 두께만큼 아래로 이동
+        while row + 1 < hi and profile[row + 1] >= line_threshold:
+            row += 1
+        result.update(ratio=(row + 1) / length, method="line")
+        return result
+
+    # 2️⃣ 글씨 띠 다음의 빈 여백
+    smoothed = _smooth(profile, max(1, length // 100))
+    min_gap = max(2, int(length * min_gap_ratio))
+    seen_text = bool((smoothed[:lo] > text_threshold).any())
+    gap_start = None
+    for row in range(lo, hi):
+        value = smoothed[row]
+        if value > text_threshold:
+            seen_text = True
+            gap_start = None
+        elif value < blank_threshold and seen_text:
+            if gap_start is None:
+                gap_start = row
+            elif row - gap_start + 1 >= min_gap:
+                # 여백이 끝나는 지점까지 확장 후 중간을 경계로 사용
+                gap_end = row
+                while gap_end + 1 < hi and smoothed[gap_end + 1] < blank_threshold:
+                    gap_end += 1
+                result.update(ratio=((gap_start + gap_end) / 2) / length, method="gap")
+                return result
+        else:
+            gap_start = None
+
+    return result
+
+
+def vision_tokens(size: tuple, detail: str = "high") -> int:
+    """OpenAI 비전 입력 토큰 수 추정 (512px 타일 기준)"""
+    if detail == "low":
+        return 85
+    width, height = size
+    # 2048 박스에 맞춘 뒤 짧은 변을 768로 축소 (확대는 하지 않음)
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    tiles = math.ceil(width / 512) * math.ceil(height / 512)
+    return 85 + 170 * tiles
+
+
+def fit_to_token_budget(size: tuple, budget: int, detail: str = "high") -> tuple:
+    """
+    토큰 예산 안에 들어오도록 축소한 크기 반환
+
+    OpenAI가 서버에서 어차피 줄이는 해상도 이상은 보내지 않으므로
+    업로드 크기와 토큰 수를 함께 줄인다.
+    """
+    width, height = size
+    if detail == "low":
+        scale = min(1.0, 512 / max(width, height))
+        return max(1, round(width * scale)), max(1, round(height * scale))
+
+    # 서버 측 축소 규칙과 같은 상한 먼저 적용
+    scale = min(1.0, 2048 / max(width, height))
+    if min(width, height) * scale > 768:
+        scale = 768 / min(width, height)
+    width, height = max(1, round(width * scale)), max(1, round(height * scale))
+
+    while vision_tokens((width, height), detail) > budget and max(width, height) > 64:
+        width, height = max(1, round(width * 0.9)), max(1, round(height * 0.9))
+    return width, height
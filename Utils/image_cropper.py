@@ -1,11 +1,12 @@
 # backend/utils/image_cropper.py
-from PIL import Image
-from io import BytesIO
+from Utils.image_pipeline import ImageTransform
 
 def crop_top_section(image_bytes: bytes, ratio: float = 0.15, orientation: str = "auto", rotate_cw: int = 90) -> bytes:
     """
     이미지를 처리하는 함수 (회전 → 크로핑)
 
+    여러 출력을 한 번의 디코드로 만들어야 하면 Utils.image_pipeline.ImageTransform을 직접 사용.
+
     Args:
         image_bytes: 원본 이미지 (bytes)
         ratio: 잘라낼 비율 (기본값 0.15 = 상단 15% 제거)
@@ -15,14 +16,14 @@ def crop_top_section(image_bytes: bytes, ratio: float = 0.15, orientation: str =
     Returns:
         bytes: 처리된 이미지 (JPEG)
     """
-    img = Image.open(BytesIO(image_bytes))
+    transform = ImageTransform(image_bytes)
 
-    # 1️⃣ 시계방향으로 회전 (카메라가 가로로 찍은 이미지를 세로로)
+    # 1️⃣ 시계방향으로 회전 (카메라가 가로로 찍은 이미지를 세로로, 90도 단위는 무손실 transpose)
     if rotate_cw != 0:
         print(f"[ImageCropper] 🔄 이미지를 시계방향 {rotate_cw}도 회전 중...")
-        img = img.rotate(-rotate_cw, expand=True)  # PIL은 반시계방향이므로 음수
+        transform = transform.rotate_cw(rotate_cw)
 
-    width, height = img.size
+    width, height = transform.size
 
     # 2️⃣ 방향 자동 감지
     if orientation == "auto":
@@ -33,36 +34,14 @@ def crop_top_section(image_bytes: bytes, ratio: float = 0.15, orientation: str =
     print(f"[ImageCropper] 📍 감지된 방향: {orientation}")
     print(f"[ImageCropper] ✂️ 자르기 비율: {ratio * 100:.1f}%")
 
-    if orientation == "landscape":
-        # 가로 방향: 좌측 자르기
-        pixels_to_cut = int(width * ratio)
-        pixels_to_cut = min(pixels_to_cut, int(width * 0.5))  # 최대 50% 제한
-
-        print(f"[ImageCropper] 🔪 가로 모드 - 좌측 {pixels_to_cut}px ({ratio * 100:.1f}%) 제거")
-        cropped_img = img.crop((pixels_to_cut, 0, width, height))
-
-    else:
-        # 세로 방향: 상단 자르기
-        pixels_to_cut = int(height * ratio)
-        pixels_to_cut = min(pixels_to_cut, int(height * 0.5))  # 최대 50% 제한
-
-        print(f"[ImageCropper] 🔪 세로 모드 - 상단 {pixels_to_cut}px ({ratio * 100:.1f}%) 제거")
-        cropped_img = img.crop((0, pixels_to_cut, width, height))
+    cropped = transform.crop_top(ratio=ratio, orientation=orientation)
 
     # 결과 크기 출력
-    new_width, new_height = cropped_img.size
+    new_width, new_height = cropped.size
     print(f"[ImageCropper] ✅ 결과 크기: {new_width}x{new_height}px")
 
-    # RGBA → RGB 변환 (PNG는 RGBA, JPEG는 RGB만 지원)
-    if cropped_img.mode in ('RGBA', 'LA', 'P'):
-        rgb_img = Image.new('RGB', cropped_img.size, (255, 255, 255))
-        rgb_img.paste(cropped_img, mask=cropped_img.split()[-1] if cropped_img.mode == 'RGBA' else None)
-        cropped_img = rgb_img
-
-    # JPEG로 저장
-    output = BytesIO()
-    cropped_img.save(output, format="JPEG", quality=95)
-    return output.getvalue()
+    # JPEG로 저장 (RGBA → RGB 변환 포함)
+    return cropped.encode("JPEG", quality=95)
 
 
 # 사용 예시
@@ -0,0 +1,68 @@
+# Utils/image_hash.py
+import numpy as np
+from PIL import Image
+
+_DCT_SIZE = 32
+_HASH_SIZE = 8
+_COLOR_GRID = 4
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """DCT-II 직교 행렬 (scipy 없이 행렬곱으로 2D DCT 계산)"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def phash(img: Image.Image) -> int:
+    """
+    64비트 perceptual hash (pHash)
+
+    32x32 그레이스케일의 저주파 8x8 DCT 계수를 중앙값으로 이진화.
+    재촬영/밝기 변화/약한 흔들림에는 거의 같은 값이 나오고,
+    다른 그림끼리는 해밍 거리가 크게 벌어진다.
+    """
+    gray = img.convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.Resampling.LANCZOS)
+    pixels = np.asarray(gray, dtype=np.float64)
+    coeffs = _DCT @ pixels @ _DCT.T
+    low = coeffs[:_HASH_SIZE, :_HASH_SIZE].flatten()
+    bits = low > np.median(low[1:])  # DC 성분은 기준값 계산에서 제외
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def color_signature(img: Image.Image) -> bytes:
+    """
+    4x4 격자별 평균 색차(Cb, Cr) 32바이트
+
+    pHash는 그레이스케일이라 같은 밑그림을 다른 색으로 칠한 그림을 구별하지 못하므로
+    근접 중복 판단 시 함께 비교한다. 밝기 변화에는 거의 영향을 받지 않는다.
+    """
+    small = img.convert("YCbCr").resize((_COLOR_GRID, _COLOR_GRID), Image.Resampling.BOX)
+    return np.asarray(small, dtype=np.uint8)[..., 1:].tobytes()
+
+
+def color_distance(a: bytes, b: bytes) -> int:
+    """두 색 시그니처의 격자별 색차 최대 차이 (0-255)"""
+    diff = np.abs(np.frombuffer(a, dtype=np.uint8).astype(np.int16) - np.frombuffer(b, dtype=np.uint8))
+    return int(diff.max())
+
+
+def hamming(a: int, b: int) -> int:
+    """두 해시의 해밍 거리"""
+    return (a ^ b).bit_count()
+
+
+def to_hex(value: int) -> str:
+    return f"{value:016x}"
+
+
+def from_hex(text: str) -> int:
+    return int(text, 16)
@@ -0,0 +1,240 @@
+# Utils/image_pipeline.py
+import base64
+import math
+from io import BytesIO
+
+from PIL import Image
+
+# 90도 단위 회전은 픽셀 보간 없이 transpose로 처리 (무손실 + 빠름)
+_CW_TRANSPOSE = {
+    90: Image.Transpose.ROTATE_270,   # PIL 기준 반시계 270 = 시계 90
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_90,
+}
+
+
+class _DecodedSource:
+    """원본 이미지를 한 번만 디코드하고, 변환 결과를 ops 단위로 캐시"""
+
+    def __init__(self, image_bytes: bytes = None, max_decode_side: int = None, image: Image.Image = None):
+        self.image_bytes = image_bytes
+        if image is not None:
+            # 이미 메모리에 있는 이미지 (디코드 불필요)
+            self.image = image
+            self.format = None
+            self.original_size = image.size
+            self.cache = {}
+            self.decoded = True
+            return
+
+        self.image = Image.open(BytesIO(image_bytes))  # 헤더만 읽음 (디코드는 load 시점)
+        self.format = self.image.format
+        self.original_size = self.image.size
+
+        # JPEG는 draft 모드로 DCT 단계에서 1/2, 1/4, 1/8 축소 디코드 가능
+        if max_decode_side and self.format == "JPEG" and max(self.image.size) > max_decode_side:
+            scale = max_decode_side / max(self.image.size)
+            requested = (
+                math.ceil(self.image.size[0] * scale),
+                math.ceil(self.image.size[1] * scale),
+            )
+            self.image.draft(self.image.mode, requested)
+            print(f"[ImagePipeline] 📉 JPEG draft 디코드: {self.original_size} → {self.image.size}")
+
+        self.cache = {}  # {ops tuple: PIL.Image}
+        self.decoded = False
+
+    def base(self) -> Image.Image:
+        if not self.decoded:
+            self.image.load()
+            self.decoded = True
+        return self.image
+
+
+class ImageTransform:
+    """
+    한 번 디코드한 이미지 위에 회전/크롭/색변환을 지연 적용하는 변환 파이프라인.
+
+    각 메서드는 원본을 공유하는 새 ImageTransform을 반환하며, 실제 픽셀 연산은
+    render()/encode() 시점에 수행된다. 공통 prefix(예: 회전)의 결과는 캐시되므로
+    같은 원본에서 Vision 입력과 Tripo 업로드 이미지를 각각 만들어도 디코드와
+    회전은 한 번만 일어난다.
+
+    사용 예:
+        oriented = ImageTransform(image_bytes).rotate_cw(90)
+        vision_b64 = oriented.to_base64("JPEG", quality=85)
+        upload_bytes = oriented.crop_top(0.15).encode("PNG")
+    """
+
+    def __init__(self, image_bytes: bytes = None, max_decode_side: int = None, _source=None, _ops=()):
+        self._source = _source or _DecodedSource(image_bytes, max_decode_side)
+        self._ops = _ops
+
+    @classmethod
+    def from_image(cls, image: Image.Image) -> "ImageTransform":
+        """이미 디코드된 PIL 이미지에서 시작"""
+        return cls(_source=_DecodedSource(image=image))
+
+    def _with(self, op: tuple) -> "ImageTransform":
+        return ImageTransform(_source=self._source, _ops=self._ops + (op,))
+
+    # ----------------------------------------------------
+    # 지연 연산
+    # ----------------------------------------------------
+    def rotate_cw(self, degrees: int) -> "ImageTransform":
+        """시계방향 회전 (90도 단위는 transpose 빠른 경로)"""
+        degrees = degrees % 360
+        if degrees == 0:
+            return self
+        return self._with(("rotate", degrees))
+
+    def crop(self, box: tuple) -> "ImageTransform":
+        """(left, top, right, bottom) 영역 크롭"""
+        return self._with(("crop", tuple(int(v) for v in box)))
+
+    def crop_top(self, ratio: float = 0.15, orientation: str = "auto", pixels: int = None) -> "ImageTransform":
+        """
+        상단(세로 이미지) 또는 좌측(가로 이미지) 헤더 영역 제거 (crop_top_section과 동일 규칙)
+
+        Args:
+            ratio: 잘라낼 비율 (pixels가 없을 때 사용)
+            orientation: "auto", "portrait", "landscape"
+            pixels: 잘라낼 픽셀 수 (지정 시 ratio 무시)
+        """
+        width, height = self.size
+        if orientation == "auto":
+            orientation = "landscape" if width > height else "portrait"
+
+        length = width if orientation == "landscape" else height
+        pixels_to_cut = int(length * ratio) if pixels is None else int(pixels)
+        pixels_to_cut = max(0, min(pixels_to_cut, int(length * 0.5)))  # 최대 50% 제한
+
+        if orientation == "landscape":
+            return self.crop((pixels_to_cut, 0, width, height))
+        return self.crop((0, pixels_to_cut, width, height))
+
+    def convert(self, mode: str = "RGB") -> "ImageTransform":
+        """색 공간 변환 (이미 같은 모드면 생략, 알파는 흰 배경으로 합성)"""
+        if self.mode == mode:
+            return self
+        return self._with(("convert", mode))
+
+    def resize_to_fit(self, max_side: int) -> "ImageTransform":
+        """긴 변이 max_side를 넘지 않도록 축소 (확대하지 않음)"""
+        if not max_side or max(self.size) <= max_side:
+            return self
+        return self._with(("fit", int(max_side)))
+
+    def resize(self, size: tuple) -> "ImageTransform":
+        """지정 크기로 리사이즈"""
+        size = (int(size[0]), int(size[1]))
+        if size == self.size:
+            return self
+        return self._with(("resize", size))
+
+    # ----------------------------------------------------
+    # 메타데이터 (디코드 없이 계산)
+    # ----------------------------------------------------
+    @property
+    def size(self) -> tuple:
+        width, height = self._source.image.size
+        for op in self._ops:
+            kind = op[0]
+            if kind == "rotate":
+                if op[1] in (90, 270):
+                    width, height = height, width
+                elif op[1] != 180:
+                    return self.render().size  # 임의 각도는 실제 계산
+            elif kind == "crop":
+                left, top, right, bottom = op[1]
+                width, height = right - left, bottom - top
+            elif kind == "fit":
+                width, height = _fit_size((width, height), op[1])
+            elif kind == "resize":
+                width, height = op[1]
+        return width, height
+
+    @property
+    def mode(self) -> str:
+        mode = self._source.image.mode
+        for op in self._ops:
+            if op[0] == "convert":
+                mode = op[1]
+        return mode
+
+    @property
+    def source_format(self) -> str:
+        return self._source.format
+
+    # ----------------------------------------------------
+    # 실행
+    # ----------------------------------------------------
+    def render(self) -> Image.Image:
+        """연산을 적용한 PIL 이미지 반환 (공통 prefix 결과 재사용)"""
+        cache = self._source.cache
+        if self._ops in cache:
+            return cache[self._ops]
+
+        # 캐시된 가장 긴 prefix부터 이어서 계산
+        start = 0
+        img = None
+        for i in range(len(self._ops) - 1, 0, -1):
+            if self._ops[:i] in cache:
+                start, img = i, cache[self._ops[:i]]
+                break
+        if img is None:
+            img = self._source.base()
+
+        for i in range(start, len(self._ops)):
+            img = _apply(img, self._ops[i])
+            cache[self._ops[:i + 1]] = img
+        return img
+
+    def encode(self, fmt: str = "JPEG", **params) -> bytes:
+        """지정 포맷으로 인코딩 (JPEG는 RGB로 자동 변환)"""
+        target = self.convert("RGB") if fmt.upper() in ("JPEG", "JPG") else self
+        output = BytesIO()
+        target.render().save(output, format=fmt, **params)
+        return output.getvalue()
+
+    def to_base64(self, fmt: str = "JPEG", **params) -> str:
+        return base64.b64encode(self.encode(fmt, **params)).decode("utf-8")
+
+
+def _fit_size(size: tuple, max_side: int) -> tuple:
+    width, height = size
+    scale = max_side / max(width, height)
+    if scale >= 1:
+        return width, height
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _flatten_to_rgb(img: Image.Image) -> Image.Image:
+    """RGBA/LA/P → RGB (투명 영역은 흰 배경)"""
+    if img.mode == "P":
+        img = img.convert("RGBA")
+    if img.mode in ("RGBA", "LA"):
+        rgb_img = Image.new("RGB", img.size, (255, 255, 255))
+        rgb_img.paste(img, mask=img.split()[-1])
+        return rgb_img
+    return img.convert("RGB")
+
+
+def _apply(img: Image.Image, op: tuple) -> Image.Image:
+    kind = op[0]
+    if kind == "rotate":
+        transpose = _CW_TRANSPOSE.get(op[1])
+        if transpose is not None:
+            return img.transpose(transpose)
+        return img.rotate(-op[1], expand=True)  # PIL은 반시계방향이므로 음수
+    if kind == "crop":
+        return img.crop(op[1])
+    if kind == "convert":
+        if op[1] == "RGB":
+            return _flatten_to_rgb(img)
+        return img.convert(op[1])
+    if kind == "fit":
+        return img.resize(_fit_size(img.size, op[1]), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    if kind == "resize":
+        return img.resize(op[1], Image.Resampling.LANCZOS, reducing_gap=2.0)
+    raise ValueError(f"알 수 없는 연산: {kind}")
@@ -0,0 +1,260 @@
+# backend/dedup_index.py
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+from Utils.image_hash import hamming, color_distance, to_hex, from_hex
+
+DEDUP_INDEX_PATH = os.getenv(
+    "DEDUP_INDEX_PATH",
+    os.path.join(os.path.dirname(__file__), "../data/cache/dedup_index.sqlite3"),
+)
+# 그림 영역 pHash 해밍 거리 임계값 (재촬영 시 흔들림/밝기 변화로 6 안팎까지 벌어짐)
+DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "8"))
+# 그림 영역 격자별 색차 최대 차이 (pHash는 그레이스케일이라 색만 다른 그림은 이것으로 구별)
+DEDUP_COLOR_MAX_DIFF = int(os.getenv("DEDUP_COLOR_MAX_DIFF", "8"))
+# Tripo image_token 재사용 유효 시간 (초)
+DEDUP_TOKEN_TTL = float(os.getenv("DEDUP_TOKEN_TTL", str(12 * 3600)))
+# 완료된 Tripo task 재사용 유효 시간 (초)
+DEDUP_TASK_TTL = float(os.getenv("DEDUP_TASK_TTL", str(7 * 24 * 3600)))
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def capture_name(vision: dict) -> str:
+    """Vision 결과의 도안명·이름 비교 키 (이름을 읽지 못했으면 None)"""
+    design = (vision.get("design") or "").strip().lower()
+    child_name = (vision.get("child_name") or "").strip().lower()
+    if not child_name or child_name == "unknown":
+        return None
+    return f"{design}|{child_name}"
+
+
+class BKTree:
+    """해밍 거리 기반 BK-tree (근접 해시 검색을 전수 비교 없이 수행)"""
+
+    __slots__ = ("_root", "size")
+
+    def __init__(self):
+        self._root = None  # [key, [values], {distance: child}]
+        self.size = 0
+
+    def add(self, key: int, value):
+        self.size += 1
+        if self._root is None:
+            self._root = [key, [value], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(key, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [key, [value], {}]
+                return
+            node = child
+
+    def search(self, key: int, max_distance: int) -> list:
+        """max_distance 이내의 (distance, key, value) 목록 (가까운 순)"""
+        found = []
+        if self._root is None:
+            return found
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(key, node[0])
+            if distance <= max_distance:
+                found.extend((distance, node[0], value) for value in node[1])
+            # 삼각 부등식: |d - max| ~ d + max 범위의 자식만 탐색
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        found.sort(key=lambda item: item[0])
+        return found
+
+
+class CaptureIndex:
+    """
+    처리한 캡처의 content-addressed 인덱스
+
+    - 정확히 같은 업로드 이미지 (SHA-256) → 이미 받은 Tripo image_token
+    - 거의 같은 그림 (그림 영역 pHash + 색 시그니처, 같은 도안명·이름) → 기존 Tripo task
+      (진행 중이면 그 task에 합류, 완료됐으면 모델 URL 재사용)
+
+    헤더 이미지 해시로는 이름이 다른 아이를 구별할 수 없어서, 이름은 Vision 결과를
+    정확히 비교한다. 이름을 읽지 못한 캡처는 재사용하지도, 재사용 대상이 되지도 않는다.
+
+    SQLite에 저장해 재시작 후에도 유지하고, 시작 시 BK-tree를 다시 만든다.
+    """
+
+    def __init__(
+        self,
+        path: str = DEDUP_INDEX_PATH,
+        max_distance: int = DEDUP_MAX_DISTANCE,
+        color_max_diff: int = DEDUP_COLOR_MAX_DIFF,
+        token_ttl: float = DEDUP_TOKEN_TTL,
+        task_ttl: float = DEDUP_TASK_TTL,
+    ):
+        self.path = path
+        self.max_distance = max_distance
+        self.color_max_diff = color_max_diff
+        self.token_ttl = token_ttl
+        self.task_ttl = task_ttl
+
+        self._uploads = {}  # {sha256: {"image_token", "created_at"}}
+        self._tasks = {}    # {tripo_task_id: {"drawing_hash", "color", "name", "status", "model_url", "created_at"}}
+        self._tree = BKTree()
+        self._lock = threading.Lock()
+        self._db = None
+
+        self.exact_hits = 0
+        self.near_hits = 0
+
+    def open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS uploads ("
+            " sha256 TEXT PRIMARY KEY, image_token TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(tasks)")}
+        if columns and "name" not in columns:
+            # 이전 형식(헤더 pHash)은 이름을 구별하지 못하므로 버림 (캐시 성격의 인덱스)
+            self._db.execute("DROP TABLE tasks")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " tripo_task_id TEXT PRIMARY KEY, drawing_hash TEXT NOT NULL, color TEXT NOT NULL, name TEXT NOT NULL,"
+            " status TEXT NOT NULL, model_url TEXT, created_at REAL NOT NULL)"
+        )
+        now = time.time()
+        self._db.execute("DELETE FROM uploads WHERE created_at < ?", (now - self.token_ttl,))
+        self._db.execute("DELETE FROM tasks WHERE created_at < ? OR status = 'failed'", (now - self.task_ttl,))
+        self._db.commit()
+
+        with self._lock:
+            for sha, token, created_at in self._db.execute("SELECT sha256, image_token, created_at FROM uploads"):
+                self._uploads[sha] = {"image_token": token, "created_at": created_at}
+            rows = self._db.execute(
+                "SELECT tripo_task_id, drawing_hash, color, name, status, model_url, created_at FROM tasks"
+            ).fetchall()
+            for tripo_task_id, drawing_hash, color, name, status, model_url, created_at in rows:
+                self._add_task(tripo_task_id, from_hex(drawing_hash), bytes.fromhex(color), name,
+                               status, model_url, created_at)
+        print(f"[DedupIndex] ✅ 인덱스 로드: 업로드 {len(self._uploads)}개, Tripo task {len(self._tasks)}개")
+
+    def close(self):
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+                self._db = None
+
+    def _execute(self, sql: str, params: tuple):
+        if self._db is not None:
+            self._db.execute(sql, params)
+            self._db.commit()
+
+    def _add_task(self, tripo_task_id, drawing_hash, color, name, status, model_url, created_at):
+        self._tasks[tripo_task_id] = {
+            "drawing_hash": drawing_hash,
+            "color": color,
+            "name": name,
+            "status": status,
+            "model_url": model_url,
+            "created_at": created_at,
+        }
+        self._tree.add(drawing_hash, tripo_task_id)
+
+    # ----------------------------------------------------
+    # 정확히 같은 이미지 → image_token
+    # ----------------------------------------------------
+    def lookup_upload(self, sha256: str) -> str:
+        with self._lock:
+            entry = self._uploads.get(sha256)
+            if entry is None or time.time() - entry["created_at"] > self.token_ttl:
+                return None
+            self.exact_hits += 1
+            return entry["image_token"]
+
+    def record_upload(self, sha256: str, image_token: str):
+        now = time.time()
+        with self._lock:
+            self._uploads[sha256] = {"image_token": image_token, "created_at": now}
+            self._execute("INSERT OR REPLACE INTO uploads (sha256, image_token, created_at) VALUES (?, ?, ?)",
+                          (sha256, image_token, now))
+
+    # ----------------------------------------------------
+    # 거의 같은 그림 → Tripo task
+    # ----------------------------------------------------
+    def lookup_task(self, drawing_hash: int, color: bytes, name: str) -> dict:
+        """
+        근접 중복 캡처의 Tripo task 검색
+
+        Args:
+            drawing_hash: 그림 영역 pHash
+            color: 그림 영역 color_signature
+            name: capture_name()으로 만든 도안명·이름 키 (None이면 검색하지 않음)
+
+        Returns:
+            {"tripo_task_id", "status", "model_url", "distance", "color_diff"} 또는 None
+        """
+        if name is None:
+            return None
+        now = time.time()
+        with self._lock:
+            for distance, _, tripo_task_id in self._tree.search(drawing_hash, self.max_distance):
+                task = self._tasks.get(tripo_task_id)
+                if task is None or task["status"] == "failed" or now - task["created_at"] > self.task_ttl:
+                    continue
+                # 같은 아이의 같은 도안이고 색칠도 같아야 재촬영으로 판단
+                if task["name"] != name:
+                    continue
+                color_diff = color_distance(color, task["color"])
+                if color_diff > self.color_max_diff:
+                    continue
+                self.near_hits += 1
+                return {
+                    "tripo_task_id": tripo_task_id,
+                    "status": task["status"],
+                    "model_url": task["model_url"],
+                    "distance": distance,
+                    "color_diff": color_diff,
+                }
+        return None
+
+    def record_task(self, tripo_task_id: str, drawing_hash: int, color: bytes, name: str):
+        """새 Tripo task 등록 (이름을 읽지 못한 캡처는 재사용 대상에서 제외)"""
+        if name is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._add_task(tripo_task_id, drawing_hash, color, name, "running", None, now)
+            self._execute(
+                "INSERT OR REPLACE INTO tasks (tripo_task_id, drawing_hash, color, name, status, model_url, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (tripo_task_id, to_hex(drawing_hash), color.hex(), name, "running", None, now),
+            )
+
+    def mark_task(self, tripo_task_id: str, status: str, model_url: str = None):
+        """task 결과 반영 ("done" 또는 "failed")"""
+        with self._lock:
+            task = self._tasks.get(tripo_task_id)
+            if task is None:
+                return
+            task["status"] = status
+            task["model_url"] = model_url
+            self._execute("UPDATE tasks SET status = ?, model_url = ? WHERE tripo_task_id = ?",
+                          (status, model_url, tripo_task_id))
+
+    def stats(self) -> dict:
+        return {
+            "uploads": len(self._uploads),
+            "tasks": len(self._tasks),
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+        }
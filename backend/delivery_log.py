@@ -0,0 +1,305 @@
+# backend/delivery_log.py
+import os
+import time
+import asyncio
+from itertools import islice
+from collections import deque
+
+# 보관하는 최대 모델 수 / 최대 보관 시간 (초)
+DELIVERY_RETENTION = int(os.getenv("DELIVERY_RETENTION", "1000"))
+DELIVERY_RETENTION_SECONDS = float(os.getenv("DELIVERY_RETENTION_SECONDS", str(24 * 3600)))
+# ack가 오지 않으면 다시 전달하기까지의 시간 (초)
+DELIVERY_ACK_TIMEOUT = float(os.getenv("DELIVERY_ACK_TIMEOUT", "30"))
+# 기억하는 최대 consumer 수 (넘으면 가장 오래 안 온 consumer부터 정리)
+DELIVERY_MAX_CONSUMERS = int(os.getenv("DELIVERY_MAX_CONSUMERS", "64"))
+
+DEFAULT_CONSUMER = "default"
+
+
+class Consumer:
+    """Unity 인스턴스(디스플레이) 하나의 읽기 위치와 ack 대기 목록"""
+
+    __slots__ = ("name", "cursor", "labels", "pending", "last_seen", "polls", "delivered", "redelivered")
+
+    def __init__(self, name: str, cursor: int):
+        self.name = name
+        self.cursor = cursor  # 다음에 확인할 seq
+        self.labels = None    # 받을 label 집합 (None이면 전부)
+        self.pending = {}     # {seq: ack 마감 시각} (전달했지만 ack 전)
+        self.last_seen = time.time()
+        self.polls = 0        # 0이면 아직 한 번도 poll하지 않음 (수신자 계산에서 제외)
+        self.delivered = 0
+        self.redelivered = 0
+
+    def wants(self, payload: dict) -> bool:
+        return self.labels is None or payload.get("label") in self.labels
+
+
+class DeliveryLog:
+    """
+    Unity로 보낼 완성 모델의 전달 로그
+
+    모델은 증가하는 seq와 함께 deque에 추가되고, 각 consumer는 자기 cursor부터
+    읽는다. 따라서 여러 Unity 인스턴스가 같은 모델을 각자 받을 수 있고,
+    label로 받을 도안을 골라 디스플레이별로 나눌 수 있다.
+
+    ack가 필요한 consumer는 ack_timeout 안에 ack하지 않으면 같은 모델을
+    다시 받는다 (at-least-once). 보관 개수/시간을 넘은 모델은 앞에서부터 버린다.
+
+    모델마다 추가 시점에 poll 중이던 consumer(label이 맞는)를 수신자로 기록하고,
+    수신자 전원이 받아야 전달 완료로 본다 (mark_delivered). 수신자가 없을 때
+    추가된 모델은 처음 받는 consumer 하나로 완료된다. 새 consumer는 과거 모델을
+    다시 받지 않고, 아직 아무도 받지 않은 모델부터 받는다 (replay면 보관 중인 전체).
+    """
+
+    def __init__(
+        self,
+        retention: int = DELIVERY_RETENTION,
+        retention_seconds: float = DELIVERY_RETENTION_SECONDS,
+        ack_timeout: float = DELIVERY_ACK_TIMEOUT,
+        max_consumers: int = DELIVERY_MAX_CONSUMERS,
+    ):
+        self.retention = max(1, retention)
+        self.retention_seconds = retention_seconds
+        self.ack_timeout = ack_timeout
+        self.max_consumers = max(1, max_consumers)
+
+        self._entries = deque()  # [(seq, created_at, payload, recipients)]
+        # recipients: {"expected": 받아야 하는 consumer 집합 또는 None(아무나 하나),
+        #              "received": 받은 consumer 집합, "taken": 한 번이라도 전달됐는지}
+        self._next_seq = 1
+        self._consumers = {DEFAULT_CONSUMER: Consumer(DEFAULT_CONSUMER, 1)}
+        self._condition = None  # long-poll 대기자 깨우기 (이벤트 루프 안에서 생성)
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def first_seq(self) -> int:
+        return self._entries[0][0] if self._entries else self._next_seq
+
+    def append(self, payload: dict, recipients: list = None) -> int:
+        """
+        모델 추가 → seq
+
+        Args:
+            recipients: 받아야 하는 consumer 이름 (재시작 후 복구 시 아직 받지 않은 consumer)
+                        None이면 지금 poll 중인 consumer 중 label이 맞는 consumer
+        """
+        seq = self._next_seq
+        self._next_seq += 1
+        if recipients:
+            expected = set(recipients)
+            for name in expected:
+                # 아직 다시 연결하지 않은 consumer도 이 모델부터 받도록 위치를 잡아 둠
+                state = self._consumers.get(name) or self._consumer(name, cursor=seq)
+                state.cursor = min(state.cursor, seq)
+        else:
+            expected = {
+                state.name for state in self._consumers.values() if state.polls and state.wants(payload)
+            } or None
+        self._entries.append((seq, time.time(), payload, {"expected": expected, "received": set(), "taken": False}))
+        self._trim()
+        return seq
+
+    async def publish(self, payload: dict) -> int:
+        """모델 추가 후 long-poll로 기다리는 consumer를 깨움 → seq"""
+        condition = self._get_condition()
+        async with condition:
+            seq = self.append(payload)
+            condition.notify_all()
+        return seq
+
+    async def wait_poll(self, consumer: str = DEFAULT_CONSUMER, labels: set = None,
+                        auto_ack: bool = False, timeout: float = 0.0, replay: bool = False):
+        """
+        받을 모델이 생기거나 timeout(초)이 지날 때까지 대기하는 poll (long-poll)
+
+        publish가 Condition으로 깨우므로 대기 중에는 반복 확인을 하지 않는다.
+        ack 마감이 timeout보다 먼저 오면 그때 깨어나 재전달 여부를 확인한다.
+        """
+        deadline = time.monotonic() + max(0.0, timeout)
+        condition = self._get_condition()
+        async with condition:
+            delivery = self.poll(consumer, labels, auto_ack, replay)
+            while delivery is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                pending = self._consumers[consumer].pending if consumer in self._consumers else None
+                if pending:
+                    remaining = min(remaining, max(0.0, min(pending.values()) - time.time()) + 0.01)
+                try:
+                    await asyncio.wait_for(condition.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+                delivery = self.poll(consumer, None, auto_ack)
+        return delivery
+
+    def release(self, consumer: str, seq: int, auto_ack: bool = False):
+        """
+        전달하지 못한 모델을 다음 poll에서 바로 다시 받도록 되돌림 (클라이언트 연결 끊김 등)
+
+        auto_ack consumer는 ack를 보내지 않으므로 ack 대기 목록 대신 cursor를 되돌린다.
+        """
+        state = self._consumers.get(consumer)
+        if state is None or self._entry(seq) is None:
+            return
+        if auto_ack:
+            state.cursor = min(state.cursor, seq)
+        else:
+            state.pending[seq] = 0.0
+
+    def poll(self, consumer: str = DEFAULT_CONSUMER, labels: set = None, auto_ack: bool = False,
+             replay: bool = False):
+        """
+        consumer가 받을 다음 모델
+
+        Args:
+            labels: 받을 label 집합 (None이면 전부, 다음 poll까지 유지)
+            auto_ack: True면 전달 즉시 ack한 것으로 처리
+            replay: 처음 보는 consumer면 보관 중인 가장 오래된 모델부터 받음
+
+        Returns:
+            (seq, payload) 또는 None
+        """
+        self._trim()
+        state = self._consumer(consumer, replay=replay)
+        state.polls += 1
+        if labels is not None:
+            state.labels = set(labels) or None
+        now = time.time()
+
+        # 1) ack 시간이 지난 모델 재전달
+        for seq, deadline in sorted(state.pending.items()):
+            if deadline > now:
+                continue
+            entry = self._entry(seq)
+            if entry is None:
+                del state.pending[seq]
+                continue
+            if auto_ack:
+                # ack를 보내지 않는 consumer → 한 번 다시 전달하고 대기 목록에서 제거
+                del state.pending[seq]
+            else:
+                state.pending[seq] = now + self.ack_timeout
+            state.redelivered += 1
+            return seq, entry[2]
+
+        # 2) cursor 이후의 새 모델 (label이 맞지 않는 모델은 건너뜀)
+        start = max(state.cursor, self.first_seq)
+        for seq, _, payload, recipients in islice(self._entries, start - self.first_seq, None):
+            state.cursor = seq + 1
+            if not state.wants(payload):
+                continue
+            recipients["taken"] = True
+            if not auto_ack:
+                state.pending[seq] = now + self.ack_timeout
+            state.delivered += 1
+            return seq, payload
+        state.cursor = max(state.cursor, self._next_seq)
+        return None
+
+    def ack(self, consumer: str, seq: int):
+        """전달 확인 → 해당 모델 payload (ack 대기 중이 아니었으면 None)"""
+        state = self._consumers.get(consumer)
+        if state is None or state.pending.pop(seq, None) is None:
+            return None
+        entry = self._entry(seq)
+        return entry[2] if entry else None
+
+    def mark_delivered(self, consumer: str, seq: int) -> list:
+        """
+        consumer가 모델을 받았음을 기록 (ack 또는 auto_ack 전달 후 호출)
+
+        Returns:
+            이 모델의 수신자 이름 목록 (수신자 지정 없이 추가된 모델이면 [],
+            이미 보관 기간이 지난 모델이면 None)
+        """
+        entry = self._entry(seq)
+        if entry is None:
+            return None
+        entry[3]["received"].add(consumer)
+        return self.recipients(seq)
+
+    def recipients(self, seq: int) -> list:
+        """모델의 수신자 이름 목록 (수신자 지정 없이 추가됐으면 [])"""
+        entry = self._entry(seq)
+        return sorted(entry[3]["expected"] or ()) if entry else []
+
+    def peek(self, limit: int = 50) -> list:
+        """보관 중인 모델 (오래된 순)"""
+        return [(seq, payload) for seq, _, payload, _ in islice(self._entries, max(0, limit))]
+
+    def clear(self) -> int:
+        """보관 중인 모델과 ack 대기 목록을 모두 비움 → 제거한 개수"""
+        count = len(self._entries)
+        self._entries.clear()
+        for state in self._consumers.values():
+            state.pending.clear()
+            state.cursor = self._next_seq
+        return count
+
+    def stats(self) -> dict:
+        self._trim()
+        return {
+            "retained": len(self._entries),
+            "first_seq": self.first_seq,
+            "next_seq": self._next_seq,
+            "dropped": self.dropped,
+            "consumers": {
+                name: {
+                    "lag": self._next_seq - max(state.cursor, self.first_seq),
+                    "pending": len(state.pending),
+                    "labels": sorted(state.labels) if state.labels else None,
+                    "delivered": state.delivered,
+                    "redelivered": state.redelivered,
+                    "last_seen": state.last_seen,
+                }
+                for name, state in self._consumers.items()
+            },
+        }
+
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _join_seq(self) -> int:
+        """새 consumer의 시작 위치: 수신자 지정 없이 추가돼 아직 아무도 가져가지 않은 가장 오래된 모델"""
+        for seq, _, _, recipients in self._entries:
+            if recipients["expected"] is None and not recipients["taken"]:
+                return seq
+        return self._next_seq
+
+    def _consumer(self, name: str, replay: bool = False, cursor: int = None) -> Consumer:
+        state = self._consumers.get(name)
+        if state is None:
+            # 새 consumer는 과거 모델을 다시 받지 않음 (replay면 보관 중인 가장 오래된 모델부터)
+            if cursor is None:
+                cursor = self.first_seq if replay else self._join_seq()
+            state = Consumer(name, cursor)
+            self._consumers[name] = state
+            if len(self._consumers) > self.max_consumers:
+                idle = min(
+                    (s for s in self._consumers.values() if s.name not in (name, DEFAULT_CONSUMER)),
+                    key=lambda s: s.last_seen,
+                    default=None,
+                )
+                if idle is not None:
+                    del self._consumers[idle.name]
+        state.last_seen = time.time()
+        return state
+
+    def _entry(self, seq: int):
+        index = seq - self.first_seq
+        if 0 <= index < len(self._entries):
+            return self._entries[index]
+        return None
+
+    def _trim(self):
+        deadline = time.time() - self.retention_seconds
+        while self._entries and (len(self._entries) > self.retention or self._entries[0][1] < deadline):
+            self._entries.popleft()
+            self.dropped += 1
@@ -0,0 +1,249 @@
+# backend/glb_lod.py
+import os
+import json
+import time
+import hashlib
+
+import numpy as np
+
+from Utils.glb import read_glb, write_glb, repack
+from backend.glb_optimizer import recompress_textures, GLB_TEXTURE_QUALITY
+
+# LOD별 격자 해상도 (모델의 가장 긴 변을 몇 칸으로 나눌지, 작을수록 거칠다, 거친 것부터)
+GLB_LOD_GRIDS = [int(v) for v in os.getenv("GLB_LOD_GRIDS", "24,64").split(",") if v.strip()]
+# LOD별 텍스처 최대 변 길이 (GLB_LOD_GRIDS와 같은 순서)
+GLB_LOD_TEXTURE_SIZES = [int(v) for v in os.getenv("GLB_LOD_TEXTURE_SIZES", "256,512").split(",") if v.strip()]
+
+_COMPONENT_TYPES = {
+    5120: np.int8, 5121: np.uint8, 5122: np.int16,
+    5123: np.uint16, 5125: np.uint32, 5126: np.float32,
+}
+_TYPE_WIDTHS = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4}
+_ARRAY_BUFFER, _ELEMENT_ARRAY_BUFFER = 34962, 34963
+
+
+def read_accessor(glb, index: int) -> np.ndarray:
+    """accessor → (count, width) 배열 (BIN 청크 위의 view, 복사 없음)"""
+    accessor = glb.json["accessors"][index]
+    if "sparse" in accessor or "bufferView" not in accessor:
+        raise ValueError(f"accessor {index}: sparse/빈 accessor는 지원하지 않습니다.")
+    dtype = np.dtype(_COMPONENT_TYPES[accessor["componentType"]])
+    width = _TYPE_WIDTHS[accessor["type"]]
+    view = glb.json["bufferViews"][accessor["bufferView"]]
+    stride = view.get("byteStride") or dtype.itemsize * width
+    return np.ndarray(
+        (accessor["count"], width), dtype=dtype, buffer=glb.buffer_view(accessor["bufferView"]),
+        offset=accessor.get("byteOffset", 0), strides=(stride, dtype.itemsize),
+    )
+
+
+def cluster_vertices(positions: np.ndarray, triangles: np.ndarray, grid: int,
+                     normals: np.ndarray = None, uvs: np.ndarray = None):
+    """
+    격자 기반 vertex clustering 단순화
+
+    같은 격자 칸(+ 같은 UV 칸)에 들어간 정점을 평균 정점 하나로 합치고,
+    퇴화한 삼각형과 중복 삼각형을 제거한다. UV 칸도 키에 넣어 텍스처
+    경계(seam)의 정점이 서로 합쳐지지 않게 한다.
+
+    Returns:
+        (positions, triangles, normals, uvs) - 사용되지 않는 정점은 제거됨
+    """
+    low = positions.min(axis=0)
+    extent = float((positions.max(axis=0) - low).max()) or 1.0
+    cells = np.floor((positions - low) * (grid / extent)).astype(np.int64)
+    key = (cells[:, 0] * (grid + 1) + cells[:, 1]) * (grid + 1) + cells[:, 2]
+    if uvs is not None:
+        uv_cells = np.floor(uvs * grid).astype(np.int64)
+        uv_cells -= uv_cells.min(axis=0)
+        uv_key = uv_cells[:, 0] * (int(uv_cells[:, 1].max()) + 1) + uv_cells[:, 1]
+        key = key * (int(uv_key.max()) + 1) + uv_key
+
+    _, cluster = np.unique(key, return_inverse=True)
+    cluster = cluster.ravel()
+    tris = cluster[triangles]
+
+    # 퇴화 삼각형 제거 후 중복 제거 (감는 방향은 유지)
+    tris = tris[(tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) & (tris[:, 0] != tris[:, 2])]
+    if len(tris):
+        _, first = np.unique(np.sort(tris, axis=1), axis=0, return_index=True)
+        tris = tris[np.sort(first)]
+
+    # 살아남은 클러스터만 정점으로 (평균 위치/UV, 합산 후 정규화한 법선)
+    used, tris = np.unique(tris, return_inverse=True)
+    tris = tris.reshape(-1, 3)
+    remap = np.full(cluster.max() + 1, -1, dtype=np.int64)
+    remap[used] = np.arange(len(used))
+    members = remap[cluster]
+    mask = members >= 0
+    members = members[mask]
+    counts = np.bincount(members, minlength=len(used)).astype(np.float64)[:, None]
+
+    def average(values):
+        values = values[mask].astype(np.float64)
+        total = np.stack([np.bincount(members, weights=values[:, i], minlength=len(used))
+                          for i in range(values.shape[1])], axis=1)
+        return total / counts
+
+    new_positions = average(positions).astype(np.float32)
+    new_normals = None
+    if normals is not None:
+        summed = average(normals)
+        length = np.linalg.norm(summed, axis=1, keepdims=True)
+        new_normals = (summed / np.where(length > 0, length, 1)).astype(np.float32)
+    new_uvs = average(uvs).astype(np.float32) if uvs is not None else None
+    return new_positions, tris, new_normals, new_uvs
+
+
+class _BinAppender:
+    """새 bufferView/accessor를 glTF에 추가하고 데이터는 repack용 replacements에 모음"""
+
+    def __init__(self, gltf: dict, replacements: dict):
+        self.gltf = gltf
+        self.replacements = replacements
+
+    def add(self, array: np.ndarray, accessor_type: str, target: int, with_bounds: bool = False) -> int:
+        data = np.ascontiguousarray(array)
+        views = self.gltf.setdefault("bufferViews", [])
+        views.append({"buffer": 0, "byteLength": data.nbytes, "target": target})
+        self.replacements[len(views) - 1] = data.tobytes()
+
+        component_type = {np.dtype(v): k for k, v in _COMPONENT_TYPES.items()}[data.dtype]
+        accessor = {
+            "bufferView": len(views) - 1,
+            "componentType": component_type,
+            "count": len(data),
+            "type": accessor_type,
+        }
+        if with_bounds:
+            accessor["min"] = data.min(axis=0).tolist()
+            accessor["max"] = data.max(axis=0).tolist()
+        accessors = self.gltf.setdefault("accessors", [])
+        accessors.append(accessor)
+        return len(accessors) - 1
+
+
+def _prune_accessors(gltf: dict):
+    """참조되지 않는 accessor 제거 (repack이 해당 bufferView도 버릴 수 있도록)"""
+    if "accessors" not in gltf:
+        return
+    refs = []  # (dict, key)
+    for mesh in gltf.get("meshes", []):
+        for primitive in mesh.get("primitives", []):
+            refs += [(primitive["attributes"], name) for name in primitive.get("attributes", {})]
+            if "indices" in primitive:
+                refs.append((primitive, "indices"))
+            for target in primitive.get("targets", []):
+                refs += [(target, name) for name in target]
+    for skin in gltf.get("skins", []):
+        if "inverseBindMatrices" in skin:
+            refs.append((skin, "inverseBindMatrices"))
+    for animation in gltf.get("animations", []):
+        for sampler in animation.get("samplers", []):
+            refs += [(sampler, "input"), (sampler, "output")]
+
+    used = sorted({owner[key] for owner, key in refs})
+    remap = {old: new for new, old in enumerate(used)}
+    gltf["accessors"] = [gltf["accessors"][old] for old in used]
+    for owner, key in refs:
+        owner[key] = remap[owner[key]]
+
+
+def simplify_glb(data, grid: int, texture_size: int, quality: int = GLB_TEXTURE_QUALITY):
+    """
+    GLB 한 개 → 단순화된 LOD GLB
+
+    삼각형 primitive(POSITION/NORMAL/TEXCOORD_0 + indices)만 단순화하고,
+    스킨/모프 타겟이 있거나 지원하지 않는 형식이면 원본 primitive를 유지한다.
+    텍스처도 texture_size로 줄인다.
+
+    Returns:
+        (GLB bytes, report)
+    """
+    glb = read_glb(data)
+    gltf = json.loads(json.dumps(glb.json))
+    replacements, _ = recompress_textures(glb, gltf, texture_size, quality)
+    appender = _BinAppender(gltf, replacements)
+
+    triangles_before = triangles_after = 0
+    for mesh in gltf.get("meshes", []):
+        for primitive in mesh.get("primitives", []):
+            attributes = primitive["attributes"]
+            if primitive.get("mode", 4) != 4 or "targets" in primitive or "JOINTS_0" in attributes \
+                    or "POSITION" not in attributes:
+                continue
+            try:
+                positions = read_accessor(glb, attributes["POSITION"])
+                if "indices" in primitive:
+                    triangles = read_accessor(glb, primitive["indices"]).reshape(-1, 3).astype(np.int64)
+                else:
+                    triangles = np.arange(len(positions), dtype=np.int64).reshape(-1, 3)
+                normals = read_accessor(glb, attributes["NORMAL"]) if "NORMAL" in attributes else None
+                uvs = read_accessor(glb, attributes["TEXCOORD_0"]) if "TEXCOORD_0" in attributes else None
+            except (ValueError, KeyError):
+                continue
+            if positions.dtype != np.float32 or (uvs is not None and uvs.dtype != np.float32):
+                continue  # 양자화된 정점은 건너뜀
+            if not len(positions) or not len(triangles):
+                continue
+
+            new_positions, new_triangles, new_normals, new_uvs = cluster_vertices(
+                positions, triangles, grid, normals, uvs
+            )
+            if not len(new_triangles):
+                continue  # 너무 작은 부품은 원본 유지
+            triangles_before += len(triangles)
+            triangles_after += len(new_triangles)
+
+            new_attributes = {"POSITION": appender.add(new_positions, "VEC3", _ARRAY_BUFFER, with_bounds=True)}
+            if new_normals is not None:
+                new_attributes["NORMAL"] = appender.add(new_normals, "VEC3", _ARRAY_BUFFER)
+            if new_uvs is not None:
+                new_attributes["TEXCOORD_0"] = appender.add(new_uvs, "VEC2", _ARRAY_BUFFER)
+            index_type = np.uint16 if len(new_positions) < 65536 else np.uint32
+            primitive["indices"] = appender.add(
+                new_triangles.astype(index_type).reshape(-1, 1), "SCALAR", _ELEMENT_ARRAY_BUFFER
+            )
+            # TANGENT/COLOR 등은 단순화하지 않으므로 제외 (Unity가 필요 시 다시 계산)
+            primitive["attributes"] = new_attributes
+
+    _prune_accessors(gltf)
+    new_gltf, new_bin = repack(glb, replacements, gltf=gltf)
+    output = write_glb(new_gltf, new_bin)
+    return output, {
+        "grid": grid,
+        "texture_size": texture_size,
+        "triangles_before": triangles_before,
+        "triangles": triangles_after,
+        "bytes_before": len(data),
+        "bytes": len(output),
+    }
+
+
+def generate_lods_file(source_path: str, outputs: list, quality: int = GLB_TEXTURE_QUALITY) -> list:
+    """
+    워커 프로세스에서 실행: 원본 GLB 파일 → LOD 파일들
+
+    Args:
+        outputs: [(output_path, grid, texture_size), ...]
+
+    Returns:
+        LOD별 report (+ "path", "sha256", "elapsed_ms")
+        원본보다 작지 않은 LOD는 파일을 쓰지 않고 결과에서 제외
+    """
+    with open(source_path, "rb") as f:
+        data = f.read()
+
+    reports = []
+    for output_path, grid, texture_size in outputs:
+        started = time.perf_counter()
+        output, report = simplify_glb(data, grid, texture_size, quality)
+        if len(output) >= len(data):
+            continue
+        with open(output_path, "wb") as f:
+            f.write(output)
+        report["path"] = output_path
+        report["sha256"] = hashlib.sha256(output).hexdigest()
+        report["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        reports.append(report)
+    return reports
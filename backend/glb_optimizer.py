@@ -0,0 +1,203 @@
+# backend/glb_optimizer.py
+import io
+import os
+import json
+import time
+import hashlib
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from Utils.glb import read_glb, write_glb, repack
+
+# 임베드 텍스처 최대 변 길이 / JPEG 품질
+GLB_TEXTURE_MAX_SIZE = int(os.getenv("GLB_TEXTURE_MAX_SIZE", "1024"))
+GLB_TEXTURE_QUALITY = int(os.getenv("GLB_TEXTURE_QUALITY", "85"))
+# 최적화 워커 프로세스 수 (이미지 디코드/리사이즈가 CPU를 오래 씀)
+GLB_OPTIMIZE_WORKERS = int(os.getenv("GLB_OPTIMIZE_WORKERS", "1"))
+
+
+def _texture_roles(gltf: dict) -> dict:
+    """이미지 index → 용도 (baseColor / metallicRoughness / normal)"""
+    textures = gltf.get("textures", [])
+    roles = {}
+
+    def mark(info, role):
+        if not info or info.get("index") is None or info["index"] >= len(textures):
+            return
+        source = textures[info["index"]].get("source")
+        if source is not None:
+            # 같은 이미지를 여러 용도로 쓰면 가장 보수적으로 (normal > metallicRoughness > baseColor)
+            order = ("baseColor", "metallicRoughness", "normal")
+            if order.index(role) >= order.index(roles.get(source, "baseColor")):
+                roles[source] = role
+
+    for material in gltf.get("materials", []):
+        pbr = material.get("pbrMetallicRoughness", {})
+        mark(pbr.get("baseColorTexture"), "baseColor")
+        mark(pbr.get("metallicRoughnessTexture"), "metallicRoughness")
+        mark(material.get("normalTexture"), "normal")
+    return roles
+
+
+def _reencode(data: memoryview, role: str, max_size: int, quality: int):
+    """텍스처 축소 + 재인코딩 → (bytes, mimeType, 원본 크기, 결과 크기)"""
+    img = Image.open(io.BytesIO(data))
+    original_size = img.size
+    img.load()
+
+    if max(img.size) > max_size:
+        img.thumbnail((max_size, max_size), Image.LANCZOS)
+
+    has_alpha = role == "baseColor" and img.mode in ("RGBA", "LA", "P") and \
+        img.convert("RGBA").getextrema()[3][0] < 255
+    buffer = io.BytesIO()
+    if has_alpha:
+        # 투명도가 실제로 쓰이는 baseColor만 PNG 유지
+        img.convert("RGBA").save(buffer, format="PNG", optimize=True)
+        mime_type = "image/png"
+    else:
+        # normal/metallicRoughness는 블록 노이즈가 덜 보이도록 품질을 약간 높임
+        img.convert("RGB").save(
+            buffer, format="JPEG",
+            quality=min(95, quality + (5 if role != "baseColor" else 0)),
+            optimize=True,
+        )
+        mime_type = "image/jpeg"
+    return buffer.getvalue(), mime_type, original_size, img.size
+
+
+def recompress_textures(glb, gltf: dict, max_size: int, quality: int):
+    """
+    임베드 텍스처 축소/재인코딩
+
+    Args:
+        glb: 원본 GLB (이미지 데이터를 읽음)
+        gltf: 수정할 glTF dict (mimeType이 갱신됨)
+
+    Returns:
+        (replacements {bufferView index: 새 데이터}, 이미지별 report)
+        재인코딩 결과가 원본보다 크면 해당 이미지는 그대로 둔다.
+    """
+    roles = _texture_roles(gltf)
+
+    replacements = {}
+    images = []
+    for index, image in enumerate(gltf.get("images", [])):
+        role = roles.get(index)
+        view_index = image.get("bufferView")
+        if role is None or view_index is None:
+            continue
+        original = glb.buffer_view(view_index)
+        encoded, mime_type, original_size, new_size = _reencode(original, role, max_size, quality)
+        kept = len(encoded) >= len(original)
+        if not kept:
+            replacements[view_index] = encoded
+            image["mimeType"] = mime_type
+        images.append({
+            "image": index,
+            "role": role,
+            "size": list(original_size) if kept else list(new_size),
+            "bytes_before": len(original),
+            "bytes_after": len(original) if kept else len(encoded),
+        })
+    return replacements, images
+
+
+def optimize_glb(data, max_size: int = GLB_TEXTURE_MAX_SIZE, quality: int = GLB_TEXTURE_QUALITY):
+    """
+    GLB 텍스처 축소/재인코딩 + 사용하지 않는 bufferView 제거
+
+    Returns:
+        (새 GLB bytes, report)
+    """
+    glb = read_glb(data)
+    gltf = json.loads(json.dumps(glb.json))
+    replacements, images = recompress_textures(glb, gltf, max_size, quality)
+
+    new_gltf, new_bin = repack(glb, replacements, gltf=gltf)
+    output = write_glb(new_gltf, new_bin)
+    return output, {
+        "bytes_before": len(data),
+        "bytes_after": len(output),
+        "images": images,
+        "buffer_views_before": len(glb.json.get("bufferViews", [])),
+        "buffer_views_after": len(new_gltf.get("bufferViews", [])),
+    }
+
+
+def optimize_glb_file(source_path: str, output_path: str, max_size: int, quality: int) -> dict:
+    """
+    워커 프로세스에서 실행: 파일을 직접 읽고 써서 GLB를 프로세스 간에 주고받지 않음
+
+    Returns:
+        report + {"written": 결과 파일을 썼는지, "sha256", "elapsed_ms"}
+        (결과가 원본보다 작지 않으면 파일을 쓰지 않음)
+    """
+    started = time.perf_counter()
+    with open(source_path, "rb") as f:
+        data = f.read()
+    output, report = optimize_glb(data, max_size, quality)
+
+    report["written"] = len(output) < len(data)
+    if report["written"]:
+        with open(output_path, "wb") as f:
+            f.write(output)
+        report["sha256"] = hashlib.sha256(output).hexdigest()
+    report["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
+
+
+class GlbOptimizer:
+    """GLB 최적화/LOD 생성을 별도 프로세스에서 실행 (이벤트 루프와 GIL을 막지 않음)"""
+
+    def __init__(self, workers: int = GLB_OPTIMIZE_WORKERS,
+                 max_size: int = GLB_TEXTURE_MAX_SIZE, quality: int = GLB_TEXTURE_QUALITY):
+        self.workers = max(1, workers)
+        self.max_size = max_size
+        self.quality = quality
+        self._executor = None
+
+        self.optimized = 0
+        self.bytes_saved = 0
+        self.lods_generated = 0
+
+    async def _run(self, func, *args):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def optimize_file(self, source_path: str, output_path: str) -> dict:
+        report = await self._run(optimize_glb_file, source_path, output_path, self.max_size, self.quality)
+        if report["written"]:
+            self.optimized += 1
+            self.bytes_saved += report["bytes_before"] - report["bytes_after"]
+        return report
+
+    async def generate_lods(self, source_path: str, outputs: list) -> list:
+        """
+        LOD GLB 생성 (glb_lod.generate_lods_file)
+
+        Args:
+            outputs: [(output_path, grid, texture_size), ...]
+        """
+        # 순환 import 방지 (glb_lod가 이 모듈의 텍스처 재인코딩을 사용)
+        from backend.glb_lod import generate_lods_file
+        reports = await self._run(generate_lods_file, source_path, outputs, self.quality)
+        self.lods_generated += len(reports)
+        return reports
+
+    def stats(self) -> dict:
+        return {
+            "optimized": self.optimized,
+            "bytes_saved": self.bytes_saved,
+            "lods_generated": self.lods_generated,
+            "max_size": self.max_size,
+            "quality": self.quality,
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,149 @@
+# backend/job_scheduler.py
+import os
+import heapq
+import itertools
+import asyncio
+from contextlib import asynccontextmanager
+
+# 단계 종류별 동시 실행 수
+DEFAULT_POOL_SIZES = {
+    "image": int(os.getenv("WORKERS_IMAGE", "2")),                  # CPU 이미지 처리
+    "openai": int(os.getenv("WORKERS_OPENAI", "8")),                # Vision 호출
+    "tripo_submit": int(os.getenv("WORKERS_TRIPO_SUBMIT", "4")),    # 업로드 / task 생성 요청
+    "tripo_wait": int(os.getenv("TRIPO_MAX_CONCURRENT_TASKS", "10")),  # 동시에 생성 중인 Tripo task 수
+    "download": int(os.getenv("WORKERS_DOWNLOAD", "4")),            # GLB 다운로드
+}
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "500"))
+
+
+class WorkerPool:
+    """
+    슬롯 수가 제한된 풀 (우선순위 + FIFO 대기열)
+
+    슬롯이 비어 있으면 즉시 획득하고, 아니면 (우선순위, 도착 순서)로 줄을 선다.
+    대기 중인 job의 순번을 조회할 수 있다.
+    """
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = max(1, size)
+        self.active = 0
+        self._waiters = []  # heap: [(-priority, seq, job_id, future)]
+        self._seq = itertools.count()
+        self.total_acquired = 0
+
+    async def acquire(self, job_id: str, priority: int = 0):
+        if self.active < self.size and not self._waiters:
+            self.active += 1
+            self.total_acquired += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (-priority, next(self._seq), job_id, future)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 슬롯을 넘겨받은 직후 취소됨 → 다음 대기자에게 양보
+                self.release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+        self.total_acquired += 1
+
+    def release(self):
+        self.active -= 1
+        while self._waiters:
+            _, _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.active += 1
+                future.set_result(None)
+                return
+
+    @asynccontextmanager
+    async def slot(self, job_id: str, priority: int = 0):
+        await self.acquire(job_id, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def position(self, job_id: str):
+        """대기열 순번 (1부터, 대기 중이 아니면 None)"""
+        for entry in self._waiters:
+            if entry[2] == job_id and not entry[3].done():
+                return 1 + sum(1 for other in self._waiters if other[:2] < entry[:2] and not other[3].done())
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "active": self.active,
+            "waiting": sum(1 for entry in self._waiters if not entry[3].done()),
+            "total_acquired": self.total_acquired,
+        }
+
+
+class JobScheduler:
+    """
+    /analyze 작업 스케줄러
+
+    job은 즉시 asyncio task로 시작되지만, 각 단계는 해당 종류의 WorkerPool
+    슬롯을 얻어야 실행된다. 따라서 캡처가 한꺼번에 몰려도 Tripo 동시 생성 수와
+    OpenAI 동시 호출 수는 설정값을 넘지 않고, 나머지는 순서대로 대기한다.
+    """
+
+    def __init__(self, pool_sizes: dict = None, max_jobs: int = JOB_QUEUE_MAX):
+        sizes = dict(DEFAULT_POOL_SIZES, **(pool_sizes or {}))
+        self.pools = {name: WorkerPool(name, size) for name, size in sizes.items()}
+        self.max_jobs = max_jobs
+        self._jobs = {}        # {job_id: asyncio.Task}
+        self._priorities = {}  # {job_id: priority}
+
+    def is_full(self) -> bool:
+        return len(self._jobs) >= self.max_jobs
+
+    def submit(self, job_id: str, coro, priority: int = 0) -> asyncio.Task:
+        """job 등록 및 시작"""
+        self._priorities[job_id] = priority
+        task = asyncio.create_task(coro)
+        self._jobs[job_id] = task
+        task.add_done_callback(lambda _: self._forget(job_id))
+        return task
+
+    def _forget(self, job_id: str):
+        self._jobs.pop(job_id, None)
+        self._priorities.pop(job_id, None)
+
+    def slot(self, pool: str, job_id: str):
+        """단계 실행 슬롯 (async context manager)"""
+        return self.pools[pool].slot(job_id, self._priorities.get(job_id, 0))
+
+    async def acquire(self, pool: str, job_id: str):
+        """여러 단계에 걸쳐 유지할 슬롯 획득 (release로 직접 반환)"""
+        await self.pools[pool].acquire(job_id, self._priorities.get(job_id, 0))
+
+    def release(self, pool: str):
+        self.pools[pool].release()
+
+    def queue_info(self, job_id: str) -> dict:
+        """job이 대기 중인 풀과 순번 (대기 중이 아니면 None)"""
+        for name, pool in self.pools.items():
+            position = pool.position(job_id)
+            if position is not None:
+                return {"pool": name, "position": position, "waiting": pool.stats()["waiting"]}
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "jobs": len(self._jobs),
+            "max_jobs": self.max_jobs,
+            "pools": {name: pool.stats() for name, pool in self.pools.items()},
+        }
+
+    async def close(self):
+        for task in list(self._jobs.values()):
+            task.cancel()
+        await asyncio.gather(*self._jobs.values(), return_exceptions=True)
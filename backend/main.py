@@ -1,28 +1,141 @@
 import os
-import base64
 import uuid
+import json
 import requests
 import time
 import asyncio
-from fastapi import FastAPI, UploadFile, File, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, Response
 
-from backend.tripo_client import Tripo3DClient
+from backend.tripo_client import AsyncTripo3DClient, close_http_clients
+from backend.tripo_poller import TripoTaskPoller
 from backend.vision_model import analyze_drawing_text
-from Utils.image_cropper import crop_top_section
+from Utils.image_pipeline import ImageTransform
+from Utils.header_detector import detect_header_boundary, fit_to_token_budget
+from backend.template_matcher import TemplateMatcher
+from backend.vision_cache import VisionCache
+from backend.dedup_index import CaptureIndex, sha256_hex, capture_name
+from backend.stage_graph import Stage, StageGraph
+from backend.job_scheduler import JobScheduler
+from backend.task_store import TaskStore
+from backend.task_registry import TaskRegistry
+from backend.delivery_log import DeliveryLog, DEFAULT_CONSUMER
+from backend.task_events import TaskEventBus, format_sse
+from backend.unity_receiver import UnityPusher
+from backend.model_cache import ModelCache, MODEL_CACHE_CHUNK
+from backend.glb_optimizer import GlbOptimizer
+from backend.glb_lod import GLB_LOD_GRIDS, GLB_LOD_TEXTURE_SIZES
+from backend import metrics
+from backend import tracing
+from Utils.image_hash import phash, color_signature
+from Utils.glb import read_glb, base_color_image
+
+import numpy as np
+from PIL import Image
 
 from dotenv import load_dotenv
 load_dotenv()
 
-print("[Main] crop_top_section 임포트 완료")
+# --------------------------------------------------------
+# 🖼️ 이미지 변환 설정
+# --------------------------------------------------------
+CAPTURE_ROTATE_CW = int(os.getenv("CAPTURE_ROTATE_CW", "90"))
+# 헤더 경계 자동 감지 실패 시 사용할 고정 비율
+HEADER_CROP_RATIO = float(os.getenv("HEADER_CROP_RATIO", "0.15"))
+HEADER_DETECT = os.getenv("HEADER_DETECT", "1") == "1"
+# Vision 입력(헤더 띠) 토큰 예산 및 detail
+VISION_TOKEN_BUDGET = int(os.getenv("VISION_TOKEN_BUDGET", "425"))
+VISION_DETAIL = os.getenv("VISION_DETAIL", "high")
+# JPEG 원본이 이보다 크면 draft 모드로 축소 디코드 (0이면 항상 원본 크기)
+# 디코드 결과를 Vision과 Tripo 업로드가 공유하므로 켜면 Tripo 입력 해상도도 줄어든다 → 기본은 끔
+IMAGE_DECODE_MAX_SIDE = int(os.getenv("IMAGE_DECODE_MAX_SIDE", "0"))
+VISION_JPEG_QUALITY = int(os.getenv("VISION_JPEG_QUALITY", "85"))
+# Tripo 업로드 포맷: png(무손실) 또는 jpg(전송량 절감)
+TRIPO_UPLOAD_FORMAT = os.getenv("TRIPO_UPLOAD_FORMAT", "png").lower()
+TRIPO_UPLOAD_JPEG_QUALITY = int(os.getenv("TRIPO_UPLOAD_JPEG_QUALITY", "95"))
+
+# --------------------------------------------------------
+# 🧩 로컬 도안 분류 (템플릿 매칭) 설정
+# --------------------------------------------------------
+# 기본값 끔: data/Mesh_Image는 제품 렌더 이미지라 실제 도안 시트 촬영본과는 매칭되지 않음
+# (빈 도안 시트 스캔을 템플릿 폴더에 둔 경우에만 켜기)
+TEMPLATE_MATCH = os.getenv("TEMPLATE_MATCH", "0") == "1"
+TEMPLATE_MATCH_CONFIDENCE = float(os.getenv("TEMPLATE_MATCH_CONFIDENCE", "0.6"))
+# 신뢰도가 높으면 Vision 호출 자체를 생략 (아이 이름은 "Unknown")
+VISION_SKIP_ON_MATCH = os.getenv("VISION_SKIP_ON_MATCH", "0") == "1"
+# 신뢰도가 높으면 호모그래피로 정렬한 이미지를 Tripo에 업로드
+# (템플릿 폴더에 빈 도안 시트 스캔을 둔 경우에만 의미 있음)
+TEMPLATE_RECTIFY = os.getenv("TEMPLATE_RECTIFY", "0") == "1"
+
+# 3D 생성 방식: image(매번 image_to_model) 또는 texture(도안별 템플릿 메시에 texture_model)
+# texture 모드는 도안명이 필요하므로 Tripo task 생성이 Vision 결과를 기다린다
+GENERATION_MODE = os.getenv("GENERATION_MODE", "image").lower()
+# 도안(label 소문자) → 템플릿 메시 Tripo task ID (setup_meshes.py로 생성)
+TEMPLATE_MESH_TASKS = {
+    "spaceship": os.getenv("MESH_SPACESHIP_TASK_ID"),
+    "locket": os.getenv("MESH_LOCKET_TASK_ID"),
+    "single character": os.getenv("MESH_CHARACTER_TASK_ID"),
+}
+
+# 중복 캡처(더블 탭, 재촬영) 감지 시 기존 Tripo 업로드/생성 재사용
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+# 근접 중복(재촬영)이면 기존 Tripo 모델 재사용 (다른 아이의 모델을 줄 위험이 있어 기본은 끔)
+# 켜면 같은 도안명·이름인지 확인하기 위해 upload가 vision을 기다린다
+DEDUP_REUSE_MODELS = os.getenv("DEDUP_REUSE_MODELS", "0") == "1"
+
+# /get_latest_model?wait= 로 응답을 보류할 수 있는 최대 시간 (초, ngrok/프록시 타임아웃보다 짧게)
+LONG_POLL_MAX_WAIT = float(os.getenv("LONG_POLL_MAX_WAIT", "30"))
+# Unity 전달 방식: poll(/get_latest_model), push(Unity 수신 엔드포인트로 POST, 실패 시 poll), both
+DELIVERY_MODE = os.getenv("DELIVERY_MODE", "poll")
+# 완성된 GLB를 로컬 캐시에 저장하고 /models/{id}.glb로 제공 (0이면 Tripo CDN URL 그대로 전달)
+MODEL_CACHE_ENABLED = os.getenv("MODEL_CACHE_ENABLED", "1") == "1"
+# 캐시된 GLB의 임베드 텍스처를 줄여서 Unity 로드 시간 단축 (GLB_TEXTURE_MAX_SIZE, GLB_TEXTURE_QUALITY)
+GLB_OPTIMIZE = os.getenv("GLB_OPTIMIZE", "1") == "1"
+# 단순화한 LOD GLB를 함께 생성 (GLB_LOD_GRIDS, GLB_LOD_TEXTURE_SIZES)
+GLB_LODS = os.getenv("GLB_LODS", "1") == "1"
+# 텍스처만 전달: 완성 모델의 baseColor 텍스처(없으면 rendered_image)와 미리 받아둔 기본 메시 경로를 보냄
+# (texture_model 결과는 기본 메시의 UV를 그대로 쓰므로 프리팹에 텍스처만 입히면 됨)
+TEXTURE_ONLY = os.getenv("TEXTURE_ONLY", "0") == "1"
+# Unity가 접근할 이 서버의 주소 (비우면 ngrok 자동 감지 → localhost)
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "")
+# /task_events 스트림에서 이벤트가 없을 때 keepalive를 보내는 간격 (초)
+SSE_KEEPALIVE = float(os.getenv("SSE_KEEPALIVE", "15"))
 
 # --------------------------------------------------------
 # 🆕 Task 상태 저장소 (메모리)
 # --------------------------------------------------------
-processing_tasks = {}  # {task_id: {"status": "...", "progress": 0, "result": {...}}}
-model_queue = []  # Unity를 위한 완료된 모델 큐
+processing_tasks = TaskRegistry()  # 메모리 상의 작업 상태 (끝난 작업은 TTL 후 제거)
+model_queue = DeliveryLog()  # Unity를 위한 완료된 모델 전달 로그 (consumer별 cursor)
+# 재시작 후에도 이어서 처리할 수 있도록 작업 상태를 SQLite에도 기록
+task_store = TaskStore()
+# 작업 상태 변화를 /task_events(SSE) 구독자에게 전달
+task_events = TaskEventBus()
+
+
+async def on_pushed(payloads: list):
+    # both 모드는 폴링 큐의 consumer들이 받아야 전달 완료
+    if DELIVERY_MODE == "push":
+        for payload in payloads:
+            mark_delivered(payload, "push")
+
+
+async def on_push_failed(payloads: list):
+    # push 실패 → 폴링 큐로 전달 (both 모드는 이미 폴링 큐에 있음)
+    if DELIVERY_MODE == "push":
+        for payload in payloads:
+            await model_queue.publish(payload)
+
+
+# 생성 경로별 누적 소요 시간 (GENERATION_MODE 비교용, /queue_status)
+generation_stats = {}
+
+
+unity_pusher = UnityPusher(on_delivered=on_pushed, on_failure=on_push_failed)
+model_cache = ModelCache(media_type="model/gltf-binary")
+texture_cache = ModelCache(directory=os.path.join(os.path.dirname(__file__), "../data/cache/textures"), extension=".tex")
+glb_optimizer = GlbOptimizer()
 
 # --------------------------------------------------------
 # ⚙️ Ngrok URL 자동 감지
@@ -66,8 +179,11 @@ BASE_DIR = os.path.dirname(__file__)
 FRONTEND_DIR = os.path.join(BASE_DIR, "../frontend")
 UPLOAD_DIR = os.path.join(FRONTEND_DIR, "uploaded")
 DATA_DIR = os.path.join(BASE_DIR, "../data")
+# 원본 캡처 (재시작 시 재처리용): 정적 경로 밖에 두고, 작업이 끝나면 삭제
+CAPTURE_DIR = os.getenv("CAPTURE_DIR", os.path.join(BASE_DIR, "../captures"))
 
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+os.makedirs(CAPTURE_DIR, exist_ok=True)
 
 # 정적 파일 마운트
 app.mount("/static", StaticFiles(directory=FRONTEND_DIR), name="static")
@@ -79,10 +195,265 @@ async def serve_index():
     """index.html 기본 페이지"""
     return FileResponse(os.path.join(FRONTEND_DIR, "index.html"))
 
+# --------------------------------------------------------
+# 🧊 캐시된 GLB 제공 (Unity가 Tripo CDN 대신 LAN에서 다운로드)
+# --------------------------------------------------------
+@app.get("/models/{model_id}.glb")
+async def serve_model(model_id: str, request: Request):
+    """
+    model_id = GLB 내용의 SHA-256 (내용이 바뀌지 않으므로 영구 캐시 가능)
+
+    - If-None-Match가 일치하면 304
+    - Range 요청 지원 (이어받기), 서버가 지원하면 sendfile로 전송
+    """
+    path = model_cache.path(model_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="캐시에 없는 모델입니다.")
+    return cached_file_response(request, path, model_id, model_cache.media_type(model_id))
+
+
+def cached_file_response(request: Request, path: str, content_id: str, media_type: str) -> Response:
+    """
+    content-addressed 캐시 파일 응답 (내용의 SHA-256 = ETag, 영구 캐시)
+
+    If-None-Match가 ETag와 일치하거나 "*"이면 304
+    """
+    etag = f'"{content_id}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+@app.get("/textures/{texture_id}")
+async def serve_texture(texture_id: str, request: Request):
+    """TEXTURE_ONLY 모드의 아이 그림 텍스처 (model_id와 같은 방식의 SHA-256 주소)"""
+    path = texture_cache.path(texture_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="캐시에 없는 텍스처입니다.")
+    return cached_file_response(request, path, texture_id, texture_cache.media_type(texture_id))
+
 # --------------------------------------------------------
 # 🔧 모듈 초기화
 # --------------------------------------------------------
-tripo_client = Tripo3DClient()
+# 이벤트 루프를 막지 않도록 비동기 클라이언트 사용 (공유 커넥션 풀)
+tripo_client = AsyncTripo3DClient()
+# 모든 Tripo task 상태 조회를 하나의 루프에서 처리 (task별 sleep 루프 대체)
+tripo_poller = TripoTaskPoller(tripo_client)
+template_matcher = TemplateMatcher()
+# 재촬영한 같은 그림은 OpenAI 호출 없이 이전 OCR 결과 재사용
+vision_cache = VisionCache()
+# 중복 캡처는 새 3D 생성 없이 기존 Tripo task 재사용
+dedup_index = CaptureIndex()
+# 단계 종류별 동시 실행 수 제한 (Tripo 동시 생성 수 포함)
+job_scheduler = JobScheduler()
+
+# --------------------------------------------------------
+# 📈 메트릭 (/metrics, Prometheus 텍스트 형식)
+# 핫 패스에서는 카운터/히스토그램만 갱신하고, 큐 길이·캐시 통계는 수집 시점에 계산
+# --------------------------------------------------------
+stage_seconds = metrics.histogram("taone_stage_seconds", "파이프라인 단계별 소요 시간", ("stage",))
+stage_errors = metrics.counter("taone_stage_errors_total", "실패한 파이프라인 단계 수", ("stage",))
+task_seconds = metrics.histogram("taone_task_seconds", "캡처 하나의 전체 처리 시간 (/analyze → 전달)")
+tasks_finished = metrics.counter("taone_tasks_finished_total", "끝난 작업 수", ("status",))
+tasks_in_flight = metrics.gauge("taone_tasks_in_flight", "처리 중인 작업 수")
+unity_polls = metrics.counter(
+    "taone_unity_polls_total", "/get_latest_model 요청 수 (result: hit/empty)", ("consumer", "result")
+)
+unity_acks = metrics.counter("taone_unity_acks_total", "/ack_model 확인 수", ("consumer",))
+
+metrics.gauge("taone_tasks", "메모리에 있는 작업 수 (상태별)", ("status",)).set_function(
+    lambda: {(status,): count for status, count in processing_tasks.counts().items()}
+)
+metrics.gauge("taone_scheduler_jobs", "스케줄러에 등록된 작업 수").set_function(
+    lambda: job_scheduler.stats()["jobs"]
+)
+metrics.gauge("taone_scheduler_active", "워커 풀별 실행 중인 단계 수", ("pool",)).set_function(
+    lambda: {(name,): pool["active"] for name, pool in job_scheduler.stats()["pools"].items()}
+)
+metrics.gauge("taone_scheduler_waiting", "워커 풀별 슬롯 대기 중인 단계 수", ("pool",)).set_function(
+    lambda: {(name,): pool["waiting"] for name, pool in job_scheduler.stats()["pools"].items()}
+)
+metrics.gauge("taone_tripo_watching", "완료를 기다리는 Tripo task 수").set_function(
+    lambda: tripo_poller.stats()["watching"]
+)
+metrics.gauge("taone_delivery_retained", "전달 로그에 보관 중인 모델 수").set_function(
+    lambda: model_queue.stats()["retained"]
+)
+metrics.gauge("taone_delivery_lag", "consumer별 아직 받지 않은 모델 수 (model_queue 깊이)", ("consumer",)).set_function(
+    lambda: {(name,): state["lag"] for name, state in model_queue.stats()["consumers"].items()}
+)
+metrics.gauge("taone_delivery_pending", "consumer별 ack 대기 중인 모델 수", ("consumer",)).set_function(
+    lambda: {(name,): state["pending"] for name, state in model_queue.stats()["consumers"].items()}
+)
+metrics.counter("taone_unity_pushed_total", "Unity로 push 전달한 모델 수").set_function(
+    lambda: unity_pusher.stats()["delivered"]
+)
+metrics.counter("taone_unity_push_fallbacks_total", "push 실패로 폴링 큐로 넘긴 모델 수").set_function(
+    lambda: unity_pusher.stats()["fallbacks"]
+)
+metrics.gauge("taone_vision_cache_entries", "Vision 캐시 항목 수").set_function(
+    lambda: vision_cache.stats()["entries"]
+)
+metrics.counter("taone_vision_cache_lookups_total", "Vision 캐시 조회 수 (result: hit/near_hit/miss)", ("result",)).set_function(
+    lambda: {(result,): vision_cache.stats()[key] for result, key in
+             (("hit", "hits"), ("near_hit", "near_hits"), ("miss", "misses"))}
+)
+metrics.gauge("taone_model_cache_bytes", "GLB 캐시 사용량 (바이트)").set_function(
+    lambda: model_cache.stats()["bytes"]
+)
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus 수집용 메트릭 (텍스트 형식)"""
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+# --------------------------------------------------------
+# 🧵 작업별 span 트레이스 (/trace, Chrome trace-event JSON)
+# 작업마다 단계·슬롯 대기·Tripo/OpenAI 호출 구간을 기록해 한 작업이 어디서 시간을 쓰는지 확인
+# --------------------------------------------------------
+loop_monitor = tracing.LoopStallMonitor(tracing.tracer)
+
+
+@app.get("/trace")
+async def trace_endpoint(seconds: float = None, task_id: str = None):
+    """
+    최근 span을 Chrome trace-event JSON으로 반환 (Perfetto / chrome://tracing에서 열기)
+
+    seconds: 최근 몇 초만 (없으면 보관 중인 전체)
+    task_id: 쉼표로 구분한 작업 ID (없으면 전체 작업 + poller/이벤트 루프 트랙)
+    """
+    tracks = {t.strip() for t in task_id.split(",") if t.strip()} if task_id else None
+    trace = await asyncio.to_thread(tracing.tracer.export, seconds, tracks)
+    return Response(
+        json.dumps(trace, ensure_ascii=False),
+        media_type="application/json",
+        headers={"Content-Disposition": f'inline; filename="trace-{int(time.time())}.json"'},
+    )
+
+
+@app.on_event("startup")
+async def load_templates():
+    """도안 템플릿 특징점 미리 계산, 캐시 로드 및 Unity 전달 준비"""
+    global PUBLIC_BASE_URL
+    if TEMPLATE_MATCH:
+        await asyncio.to_thread(template_matcher.load)
+    await asyncio.to_thread(vision_cache.open)
+    if DEDUP_ENABLED:
+        await asyncio.to_thread(dedup_index.open)
+    if DELIVERY_MODE in ("push", "both"):
+        unity_pusher.start()
+    loop_monitor.start()
+    if MODEL_CACHE_ENABLED:
+        await asyncio.to_thread(model_cache.open)
+        if TEXTURE_ONLY:
+            await asyncio.to_thread(texture_cache.open)
+        if not PUBLIC_BASE_URL:
+            PUBLIC_BASE_URL = await asyncio.to_thread(get_ngrok_url)
+        PUBLIC_BASE_URL = PUBLIC_BASE_URL.rstrip("/")
+
+
+@app.on_event("startup")
+async def resume_unfinished_tasks():
+    """
+    재시작 전 작업 복구
+    - 완료됐지만 Unity가 가져가지 않은 모델 → Unity 큐에 다시 추가
+    - 진행 중이던 작업 → 마지막 완료 단계부터 이어서 처리 (Tripo task에 다시 연결)
+    """
+    await asyncio.to_thread(task_store.open)
+
+    for record in await asyncio.to_thread(task_store.undelivered):
+        # 재시작 전에 아직 받지 않은 consumer에게만 다시 전달
+        deliveries = record["deliveries"] or {}
+        remaining = set(deliveries.get("expected", ())) - set(deliveries.get("received", ()))
+        model_queue.append(record["payload"], recipients=sorted(remaining) or None)
+        print(f"[Resume] 📦 미전달 모델 Unity 큐 복구: {record['task_id']}")
+
+    unfinished = await asyncio.to_thread(task_store.unfinished)
+    for record in unfinished:
+        task_id = record["task_id"]
+        checkpoints = record["checkpoints"] or {}
+
+        image_bytes = None
+        if record["image_path"]:
+            image_bytes = await asyncio.to_thread(read_original, record["image_path"])
+
+        if image_bytes is None and not ("vision" in checkpoints and "create_task" in checkpoints):
+            task_store.defer(task_store.update, task_id, status="error", error="재시작 후 원본 이미지를 찾을 수 없습니다")
+            print(f"[Resume] ❌ Task {task_id} 복구 불가 (원본 이미지 없음)")
+            continue
+
+        processing_tasks.add(
+            task_id,
+            progress=record["progress"],
+            result=record["result"],
+            start_time=record["created_at"],
+        )
+        job_scheduler.submit(task_id, process_image_in_background(task_id, image_bytes, resume=checkpoints))
+        print(f"[Resume] 🔁 Task {task_id} 이어서 처리 (마지막 완료 단계: {record['stage'] or '없음'}, "
+              f"Tripo task: {record['tripo_task_id'] or '없음'})")
+
+    # 원본을 지우기 전에 서버가 멈춘 끝난 작업 정리
+    await asyncio.to_thread(prune_originals, {record["task_id"] for record in unfinished})
+
+
+def read_original(path: str) -> bytes:
+    """저장해 둔 원본 캡처 (없으면 None)"""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def original_paths(directory: str) -> dict:
+    """{task_id: [원본 경로]} (파일명: {task_id}_original.{ext})"""
+    found = {}
+    for name in os.listdir(directory):
+        if "_original" in name:
+            found.setdefault(name.split("_original")[0], []).append(os.path.join(directory, name))
+    return found
+
+
+def remove_original(task_id: str):
+    """끝난(완료/실패) 작업의 원본 캡처 삭제 (재시작 시 재처리에만 쓰임)"""
+    # 이전 버전은 원본을 UPLOAD_DIR(/static/uploaded)에 저장했음
+    for directory in (CAPTURE_DIR, UPLOAD_DIR):
+        for path in original_paths(directory).get(task_id, []):
+            os.remove(path)
+
+
+def prune_originals(keep: set):
+    """진행 중(keep)이 아닌 작업의 원본 캡처 삭제"""
+    removed = 0
+    for directory in (CAPTURE_DIR, UPLOAD_DIR):
+        for task_id, paths in original_paths(directory).items():
+            if task_id not in keep:
+                for path in paths:
+                    os.remove(path)
+                    removed += 1
+    if removed:
+        print(f"[Resume] 🗑️ 끝난 작업의 원본 캡처 {removed}개 삭제")
+
+
+@app.on_event("shutdown")
+async def close_vision_cache():
+    await asyncio.to_thread(vision_cache.close)
+    await asyncio.to_thread(dedup_index.close)
+
+
+@app.on_event("shutdown")
+async def shutdown_http_clients():
+    """진행 중인 작업, 폴링 루프 및 공유 HTTP 커넥션 풀 정리"""
+    await job_scheduler.close()
+    await unity_pusher.close()
+    await loop_monitor.close()
+    glb_optimizer.close()
+    await tripo_poller.close()
+    await close_http_clients()
+    await asyncio.to_thread(task_store.close)
 
 # --------------------------------------------------------
 # 🆕 Task 상태 확인 엔드포인트
@@ -99,76 +470,262 @@ async def task_status(task_id: str):
         "progress": 45,          // 0-100
         "result": {...},         // status="done"일 때만
         "error": "...",          // status="error"일 때만
+        "stage_timings": {...},  // 단계별 시작/종료/소요 시간 (초)
+        "queue": {"pool": "tripo_wait", "position": 3, "waiting": 7},  // 워커 슬롯 대기 중일 때만
     }
     """
-    if task_id not in processing_tasks:
+    return await load_task_snapshot(task_id)
+
+
+async def load_task_snapshot(task_id: str) -> dict:
+    """작업의 현재 상태 (/task_status 응답 및 /task_events 첫 이벤트)"""
+    snapshot = task_snapshot(task_id)
+    if snapshot is not None:
+        return snapshot
+
+    # 메모리에 없으면 저장소 확인 (재시작 이전에 끝났거나 메모리에서 제거된 작업)
+    record = await asyncio.to_thread(task_store.get, task_id)
+    if record:
         return {
             "task_id": task_id,
-            "status": "not_found",
-            "progress": 0,
-            "result": None,
-            "error": "Task not found"
+            "status": record["status"],
+            "progress": record["progress"],
+            "result": record["result"],
+            "error": record["error"],
+            "stage_timings": (record["result"] or {}).get("stage_timings"),
+            "queue": None,
         }
+    return {
+        "task_id": task_id,
+        "status": "not_found",
+        "progress": 0,
+        "result": None,
+        "error": "Task not found"
+    }
+
+
+def task_snapshot(task_id: str) -> dict:
+    """메모리에 있는 작업의 현재 상태 (없으면 None)"""
+    task = processing_tasks.get(task_id)
+    if task is None:
+        return None
 
-    task = processing_tasks[task_id]
     return {
         "task_id": task_id,
-        "status": task["status"],
-        "progress": task["progress"],
-        "result": task["result"],
-        "error": task["error"],
+        "status": task.status,
+        "progress": task.progress,
+        "result": task.result,
+        "error": task.error,
+        "stage_timings": task.stage_timings,
+        "queue": job_scheduler.queue_info(task_id),
     }
 
+# --------------------------------------------------------
+# 📡 Task 진행 상황 스트림 (SSE)
+# --------------------------------------------------------
+@app.get("/task_events")
+async def task_events_stream(request: Request, task_id: str):
+    """
+    작업 상태가 바뀔 때마다 push하는 Server-Sent Events 스트림
+    (/task_status 폴링 대신 EventSource로 구독)
+
+    task_id: 하나 또는 쉼표로 구분한 여러 개
+
+    이벤트:
+        status: /task_status와 같은 형식 (연결 직후 현재 상태 + 변경될 때마다)
+        stage:  {"task_id", "stage", "state": "start"|"end", "duration", "error"}
+        end:    구독한 작업이 모두 끝남 (서버가 스트림을 닫음)
+    """
+    task_ids = list(dict.fromkeys(t.strip() for t in task_id.split(",") if t.strip()))
+    if not task_ids:
+        raise HTTPException(status_code=400, detail="task_id가 필요합니다.")
+
+    async def stream():
+        with task_events.subscribe(task_ids) as queue:
+            # EventSource 재연결 간격 (ms)
+            yield "retry: 3000\n\n"
+            pending = set()
+            for tid in task_ids:
+                snapshot = await load_task_snapshot(tid)
+                yield format_sse("status", snapshot)
+                if snapshot["status"] not in ("done", "error", "not_found"):
+                    pending.add(tid)
+
+            while pending:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    # 프록시(ngrok)가 유휴 연결을 끊지 않도록 주석 한 줄
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event, data)
+                if event == "status" and data["status"] in ("done", "error"):
+                    pending.discard(data["task_id"])
+
+            yield format_sse("end", {"task_ids": task_ids})
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # --------------------------------------------------------
 # 🆕 모든 처리 중인 Task 확인 (디버깅용)
 # --------------------------------------------------------
 @app.get("/processing_tasks")
-async def get_processing_tasks():
-    """현재 처리 중인 모든 Task 확인"""
-    tasks_summary = {}
-    for task_id, task_info in processing_tasks.items():
-        tasks_summary[task_id] = {
-            "status": task_info["status"],
-            "progress": task_info["progress"],
-        }
+async def get_processing_tasks(offset: int = 0, limit: int = 50, status: str = None):
+    """
+    메모리에 있는 Task 확인 (오래된 순, 페이지 단위)
+
+    예: /processing_tasks?status=processing&offset=0&limit=50
+    """
+    limit = min(max(limit, 1), 500)
+    tasks = processing_tasks.page(offset, limit, status)
     return {
         "total": len(processing_tasks),
-        "tasks": tasks_summary,
+        "counts": processing_tasks.counts(),
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + limit if len(tasks) == limit else None,
+        "tasks": [task.summary() for task in tasks],
+        "registry": processing_tasks.stats(),
     }
 
+# --------------------------------------------------------
+# 🛰️ Tripo 폴러 상태 확인 (디버깅용)
+# --------------------------------------------------------
+@app.get("/poller_status")
+async def poller_status():
+    """Tripo task 폴러가 감시 중인 task와 누적 조회 수 확인"""
+    return tripo_poller.stats()
+
+# --------------------------------------------------------
+# 🧵 작업 스케줄러 상태 확인 (디버깅용)
+# --------------------------------------------------------
+@app.get("/scheduler_status")
+async def scheduler_status():
+    """단계 종류별 워커 풀 사용량과 대기열 길이 확인"""
+    return job_scheduler.stats()
+
+# --------------------------------------------------------
+# ♻️ Vision 캐시 상태 확인 (디버깅용)
+# --------------------------------------------------------
+@app.get("/vision_cache_status")
+async def vision_cache_status():
+    """Vision OCR 캐시 히트/미스 카운터 확인"""
+    return vision_cache.stats()
+
 # --------------------------------------------------------
 # 🆕 Unity 폴링 엔드포인트
 # --------------------------------------------------------
+def mark_delivered(data: dict, consumer: str, delivery_id: int = None):
+    """
+    저장소에 consumer의 수신 기록 (재시작 시 다시 큐에 넣지 않도록)
+
+    모델을 받아야 하는 consumer 전원이 받았을 때만 전달 완료로 기록하므로,
+    한 디스플레이가 받았다고 나머지 디스플레이의 모델이 사라지지 않는다.
+    """
+    if not data.get("capture_id"):
+        return
+    recipients = model_queue.mark_delivered(consumer, delivery_id) if delivery_id is not None else []
+    task_store.defer(task_store.mark_delivered, data["capture_id"], consumer, recipients or [])
+
+
 @app.get("/get_latest_model")
-async def get_latest_model():
+async def get_latest_model(
+    request: Request,
+    consumer: str = None,
+    label: str = None,
+    auto_ack: bool = None,
+    wait: float = 0.0,
+    replay: bool = False,
+):
     """
     Unity가 주기적으로 호출하는 엔드포인트.
     큐에 데이터가 있으면 반환하고, 없으면 빈 응답.
+
+    consumer: Unity 인스턴스 이름 (인스턴스마다 모든 모델을 각자 받음)
+              생략하면 기존처럼 "default" consumer로 받고 바로 ack 처리
+    label: 받을 도안 (쉼표로 여러 개, 예: "spaceship,locket")
+    auto_ack: false면 /ack_model로 확인해야 하며, 안 하면 일정 시간 후 다시 전달
+              (consumer를 지정한 경우 기본값 false)
+    wait: 0보다 크면 모델이 생길 때까지 최대 wait초 동안 응답을 보류 (long-poll)
+          → Unity는 응답을 받자마자 다시 요청하면 되고, 빈 응답 폴링이 사라짐
+    replay: 처음 연결하는 consumer가 보관 중인 모델(최대 DELIVERY_RETENTION_SECONDS)을
+            처음부터 다시 받을 때 true (기본은 연결 이후 모델만 받음)
     """
-    if len(model_queue) > 0:
-        data = model_queue.pop(0)  # FIFO (First In First Out)
-        print(f"[Unity Queue] ✅ 모델 데이터 전달: {data['label']} - {data['child_name']}")
-        return {"has_data": True, "data": data}
-    else:
+    if auto_ack is None:
+        auto_ack = consumer is None
+    consumer = consumer or DEFAULT_CONSUMER
+    labels = {name.strip() for name in label.split(",") if name.strip()} if label is not None else None
+    wait = min(max(wait, 0.0), LONG_POLL_MAX_WAIT)
+
+    delivery = await model_queue.wait_poll(consumer, labels=labels, auto_ack=auto_ack, timeout=wait, replay=replay)
+    unity_polls.inc(consumer=consumer, result="empty" if delivery is None else "hit")
+    if delivery is None:
         # 큐가 비어있음 (정상 상태)
         return {"has_data": False, "data": None}
 
+    delivery_id, data = delivery
+    if wait and await request.is_disconnected():
+        # 기다리는 동안 Unity 연결이 끊김 → 다음 요청에서 다시 받도록 되돌림
+        model_queue.release(consumer, delivery_id, auto_ack=auto_ack)
+        return {"has_data": False, "data": None}
+    if auto_ack:
+        mark_delivered(data, consumer, delivery_id)
+    print(f"[Unity Queue] ✅ 모델 데이터 전달 ({consumer}, #{delivery_id}): {data['label']} - {data['child_name']}")
+    return {"has_data": True, "data": delivery_payload(data), "delivery_id": delivery_id, "consumer": consumer}
+
+
+@app.post("/ack_model")
+async def ack_model(delivery_id: int, consumer: str = DEFAULT_CONSUMER):
+    """Unity가 모델을 받아 처리했음을 확인 (ack하지 않으면 다시 전달됨)"""
+    data = model_queue.ack(consumer, delivery_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="ack 대기 중인 전달이 아닙니다.")
+    mark_delivered(data, consumer, delivery_id)
+    unity_acks.inc(consumer=consumer)
+    return {"status": "ok", "delivery_id": delivery_id, "consumer": consumer}
+
 # --------------------------------------------------------
 # 📊 큐 상태 확인 엔드포인트 (디버깅용)
 # --------------------------------------------------------
 @app.get("/queue_status")
 async def queue_status():
-    """현재 큐에 대기 중인 모델 수 확인 (디버깅용)"""
+    """보관 중인 모델과 consumer별 진행 상황 확인 (디버깅용)"""
+    stats = model_queue.stats()
     return {
-        "queue_length": len(model_queue),
+        "queue_length": stats["consumers"][DEFAULT_CONSUMER]["lag"],
+        "retained": stats["retained"],
         "models": [
             {
+                "delivery_id": seq,
                 "label": m["label"],
                 "child_name": m["child_name"],
                 "task_id": m["task_id"]
             }
-            for m in model_queue
-        ]
+            for seq, m in model_queue.peek()
+        ],
+        "delivery": stats,
+        "push": unity_pusher.stats(),
+        "model_cache": model_cache.stats(),
+        "glb_optimizer": glb_optimizer.stats(),
+        "texture_cache": texture_cache.stats() if TEXTURE_ONLY else None,
+        "trace": dict(tracing.tracer.stats(), loop_stalls=loop_monitor.stalls),
+        "generation": {
+            "mode": GENERATION_MODE,
+            "paths": {
+                path: {
+                    "count": totals["count"],
+                    "avg_total_seconds": round(totals["total_seconds"] / totals["count"], 2),
+                    "avg_tripo_seconds": round(totals["tripo_seconds"] / totals["count"], 2),
+                }
+                for path, totals in generation_stats.items()
+            },
+        },
     }
 
 # --------------------------------------------------------
@@ -177,9 +734,7 @@ async def queue_status():
 @app.post("/clear_queue")
 async def clear_queue():
     """큐를 비웁니다 (개발/디버깅용)"""
-    global model_queue
-    cleared_count = len(model_queue)
-    model_queue = []
+    cleared_count = model_queue.clear()
     print(f"[Unity Queue] 🗑️ 큐 초기화: {cleared_count}개 항목 제거")
     return {"status": "ok", "cleared_count": cleared_count}
 
@@ -187,9 +742,11 @@ async def clear_queue():
 # 📸 /analyze 엔드포인트
 # --------------------------------------------------------
 @app.post("/analyze")
-async def analyze(file: UploadFile = File(...), background_tasks: BackgroundTasks = None):
+async def analyze(file: UploadFile = File(...), priority: int = 0):
     """
-    ⚡ 비동기 이미지 분석 (즉시 반환, 백그라운드에서 처리)
+    ⚡ 비동기 이미지 분석 (즉시 반환, 작업 스케줄러에서 처리)
+
+    priority: 클수록 먼저 처리 (같으면 도착 순서)
 
     응답:
     {
@@ -200,31 +757,36 @@ async def analyze(file: UploadFile = File(...), background_tasks: BackgroundTask
     }
     """
 
+    # 대기 작업이 너무 많으면 거절 (Tripo 한도를 넘는 적체 방지)
+    if job_scheduler.is_full():
+        raise HTTPException(status_code=503, detail="작업 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.")
+
     # 고유한 task_id 생성
     task_id = str(uuid.uuid4())
 
     # 이미지 읽기
     image_bytes = await file.read()
 
+    # 원본 저장 (재시작 시 재처리용)
+    extension = os.path.splitext(file.filename or "")[1] or ".jpg"
+    image_path = os.path.join(CAPTURE_DIR, f"{task_id}_original{extension}")
+
+    def save_original():
+        with open(image_path, "wb") as f:
+            f.write(image_bytes)
+        task_store.create(task_id, image_path=image_path)
+
+    await asyncio.to_thread(save_original)
+
     # Task 상태 초기화
-    processing_tasks[task_id] = {
-        "status": "queued",
-        "progress": 0,
-        "result": None,
-        "error": None,
-        "start_time": time.time(),
-    }
+    processing_tasks.add(task_id)
 
     print(f"\n{'='*80}")
     print(f"📥 [QUEUE] Task {task_id} 큐에 추가됨")
     print(f"{'='*80}")
 
-    # 🔥 백그라운드 작업 추가 (즉시 반환!)
-    background_tasks.add_task(
-        process_image_in_background,
-        task_id=task_id,
-        image_bytes=image_bytes
-    )
+    # 🔥 스케줄러에 작업 등록 (즉시 반환! 각 단계는 워커 슬롯이 나면 실행)
+    job_scheduler.submit(task_id, process_image_in_background(task_id, image_bytes), priority=priority)
 
     # ✅ 즉시 반환 (0.5초)
     return {
@@ -235,125 +797,727 @@ async def analyze(file: UploadFile = File(...), background_tasks: BackgroundTask
     }
 
 
-async def process_image_in_background(task_id: str, image_bytes: bytes):
-    """
-    🔄 백그라운드에서 이미지 처리 (병렬로 여러 개 동시 실행)
+def encode_for_tripo(transform: ImageTransform) -> bytes:
+    """Tripo 업로드 포맷으로 한 번만 인코딩"""
+    transform = transform.convert("RGB")
+    if TRIPO_UPLOAD_FORMAT in ("jpg", "jpeg"):
+        return transform.encode("JPEG", quality=TRIPO_UPLOAD_JPEG_QUALITY)
+    return transform.encode(TRIPO_UPLOAD_FORMAT.upper())
+
+
+def prepare_capture_images(image_bytes: bytes) -> dict:
     """
-    try:
-        start_time = time.time()
-        print(f"\n{'='*80}")
-        print(f"🔄 [PROCESS] Task {task_id} 처리 시작")
-        print(f"{'='*80}")
+    업로드 이미지를 한 번만 디코드해서 각 소비자용 결과를 생성 (CPU 작업, 스레드에서 실행)
 
-        # 상태 업데이트: 처리 중
-        processing_tasks[task_id]["status"] = "processing"
-        processing_tasks[task_id]["progress"] = 5
-
-        # 1️⃣ 이미지 회전 (90도 시계방향, 크로핑 없음)
-        print(f"[Rotate] Task {task_id} 이미지 회전 중 (시계방향 90도)...")
-        rotated_bytes = crop_top_section(image_bytes, ratio=0, rotate_cw=90)  # 회전만!
-        print(f"[Rotate] ✅ 회전 완료")
-
-        processing_tasks[task_id]["progress"] = 10
-
-        # 2️⃣ Vision 모델로 도안명 & 어린이 이름 추출 (회전된 이미지로!)
-        print(f"[Vision] Task {task_id} Vision 분석 중 (회전된 이미지)...")
-        image_b64 = base64.b64encode(rotated_bytes).decode("utf-8")  # ← 회전된 이미지!
-        vision_result = analyze_drawing_text(image_b64)
-        design = vision_result.get("design", "Unknown")
-        child_name = vision_result.get("child_name", "Unknown")
-        print(f"[Vision] ✅ 도안: {design}, 이름: {child_name}")
-
-        # 🆕 Vision 결과를 즉시 저장 (프론트에서 폴링할 때 보여주기 위함)
-        processing_tasks[task_id]["progress"] = 15
-        processing_tasks[task_id]["result"] = {
-            "label": design,
-            "child_name": child_name,
-            "model_url": None,
-            "processing_time": None,
+    Returns:
+        {
+            "vision_b64": Vision용 헤더 띠 JPEG base64,
+            "upload_bytes": Tripo 업로드용 bytes,
+            "header": 헤더 감지 결과,
+            "template": 템플릿 매칭 결과 (비활성화 시 None),
         }
-        print(f"[Task] Task {task_id} 임시 결과 저장: {design}, {child_name}")
+    """
+    oriented = ImageTransform(image_bytes, max_decode_side=IMAGE_DECODE_MAX_SIDE).rotate_cw(CAPTURE_ROTATE_CW)
+    width, height = oriented.size
+
+    # 헤더(손글씨) 영역 경계 감지: 행 투영 프로파일 (실패 시 고정 비율)
+    if HEADER_DETECT:
+        header = detect_header_boundary(oriented.resize_to_fit(512).render(), fallback_ratio=HEADER_CROP_RATIO)
+    else:
+        header = {"orientation": "landscape" if width > height else "portrait",
+                  "ratio": HEADER_CROP_RATIO, "method": "fixed"}
+
+    length = width if header["orientation"] == "landscape" else height
+    header_pixels = min(int(length * header["ratio"]), int(length * 0.5))
+    header["pixels"] = header_pixels
+
+    # Vision: 헤더 띠만 토큰 예산에 맞게 축소해서 JPEG로
+    if header["orientation"] == "landscape":
+        strip = oriented.crop((0, 0, header_pixels, height))
+    else:
+        strip = oriented.crop((0, 0, width, header_pixels))
+    strip = strip.resize(fit_to_token_budget(strip.size, VISION_TOKEN_BUDGET, VISION_DETAIL))
+    vision_b64 = strip.to_base64("JPEG", quality=VISION_JPEG_QUALITY)
+    header["vision_size"] = strip.size
+    # Vision 캐시 키: OpenAI가 실제로 보는 입력 그대로의 SHA-256 + 재촬영 근접 일치용 헤더 pHash
+    vision_key = sha256_hex(vision_b64.encode("ascii"))
+    header_hash = phash(strip.render())
+
+    # 로컬 템플릿 매칭으로 도안 분류
+    template = None
+    if TEMPLATE_MATCH:
+        # 매칭 해상도로 먼저 축소 (원본 해상도 전체를 그레이스케일로 렌더링하지 않음)
+        small = oriented.resize_to_fit(template_matcher.max_side)
+        template = template_matcher.match(np.asarray(small.convert("L").render()))
+        if template["homography"] is not None and small.size != oriented.size:
+            # 호모그래피를 원본 캡처 좌표 기준으로 (rectify는 원본 해상도에 적용)
+            scale = small.size[0] / oriented.size[0]
+            template["homography"] = template["homography"] @ np.diag([scale, scale, 1.0])
+
+    # Tripo: 신뢰도 높은 매칭이면 시트 정렬 이미지, 아니면 같은 헤더 경계로 크롭
+    if TEMPLATE_RECTIFY and template and template["confidence"] >= TEMPLATE_MATCH_CONFIDENCE:
+        rgb = np.asarray(oriented.convert("RGB").render())
+        rectified = Image.fromarray(TemplateMatcher.rectify(rgb, template))
+        drawing = ImageTransform.from_image(rectified)
+    else:
+        drawing = oriented.crop_top(orientation=header["orientation"], pixels=header_pixels)
+    upload_bytes = encode_for_tripo(drawing)
+    # 중복 감지 키: 업로드 bytes의 SHA-256 (정확히 일치) + 그림 영역 pHash·색 시그니처 (근접 일치)
+    thumbnail = drawing.resize_to_fit(256).render()
+    drawing_hash = phash(thumbnail)
+    drawing_color = color_signature(thumbnail)
+
+    if template:
+        # JSON 직렬화를 위해 행렬은 결과에서 제외
+        template = {k: v for k, v in template.items() if k != "homography"}
+
+    return {
+        "vision_b64": vision_b64,
+        "upload_bytes": upload_bytes,
+        "header": header,
+        "vision_key": vision_key,
+        "header_hash": header_hash,
+        "drawing_hash": drawing_hash,
+        "drawing_color": drawing_color,
+        "sha256": sha256_hex(upload_bytes),
+        "template": template,
+    }
+
+
+def update_task(task_id: str, **fields):
+    """작업 상태 갱신 (메모리 즉시 + 저장소는 쓰기 스레드에서)"""
+    processing_tasks.update(task_id, **fields)
+    persistent = {k: v for k, v in fields.items() if k in ("status", "progress", "result", "error")}
+    if persistent:
+        task_store.defer(task_store.update, task_id, **persistent)
+        snapshot = task_snapshot(task_id)
+        if snapshot is not None:
+            task_events.publish(task_id, "status", snapshot)
+
+
+def set_progress(task_id: str, progress: int):
+    """진행률 갱신 (병렬 단계가 서로 덮어쓰지 않도록 증가만 허용)"""
+    task = processing_tasks.get(task_id)
+    if task is not None and progress > task.progress:
+        update_task(task_id, progress=progress)
+
+
+# --------------------------------------------------------
+# 🧱 파이프라인 단계 정의
+#
+#   prepare ─┬─ vision ─────────────────────────────────────┐
+#            ├─ save_debug                                   │
+#            └─ upload ── create_task ── wait ── download ───┴─ enqueue
+#
+# Vision OCR은 업로드/Tripo task 생성과 동시에 진행되므로
+# 3D 생성 시작까지의 경로에서 Vision 대기 시간이 빠진다.
+# (GENERATION_MODE=texture면 create_task가 도안명을 위해 vision도 기다린다)
+# (DEDUP_REUSE_MODELS=1이면 upload가 이름 확인을 위해 vision을 기다린다)
+# --------------------------------------------------------
+async def stage_prepare(ctx: dict) -> dict:
+    """1️⃣ 한 번만 디코드해서 Vision 입력과 Tripo 업로드 이미지를 함께 생성"""
+    task_id = ctx["task_id"]
+    resume = ctx["resume"]
+    if ctx["image_bytes"] is None or ("vision" in resume and "create_task" in resume):
+        # 재개된 작업: 이미지가 필요한 단계가 모두 끝났음
+        return None
+    print(f"[Image] Task {task_id} 이미지 변환 중 (시계방향 {CAPTURE_ROTATE_CW}도 회전 + 헤더 감지/크롭)...")
+    capture = await asyncio.to_thread(prepare_capture_images, ctx["image_bytes"])
+    header = capture["header"]
+    print(f"[Image] ✅ 헤더 경계: {header['pixels']}px ({header['ratio'] * 100:.1f}%, {header['method']}), "
+          f"Vision 입력 {header['vision_size'][0]}x{header['vision_size'][1]}px")
+    print(f"[Image] ✅ 변환 완료 (업로드 {len(capture['upload_bytes']) / 1024:.1f} KB, {TRIPO_UPLOAD_FORMAT})")
+
+    template = capture["template"]
+    if template:
+        print(f"[Template] 도안 매칭: {template['design']} (신뢰도 {template['confidence']:.2f}, "
+              f"inlier {template['inliers']}, {template['elapsed_ms']:.0f}ms)")
+
+    set_progress(task_id, 10)
+    return capture
+
+
+async def stage_vision(ctx: dict) -> dict:
+    """2️⃣ 도안명 & 어린이 이름 추출 (템플릿 매칭 → 캐시 → Vision 순)"""
+    task_id = ctx["task_id"]
+    if "vision" in ctx["resume"]:
+        vision = ctx["resume"]["vision"]
+        print(f"[Vision] ♻️ 재시작 전 결과 사용: {vision['design']}, {vision['child_name']}")
+        return vision
+
+    capture = ctx["results"]["prepare"]
+    template = capture["template"]
+    matched = bool(template and template["design"] and template["confidence"] >= TEMPLATE_MATCH_CONFIDENCE)
+
+    if matched and VISION_SKIP_ON_MATCH:
+        print(f"[Vision] ⏭️ 템플릿 매칭 신뢰도가 높아 Vision 생략")
+        vision_result = {"design": template["design"], "child_name": "Unknown"}
+    else:
+        # 근접 일치는 헤더 pHash + 그림 영역 pHash·색 시그니처가 모두 가까울 때만 (다른 아이 이름 방지)
+        signature = (capture["header_hash"], capture["drawing_hash"], capture["drawing_color"])
+        vision_result = await asyncio.to_thread(vision_cache.get, capture["vision_key"], *signature)
+        if vision_result:
+            print(f"[Vision] ♻️ 캐시 히트 (같은 시트를 이전에 분석함)")
+        else:
+            print(f"[Vision] Task {task_id} Vision 분석 중 (헤더 영역)...")
+            # OpenAI 클라이언트는 동기식이므로 스레드에서 실행 (이벤트 루프 블로킹 방지)
+            vision_result = await asyncio.to_thread(analyze_drawing_text, capture["vision_b64"], VISION_DETAIL)
+            if vision_result.get("design") != "Unknown" or vision_result.get("child_name") != "Unknown":
+                await asyncio.to_thread(vision_cache.put, capture["vision_key"], vision_result, *signature)
+
+    # 도안명은 신뢰도 높은 템플릿 매칭 결과 우선, 이름은 Vision 결과 사용
+    design = template["design"] if matched else vision_result.get("design", "Unknown")
+    child_name = vision_result.get("child_name", "Unknown")
+    print(f"[Vision] ✅ 도안: {design}, 이름: {child_name}")
 
-        # 3️⃣ 이미지 크로핑 (회전된 이미지에서 텍스트 부분 제거)
-        print(f"[Crop] Task {task_id} 이미지 크로핑 중 (상단 15% 제거)...")
-        cropped_bytes = crop_top_section(rotated_bytes, ratio=0.15, rotate_cw=0)  # 이미 회전됨, 크로핑만!
-        print(f"[Crop] ✅ 크로핑 완료")
+    # 🆕 Vision 결과를 즉시 저장 (프론트에서 폴링할 때 보여주기 위함)
+    update_task(task_id, result={
+        "label": design,
+        "child_name": child_name,
+        "model_url": None,
+        "processing_time": None,
+    })
+    print(f"[Task] Task {task_id} 임시 결과 저장: {design}, {child_name}")
+    set_progress(task_id, 15)
+    return {"design": design, "child_name": child_name}
 
-        processing_tasks[task_id]["progress"] = 18
 
-        # 크로핑된 이미지 저장 (디버깅용)
-        debug_crop_path = os.path.join(UPLOAD_DIR, f"{task_id}_cropped.jpg")
+async def stage_save_debug(ctx: dict) -> str:
+    """크로핑된 이미지 저장 (디버깅용)"""
+    capture = ctx["results"]["prepare"]
+    if capture is None:
+        return None
+    debug_crop_path = os.path.join(UPLOAD_DIR, f"{ctx['task_id']}_cropped.{TRIPO_UPLOAD_FORMAT}")
+
+    def write():
         with open(debug_crop_path, "wb") as f:
-            f.write(cropped_bytes)
-        print(f"[Crop] 💾 크로핑된 이미지 저장: {debug_crop_path}")
+            f.write(capture["upload_bytes"])
+
+    await asyncio.to_thread(write)
+    print(f"[Crop] 💾 크로핑된 이미지 저장: {debug_crop_path}")
+    return debug_crop_path
+
+
+async def stage_upload(ctx: dict) -> dict:
+    """3️⃣ 중복 확인 후 크로핑된 이미지 업로드 (거의 같은 그림이면 업로드 생략)"""
+    task_id = ctx["task_id"]
+    resume = ctx["resume"]
+    if "create_task" in resume or "upload" in resume:
+        return resume.get("upload") or {"duplicate": None, "image_token": None}
+
+    capture = ctx["results"]["prepare"]
 
-        # 4️⃣ 크로핑된 이미지 업로드
+    if DEDUP_ENABLED and DEDUP_REUSE_MODELS:
+        name = capture_name(ctx["results"]["vision"])
+        duplicate = dedup_index.lookup_task(capture["drawing_hash"], capture["drawing_color"], name)
+        if duplicate:
+            print(f"[Dedup] ♻️ 같은 아이의 거의 같은 그림 발견 (거리 {duplicate['distance']}, "
+                  f"색차 {duplicate['color_diff']}) → "
+                  f"기존 Tripo task {duplicate['tripo_task_id']} 재사용 ({duplicate['status']})")
+            return {"duplicate": duplicate, "image_token": None}
+
+    # 정확히 같은 이미지는 기존 image_token 재사용
+    image_token = dedup_index.lookup_upload(capture["sha256"]) if DEDUP_ENABLED else None
+    if image_token:
+        print(f"[Upload] ♻️ 같은 이미지를 이미 업로드함 → image_token 재사용")
+    else:
         print(f"[Upload] Task {task_id} 크로핑된 이미지 업로드 중...")
-        image_token = tripo_client.upload_image(cropped_bytes, file_type="png")
+        image_token = await tripo_client.upload_image(capture["upload_bytes"], file_type=TRIPO_UPLOAD_FORMAT)
         if not image_token:
             raise Exception("Image upload failed")
         print(f"[Upload] ✅ 업로드 완료")
+        if DEDUP_ENABLED:
+            await asyncio.to_thread(dedup_index.record_upload, capture["sha256"], image_token)
 
-        processing_tasks[task_id]["progress"] = 20
+    set_progress(task_id, 20)
+    return {"duplicate": None, "image_token": image_token}
 
-        # 5️⃣ image_to_model API 호출
-        print(f"[Tripo3D] Task {task_id} image_to_model 요청 중...")
-        tripo_result = tripo_client.image_to_model(
-            image_token=image_token,
-            model_version="v2.5-20250123"
-        )
+
+def template_mesh_task(ctx: dict) -> tuple:
+    """texture 모드에서 사용할 (도안명, 템플릿 메시 task ID), 알 수 없는 도안이면 task ID는 None"""
+    vision = ctx["results"].get("vision")
+    design = vision["design"] if vision else None
+    return design, TEMPLATE_MESH_TASKS.get((design or "").strip().lower())
+
+
+async def stage_create_task(ctx: dict) -> str:
+    """
+    4️⃣ image_to_model / texture_model API 호출 (중복 캡처면 기존 Tripo task ID 사용)
+
+    GENERATION_MODE=texture면 도안에 맞는 템플릿 메시에 텍스처만 입히고,
+    템플릿이 없는 도안은 image_to_model로 생성한다. 어느 경로였는지는
+    ctx["generation"]에 기록해서 모드별 소요 시간을 비교할 수 있게 한다.
+    """
+    task_id = ctx["task_id"]
+    upload = ctx["results"]["upload"]
+
+    if "create_task" in ctx["resume"]:
+        ctx["generation"] = {"path": "resumed"}
+        # 재시작 전에 만든 Tripo task에 다시 연결 (원격에서는 계속 생성 중)
+        task_tripo_id = ctx["resume"]["create_task"]["tripo_task_id"]
+        await job_scheduler.acquire("tripo_wait", task_id)
+        ctx["leases"].append("tripo_wait")
+        print(f"[Tripo3D] 🔁 기존 Tripo task에 다시 연결: {task_tripo_id}")
+    elif upload["duplicate"]:
+        task_tripo_id = upload["duplicate"]["tripo_task_id"]
+        ctx["generation"] = {"path": "duplicate"}
+    else:
+        capture = ctx["results"]["prepare"]
+        # Tripo 동시 생성 슬롯은 task 생성부터 완료 대기가 끝날 때까지 유지
+        await job_scheduler.acquire("tripo_wait", task_id)
+        ctx["leases"].append("tripo_wait")
+
+        design, template_task_id = template_mesh_task(ctx) if GENERATION_MODE == "texture" else (None, None)
+        if GENERATION_MODE == "texture" and not template_task_id:
+            print(f"[Tripo3D] ⚠️ 템플릿 메시가 없는 도안({design}) → image_to_model로 생성")
+
+        submit_start = time.perf_counter()
+        async with job_scheduler.slot("tripo_submit", task_id):
+            if template_task_id:
+                print(f"[Tripo3D] Task {task_id} texture_model 요청 중 ({design} 템플릿: {template_task_id})...")
+                tripo_result = await tripo_client.texture_existing_model(
+                    template_task_id,
+                    image_token=upload["image_token"],
+                    file_type=TRIPO_UPLOAD_FORMAT,
+                )
+            else:
+                print(f"[Tripo3D] Task {task_id} image_to_model 요청 중...")
+                tripo_result = await tripo_client.image_to_model(
+                    image_token=upload["image_token"],
+                    model_version="v2.5-20250123",
+                    file_type=TRIPO_UPLOAD_FORMAT,
+                )
         task_tripo_id = tripo_result.get("data", {}).get("task_id", "unknown")
-        print(f"[Tripo3D] ✅ Task 생성: {task_tripo_id}")
+        ctx["generation"] = {
+            "path": "texture_model" if template_task_id else "image_to_model",
+            "template_task_id": template_task_id,
+            "submit_seconds": round(time.perf_counter() - submit_start, 3),
+        }
+        print(f"[Tripo3D] ✅ Task 생성: {task_tripo_id} ({ctx['generation']['path']})")
+        if DEDUP_ENABLED and DEDUP_REUSE_MODELS:
+            await asyncio.to_thread(
+                dedup_index.record_task, task_tripo_id, capture["drawing_hash"], capture["drawing_color"],
+                capture_name(ctx["results"]["vision"]),
+            )
 
-        processing_tasks[task_id]["progress"] = 25
+    set_progress(task_id, 25)
+    return task_tripo_id
 
-        # 6️⃣ Task 완료 대기 (이 부분이 오래 걸림)
-        print(f"[Tripo3D] Task {task_id} 3D 생성 대기 중... (1-2분 소요)")
-        urls = await tripo_client.wait_for_task_completion(task_tripo_id, max_wait=600)
 
-        if not urls:
-            raise Exception("Task completion timeout")
+async def stage_wait(ctx: dict) -> dict:
+    """5️⃣ Task 완료 대기 (이 부분이 오래 걸림, 재사용 task는 즉시 완료되거나 진행 중인 task에 합류)"""
+    task_id = ctx["task_id"]
+    task_tripo_id = ctx["results"]["create_task"]
+    print(f"[Tripo3D] Task {task_id} 3D 생성 대기 중... (1-2분 소요)")
 
-        model_url = urls.get("model_url")
-        if not model_url:
-            raise Exception("Model URL not found in response")
+    def on_tripo_progress(status, progress):
+        # Tripo 진행률(0-100)을 전체 진행률 25-85 구간에 매핑
+        set_progress(task_id, 25 + int(progress * 0.6))
 
-        print(f"[Tripo3D] ✅ Task 완료!")
+    # 재개된 작업은 원래 생성 시각을 알려줘야 폴러가 남은 시간을 제대로 추정함
+    # (완료 단계도 다시 조회: 서명된 모델 URL이 만료됐을 수 있음)
+    started_at = None
+    if "create_task" in ctx["resume"]:
+        elapsed = time.time() - ctx["resume"]["create_task"]["started_at"]
+        started_at = time.monotonic() - elapsed
 
-        processing_tasks[task_id]["progress"] = 85
+    urls = await tripo_poller.wait(task_tripo_id, max_wait=600, on_progress=on_tripo_progress, started_at=started_at)
+    release_leases(ctx)
 
-        # 7️⃣ GLB 다운로드
-        print(f"[Download] Task {task_id} GLB 다운로드 중...")
-        r = requests.get(model_url, timeout=30)
-        glb_file_size_mb = len(r.content) / 1024 / 1024
-        print(f"[Download] ✅ 다운로드 완료 ({glb_file_size_mb:.2f} MB)")
+    model_url = urls.get("model_url") if urls else None
+    if DEDUP_ENABLED:
+        await asyncio.to_thread(
+            dedup_index.mark_task, task_tripo_id, "done" if model_url else "failed", model_url
+        )
 
-        processing_tasks[task_id]["progress"] = 95
+    if not urls:
+        raise Exception("Task completion timeout")
 
-        # 8️⃣ 결과를 Unity 큐에 추가
-        payload = {
-            "label": design,
-            "child_name": child_name,
-            "task_id": task_tripo_id,
-            "model_url": model_url,
-        }
-        model_queue.append(payload)
-        print(f"[Unity Queue] ✅ Task {task_id} 완료 후 Unity 큐에 추가")
+    if not model_url:
+        raise Exception("Model URL not found in response")
+
+    print(f"[Tripo3D] ✅ Task 완료!")
+    set_progress(task_id, 85)
+    return urls
+
+
+async def stage_download(ctx: dict) -> dict:
+    """6️⃣ GLB 다운로드 (스트리밍으로 로컬 캐시에 저장)"""
+    task_id = ctx["task_id"]
+    source_url = ctx["results"]["wait"]["model_url"]
+    print(f"[Download] Task {task_id} GLB 다운로드 중...")
+
+    if not MODEL_CACHE_ENABLED:
+        glb_bytes = await tripo_client.download(source_url)
+        print(f"[Download] ✅ 다운로드 완료 ({len(glb_bytes) / 1024 / 1024:.2f} MB)")
+        set_progress(task_id, 95)
+        return {"model_id": None, "size": len(glb_bytes), "url": source_url}
+
+    async with tripo_client.stream_download(source_url) as response:
+        response.raise_for_status()
+        model_id, size = await model_cache.store(response.aiter_bytes(MODEL_CACHE_CHUNK))
+    print(f"[Download] ✅ 다운로드 완료 ({size / 1024 / 1024:.2f} MB) → 캐시 {model_id[:12]}")
+
+    set_progress(task_id, 95)
+    return {"model_id": model_id, "size": size, "url": f"/models/{model_id}.glb"}
+
+
+async def stage_optimize(ctx: dict) -> dict:
+    """6️⃣-1 GLB 텍스처 축소/재인코딩 (워커 프로세스, 실패해도 원본 사용)"""
+    task_id = ctx["task_id"]
+    download = ctx["results"]["download"]
+    enabled = GLB_OPTIMIZE and not TEXTURE_ONLY and download["model_id"]
+    source_path = model_cache.path(download["model_id"]) if enabled else None
+    if source_path is None:
+        return download
+
+    output_path = model_cache.temp_path()
+    try:
+        report = await glb_optimizer.optimize_file(source_path, output_path)
+    except Exception as e:
+        print(f"[GLB] ⚠️ Task {task_id} 최적화 실패, 원본 사용: {e}")
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return download
+
+    before_mb = report["bytes_before"] / 1024 / 1024
+    after_mb = report["bytes_after"] / 1024 / 1024
+    if not report["written"]:
+        print(f"[GLB] Task {task_id} 최적화 효과 없음 ({before_mb:.2f} MB), 원본 사용")
+        return download
+
+    model_id = report["sha256"]
+    await asyncio.to_thread(model_cache.commit, output_path, model_id, report["bytes_after"])
+    print(f"[GLB] ✅ 최적화: {before_mb:.2f} MB → {after_mb:.2f} MB "
+          f"(텍스처 {len(report['images'])}개, {report['elapsed_ms']:.0f}ms)")
+    set_progress(task_id, 97)
+    return {
+        "model_id": model_id,
+        "size": report["bytes_after"],
+        "url": f"/models/{model_id}.glb",
+        "original_size": report["bytes_before"],
+    }
+
+
+async def stage_lods(ctx: dict) -> list:
+    """
+    6️⃣-2 단순화 LOD 생성 (워커 프로세스, 실패하면 LOD 없이 진행)
+
+    Returns:
+        작은 것부터 [{"level", "model_id", "url", "size", "triangles"}, ...]
+        마지막 항목은 전체 모델 (level 0)
+    """
+    task_id = ctx["task_id"]
+    model = ctx["results"]["optimize"]
+    full = {"level": 0, "model_id": model["model_id"], "url": model["url"], "size": model["size"], "triangles": None}
+    enabled = GLB_LODS and not TEXTURE_ONLY and model["model_id"]
+    source_path = model_cache.path(model["model_id"]) if enabled else None
+    if source_path is None:
+        return [full]
+
+    # GLB_LOD_GRIDS는 거친 것부터 → level이 클수록 거친 LOD
+    levels = list(zip(GLB_LOD_GRIDS, GLB_LOD_TEXTURE_SIZES))
+    outputs = [(model_cache.temp_path(), grid, texture_size) for grid, texture_size in levels]
+    reports = []
+    try:
+        reports = await glb_optimizer.generate_lods(source_path, outputs)
+    except Exception as e:
+        print(f"[GLB] ⚠️ Task {task_id} LOD 생성 실패: {e}")
+    finally:
+        written = {report["path"] for report in reports}
+        for path, _, _ in outputs:
+            if path not in written and os.path.exists(path):
+                os.remove(path)
+
+    lods = []
+    for report in reports:
+        await asyncio.to_thread(model_cache.commit, report["path"], report["sha256"], report["bytes"])
+        lods.append({
+            "level": len(levels) - GLB_LOD_GRIDS.index(report["grid"]),
+            "model_id": report["sha256"],
+            "url": f"/models/{report['sha256']}.glb",
+            "size": report["bytes"],
+            "triangles": report["triangles"],
+        })
+        print(f"[GLB] ✅ LOD(grid {report['grid']}): 삼각형 {report['triangles_before']} → {report['triangles']}, "
+              f"{report['bytes'] / 1024 / 1024:.2f} MB ({report['elapsed_ms']:.0f}ms)")
+    if reports:
+        full["triangles"] = reports[0]["triangles_before"]
+
+    lods.sort(key=lambda lod: lod["size"])
+    return lods + [full]
+
+
+# 도안(Vision label) → 미리 받아둔 기본 메시 (download_original_meshes.py)
+MESHES_DIR = os.path.join(FRONTEND_DIR, "meshes")
+BASE_MESHES = {
+    "spaceship": "spaceship.glb",
+    "locket": "locket.glb",
+    "single character": "character.glb",
+}
+
+
+def base_mesh_url(label: str) -> str:
+    """label에 해당하는 기본 메시 경로 (파일이 없으면 None, 절대 URL은 전달 시 public_url로)"""
+    filename = BASE_MESHES.get((label or "").strip().lower())
+    if filename is None or not os.path.exists(os.path.join(MESHES_DIR, filename)):
+        return None
+    return f"/static/meshes/{filename}"
+
+
+def extract_base_color(path: str):
+    """캐시된 GLB에서 baseColor 텍스처 바이트 추출 (디코드 없이 그대로)"""
+    with open(path, "rb") as f:
+        found = base_color_image(read_glb(f.read()))
+    return bytes(found[0]) if found else None
+
+
+async def stage_texture(ctx: dict) -> dict:
+    """
+    6️⃣-3 TEXTURE_ONLY 모드: 텍스처만 캐시에 저장
+
+    baseColor 텍스처(GLB 임베드)가 기본 메시 UV와 맞는 실제 텍스처이므로 우선 사용하고,
+    없으면 Tripo rendered_image(미리보기 렌더)를 받는다.
+    """
+    if not TEXTURE_ONLY or not MODEL_CACHE_ENABLED:
+        return None
+    task_id = ctx["task_id"]
+    download = ctx["results"]["download"]
+
+    texture, source = None, None
+    glb_path = model_cache.path(download["model_id"]) if download["model_id"] else None
+    if glb_path:
+        try:
+            texture = await asyncio.to_thread(extract_base_color, glb_path)
+            source = "base_color"
+        except ValueError as e:
+            print(f"[Texture] ⚠️ GLB에서 텍스처 추출 실패: {e}")
+
+    if texture is not None:
+        texture_id, size = await texture_cache.store_bytes(texture)
+    else:
+        rendered_url = ctx["results"]["wait"].get("texture_url")
+        if not rendered_url:
+            print(f"[Texture] ⚠️ Task {task_id} 텍스처 없음, GLB로 전달")
+            return None
+        async with tripo_client.stream_download(rendered_url) as response:
+            response.raise_for_status()
+            texture_id, size = await texture_cache.store(response.aiter_bytes(MODEL_CACHE_CHUNK))
+        source = "rendered_image"
+
+    print(f"[Texture] ✅ 텍스처 저장 ({source}, {size / 1024:.0f} KB)")
+    return {
+        "texture_id": texture_id,
+        "url": f"/textures/{texture_id}",
+        "size": size,
+        "source": source,
+    }
+
+
+def public_url(path: str) -> str:
+    """이 서버가 제공하는 경로(/models/... 등)를 현재 PUBLIC_BASE_URL 기준 절대 URL로 (외부 URL은 그대로)"""
+    if path and path.startswith("/"):
+        return f"{PUBLIC_BASE_URL}{path}"
+    return path
+
+
+def delivery_payload(payload: dict) -> dict:
+    """
+    저장된 payload를 Unity에 보낼 형태로 (URL은 전달 시점의 PUBLIC_BASE_URL로 만든다)
+
+    payload는 task_store에 저장돼 재시작 후 다시 전달되는데, ngrok 주소는 재시작마다
+    바뀌므로 저장할 때는 model_id/texture_id 기반 경로만 남긴다.
+    """
+    data = dict(payload)
+    for key in ("model_url", "texture_url", "base_mesh_url"):
+        if data.get(key):
+            data[key] = public_url(data[key])
+    if data.get("lods"):
+        data["lods"] = [dict(lod, url=public_url(lod["url"])) for lod in data["lods"]]
+    return data
+
+
+async def stage_enqueue(ctx: dict) -> dict:
+    """7️⃣ 결과를 Unity에 전달 (DELIVERY_MODE에 따라 폴링 큐 / push)"""
+    vision = ctx["results"]["vision"]
+    payload = {
+        "label": vision["design"],
+        "child_name": vision["child_name"],
+        "task_id": ctx["results"]["create_task"],
+        "model_url": ctx["results"]["optimize"]["url"],
+        "model_id": ctx["results"]["optimize"]["model_id"],
+        "model_size": ctx["results"]["optimize"]["size"],
+        # 작은 것부터: Unity는 첫 LOD를 바로 표시하고 나머지를 순서대로 교체
+        "lods": [
+            {"level": lod["level"], "model_id": lod["model_id"], "url": lod["url"], "size": lod["size"],
+             "triangles": lod["triangles"]}
+            for lod in ctx["results"]["lods"]
+        ],
+        "source_model_url": ctx["results"]["wait"]["model_url"],  # 로컬 캐시에서 지워졌을 때 대비 (Tripo 서명 URL, 만료될 수 있음)
+        "capture_id": ctx["task_id"],
+        "generation_path": ctx.get("generation", {}).get("path"),
+    }
+    texture = ctx["results"]["texture"]
+    if texture:
+        payload.update({
+            "delivery": "texture",
+            "texture_id": texture["texture_id"],
+            "texture_url": texture["url"],
+            "texture_size": texture["size"],
+            "texture_source": texture["source"],
+            "base_mesh_url": base_mesh_url(vision["design"]),
+        })
+    task_store.defer(task_store.update, ctx["task_id"], payload=payload)
+
+    pushed = DELIVERY_MODE in ("push", "both") and unity_pusher.offer(delivery_payload(payload))
+    if DELIVERY_MODE != "push" or not pushed:
+        seq = await model_queue.publish(payload)
+        # 이 모델을 받아야 하는 consumer 기록 (재시작 후에는 아직 받지 않은 consumer에게만 복구)
+        task_store.defer(task_store.update, ctx["task_id"],
+                         deliveries={"expected": model_queue.recipients(seq), "received": []})
+        print(f"[Unity Queue] ✅ Task {ctx['task_id']} 완료 후 Unity 큐에 추가")
+    if pushed:
+        print(f"[UnityBridge] 📤 Task {ctx['task_id']} Unity push 대기열에 추가")
+    return payload
+
+
+# pool: 해당 단계 실행 전에 얻어야 하는 워커 풀 (job_scheduler.DEFAULT_POOL_SIZES)
+# create_task/wait는 Tripo 동시 생성 슬롯(tripo_wait)을 단계 안에서 직접 관리
+PIPELINE = StageGraph([
+    Stage("prepare", stage_prepare, pool="image"),
+    Stage("vision", stage_vision, deps=("prepare",), pool="openai"),
+    Stage("save_debug", stage_save_debug, deps=("prepare",)),
+    Stage("upload", stage_upload, deps=("prepare", "vision") if DEDUP_REUSE_MODELS else ("prepare",), pool="tripo_submit"),
+    Stage("create_task", stage_create_task, deps=("upload", "vision") if GENERATION_MODE == "texture" else ("upload",)),
+    Stage("wait", stage_wait, deps=("create_task",)),
+    Stage("download", stage_download, deps=("wait",), pool="download"),
+    Stage("optimize", stage_optimize, deps=("download",)),
+    Stage("lods", stage_lods, deps=("optimize",)),
+    Stage("texture", stage_texture, deps=("download",)),
+    Stage("enqueue", stage_enqueue, deps=("lods", "texture", "vision")),
+])
+
+
+# 재시작 후 이어서 처리하기 위해 저장하는 단계 결과: stage → (checkpoint 값, 추가 컬럼)
+CHECKPOINTS = {
+    "vision": lambda value: (value, {"vision": value}),
+    "upload": lambda value: (value, {"image_token": value["image_token"]}),
+    "create_task": lambda value: ({"tripo_task_id": value, "started_at": time.time()}, {"tripo_task_id": value}),
+    "wait": lambda value: (value, {}),
+}
+
+
+def checkpoint_stage(ctx: dict, stage: str, duration: float, error):
+    """단계가 성공적으로 끝나면 저장소에 기록 (PIPELINE on_stage_end 콜백)"""
+    if error is not None or stage not in CHECKPOINTS or stage not in ctx["results"] or stage in ctx["resume"]:
+        return
+    value, fields = CHECKPOINTS[stage](ctx["results"][stage])
+    task_store.defer(task_store.checkpoint, ctx["task_id"], stage, value, **fields)
+
+
+def stage_started(ctx: dict, stage: str):
+    """PIPELINE on_stage_start 콜백: SSE 구독자에게 단계 시작 알림"""
+    task_events.publish(ctx["task_id"], "stage", {"task_id": ctx["task_id"], "stage": stage, "state": "start"})
+
+
+def stage_ended(ctx: dict, stage: str, duration: float, error):
+    """PIPELINE on_stage_end 콜백: 체크포인트 저장 + 메트릭 + 트레이스 + SSE 구독자에게 단계 종료 알림"""
+    checkpoint_stage(ctx, stage, duration, error)
+    stage_seconds.observe(duration, stage=stage)
+    if error is not None:
+        stage_errors.inc(stage=stage)
+    trace_stage(ctx, stage, duration, error)
+    task_events.publish(ctx["task_id"], "stage", {
+        "task_id": ctx["task_id"],
+        "stage": stage,
+        "state": "end",
+        "duration": round(duration, 3),
+        "error": (str(error) or type(error).__name__) if error is not None else None,
+    })
+
+
+def trace_stage(ctx: dict, stage: str, duration: float, error):
+    """단계 구간과 그 앞의 워커 슬롯 대기 구간을 작업 트랙에 기록"""
+    start = tracing.now() - duration
+    queued = ctx["timings"].get(stage, {}).get("queued") or 0
+    if queued > 0:
+        tracing.record(f"{stage} (slot wait)", "queue", start - queued, queued, track=ctx["task_id"])
+    tracing.record(stage, "stage", start, duration, track=ctx["task_id"],
+                   args={"error": str(error) or type(error).__name__} if error is not None else None)
+
+
+def record_generation(ctx: dict, total_time: float) -> dict:
+    """생성 경로(texture_model / image_to_model 등)와 소요 시간을 기록하고 경로별로 누적"""
+    generation = dict(ctx.get("generation") or {"path": "unknown"})
+    wait = ctx["timings"].get("wait")
+    generation["tripo_seconds"] = round(wait["duration"], 3) if wait else None
+    generation["total_seconds"] = round(total_time, 3)
+
+    totals = generation_stats.setdefault(generation["path"], {"count": 0, "total_seconds": 0.0, "tripo_seconds": 0.0})
+    totals["count"] += 1
+    totals["total_seconds"] += total_time
+    totals["tripo_seconds"] += wait["duration"] if wait else 0.0
+    print(f"[Generation] {generation['path']}: Tripo {generation['tripo_seconds']}s / 전체 {total_time:.2f}s")
+    return generation
+
+
+def release_leases(ctx: dict):
+    """여러 단계에 걸쳐 유지한 워커 슬롯 반환"""
+    while ctx["leases"]:
+        job_scheduler.release(ctx["leases"].pop())
+
+
+async def process_image_in_background(task_id: str, image_bytes: bytes, resume: dict = None):
+    """
+    🔄 백그라운드에서 이미지 처리 (병렬로 여러 개 동시 실행)
+
+    단계 간 의존성은 PIPELINE에 선언되어 있고, 독립적인 단계는 동시에 실행된다.
+    resume: 재시작 전에 완료된 단계 결과 (task_store checkpoints)
+    """
+    ctx = {"task_id": task_id, "image_bytes": image_bytes, "leases": [], "resume": resume or {}}
+    # 이 작업에서 만드는 단계 task / to_thread 호출의 span은 모두 task_id 트랙에 기록
+    tracing.bind_track(task_id)
+    tasks_in_flight.inc()
+    # 서버 종료로 취소된 작업은 재시작 후 이어서 처리해야 하므로 원본을 남김
+    finished = False
+    try:
+        start_time = time.time()
+        print(f"\n{'='*80}")
+        print(f"🔄 [PROCESS] Task {task_id} 처리 시작")
+        print(f"{'='*80}")
+
+        # 상태 업데이트: 처리 중
+        task = processing_tasks.get(task_id)
+        update_task(task_id, status="processing", progress=max(5, task.progress if task else 0))
+        processing_tasks.update(task_id, stage_timings=ctx.setdefault("timings", {}))
+
+        await PIPELINE.run(
+            ctx,
+            on_stage_start=stage_started,
+            on_stage_end=stage_ended,
+            slot=lambda pool: job_scheduler.slot(pool, task_id),
+        )
 
         # 상태 업데이트: 완료
         total_time = time.time() - start_time
-        processing_tasks[task_id]["status"] = "done"
-        processing_tasks[task_id]["progress"] = 100
-        processing_tasks[task_id]["result"] = {
-            "label": design,
-            "child_name": child_name,
-            "model_url": model_url,
+        payload = ctx["results"]["enqueue"]
+        update_task(task_id, status="done", progress=100, result={
+            "label": payload["label"],
+            "child_name": payload["child_name"],
+            "model_url": public_url(payload["model_url"]),
             "processing_time": total_time,
-        }
+            "stage_timings": ctx["timings"],
+            "generation": record_generation(ctx, total_time),
+        })
+        task_seconds.observe(total_time)
+        tasks_finished.inc(status="done")
+        finished = True
 
         print(f"\n{'='*80}")
         print(f"✅ [COMPLETE] Task {task_id} 처리 완료")
         print(f"⏱️  총 소요 시간: {total_time:.2f}초")
+        for name, timing in ctx["timings"].items():
+            print(f"   - {name:<12} {timing['start']:7.2f}s → {timing['end']:7.2f}s ({timing['duration']:.2f}s)")
         print(f"{'='*80}\n")
 
     except Exception as e:
@@ -362,6 +1526,15 @@ async def process_image_in_background(task_id: str, image_bytes: bytes):
         print(f"오류: {str(e)}")
         print(f"{'='*80}\n")
 
-        processing_tasks[task_id]["status"] = "error"
-        processing_tasks[task_id]["progress"] = 0
-        processing_tasks[task_id]["error"] = str(e)
+        update_task(task_id, status="error", progress=0, error=str(e))
+        tasks_finished.inc(status="error")
+        finished = True
+
+    finally:
+        tasks_in_flight.dec()
+        release_leases(ctx)
+        if finished:
+            try:
+                await asyncio.to_thread(remove_original, task_id)
+            except OSError as e:
+                print(f"[Task] ⚠️ Task {task_id} 원본 삭제 실패: {e}")
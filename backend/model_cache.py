@@ -0,0 +1,196 @@
+# backend/model_cache.py
+import os
+import re
+import uuid
+import hashlib
+import asyncio
+import threading
+from collections import OrderedDict
+
+MODEL_CACHE_DIR = os.getenv(
+    "MODEL_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), "../data/cache/models"),
+)
+# 캐시 최대 용량 (바이트, 기본 2GB ≈ GLB 150개)
+MODEL_CACHE_MAX_BYTES = int(os.getenv("MODEL_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+# 스트리밍 다운로드 청크 크기
+MODEL_CACHE_CHUNK = int(os.getenv("MODEL_CACHE_CHUNK", str(256 * 1024)))
+
+_MODEL_ID = re.compile(r"^[0-9a-f]{64}$")
+
+
+def sniff_media_type(header: bytes) -> str:
+    """파일 앞부분(12바이트)으로 이미지 형식 판별"""
+    if header.startswith(b"\x89PNG"):
+        return "image/png"
+    if header.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+class ModelCache:
+    """
+    GLB 등 결과 파일의 content-addressed 디스크 캐시 ({sha256}{extension})
+
+    다운로드 스트림을 임시 파일에 쓰면서 해시를 계산하고, 끝나면 해시 이름으로
+    옮긴다. 같은 모델은 한 번만 저장되며, 전체 용량이 max_bytes를 넘으면
+    가장 오래 사용하지 않은 파일부터 삭제한다 (사용 시각은 파일 mtime으로 유지).
+
+    media_type을 지정하지 않으면 파일을 캐시에 추가할 때(시작 시 인덱싱 포함)
+    앞부분으로 형식을 판별해 두므로, 제공할 때 파일을 다시 읽지 않는다.
+    """
+
+    def __init__(self, directory: str = MODEL_CACHE_DIR, max_bytes: int = MODEL_CACHE_MAX_BYTES,
+                 extension: str = ".glb", media_type: str = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.fixed_media_type = media_type
+        self._files = OrderedDict()  # {model_id: size} (LRU 순서)
+        self._media_types = {}       # {model_id: media type} (media_type 미지정 시)
+        self._total = 0
+        self._lock = threading.Lock()
+
+        self.stored = 0
+        self.reused = 0
+        self.evictions = 0
+
+    def open(self):
+        """디렉터리 생성 및 기존 파일 인덱싱 (mtime 순 = LRU 순)"""
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            model_id, extension = os.path.splitext(name)
+            if extension == ".part":
+                os.remove(path)  # 중단된 다운로드
+                continue
+            if extension != self.extension or not _MODEL_ID.match(model_id):
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, model_id, stat.st_size, self._sniff(path)))
+        with self._lock:
+            self._files.clear()
+            self._media_types.clear()
+            self._total = 0
+            for _, model_id, size, media_type in sorted(entries):
+                self._files[model_id] = size
+                self._total += size
+                if media_type:
+                    self._media_types[model_id] = media_type
+        print(f"[ModelCache] ✅ 캐시 로드: {len(entries)}개, {self._total / 1024 / 1024:.1f} MB ({self.directory})")
+
+    def path(self, model_id: str) -> str:
+        """캐시된 파일 경로 (없으면 None, 있으면 최근 사용으로 갱신)"""
+        if not _MODEL_ID.match(model_id):
+            return None
+        with self._lock:
+            if model_id not in self._files:
+                return None
+            self._files.move_to_end(model_id)
+        path = self._file(model_id)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._total -= self._files.pop(model_id, 0)
+                self._media_types.pop(model_id, None)
+            return None
+        return path
+
+    def media_type(self, model_id: str) -> str:
+        """캐시에 추가할 때 판별해 둔 형식"""
+        if self.fixed_media_type:
+            return self.fixed_media_type
+        return self._media_types.get(model_id, "application/octet-stream")
+
+    def _sniff(self, path: str) -> str:
+        if self.fixed_media_type:
+            return None
+        with open(path, "rb") as f:
+            return sniff_media_type(f.read(12))
+
+    async def store(self, chunks) -> tuple:
+        """
+        비동기 바이트 청크 스트림을 캐시에 저장
+
+        Returns:
+            (model_id, size)
+        """
+        temp_path = self.temp_path()
+        digest = hashlib.sha256()
+        size = 0
+        f = await asyncio.to_thread(open, temp_path, "wb")
+        try:
+            async for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                await asyncio.to_thread(f.write, chunk)
+            await asyncio.to_thread(f.close)
+        except BaseException:
+            f.close()
+            os.remove(temp_path)
+            raise
+
+        model_id = digest.hexdigest()
+        await asyncio.to_thread(self.commit, temp_path, model_id, size)
+        return model_id, size
+
+    async def store_bytes(self, data: bytes) -> tuple:
+        """메모리에 있는 데이터를 캐시에 저장 → (model_id, size)"""
+        async def chunks():
+            yield data
+        return await self.store(chunks())
+
+    def temp_path(self) -> str:
+        """캐시 디렉터리 안의 임시 파일 경로 (commit으로 캐시에 추가, 같은 파일시스템이라 rename만 함)"""
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{uuid.uuid4().hex}.part")
+
+    def commit(self, temp_path: str, model_id: str, size: int):
+        """다 쓴 임시 파일을 model_id(SHA-256)로 캐시에 추가"""
+        path = self._file(model_id)
+        media_type = self._sniff(temp_path)
+        with self._lock:
+            if model_id in self._files:
+                # 같은 내용이 이미 있음
+                os.remove(temp_path)
+                self._files.move_to_end(model_id)
+                self.reused += 1
+                os.utime(path)
+                return
+            os.replace(temp_path, path)
+            self._files[model_id] = size
+            self._total += size
+            if media_type:
+                self._media_types[model_id] = media_type
+            self.stored += 1
+            self._evict(keep=model_id)
+
+    def _evict(self, keep: str):
+        while self._total > self.max_bytes and len(self._files) > 1:
+            model_id = next(iter(self._files))
+            if model_id == keep:
+                break
+            self._total -= self._files.pop(model_id)
+            self._media_types.pop(model_id, None)
+            self.evictions += 1
+            try:
+                os.remove(self._file(model_id))
+            except FileNotFoundError:
+                pass
+
+    def _file(self, model_id: str) -> str:
+        return os.path.join(self.directory, model_id + self.extension)
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self._files),
+            "bytes": self._total,
+            "max_bytes": self.max_bytes,
+            "stored": self.stored,
+            "reused": self.reused,
+            "evictions": self.evictions,
+        }
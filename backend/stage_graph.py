@@ -0,0 +1,141 @@
+# backend/stage_graph.py
+import time
+import asyncio
+
+
+class StageError(Exception):
+    """단계 실행 실패 (어느 단계에서 실패했는지 포함)"""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"[{stage}] {error}")
+        self.stage = stage
+        self.error = error
+
+
+class Stage:
+    """
+    파이프라인의 한 단계
+
+    Args:
+        name: 단계 이름 (결과/타이밍 키)
+        func: async def func(ctx) → 반환값은 ctx["results"][name]에 저장
+        deps: 먼저 끝나야 하는 단계 이름들
+        pool: 실행 전에 슬롯을 얻어야 하는 워커 풀 이름 (None이면 제한 없음)
+    """
+
+    __slots__ = ("name", "func", "deps", "pool")
+
+    def __init__(self, name: str, func, deps: tuple = (), pool: str = None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.pool = pool
+
+
+class StageGraph:
+    """
+    의존성을 선언한 단계들을 DAG로 실행하는 실행기
+
+    의존성이 모두 끝난 단계는 즉시 시작되므로 서로 독립적인 단계
+    (예: Vision OCR과 Tripo 업로드)는 동시에 진행된다.
+    각 단계의 시작/종료 시각은 ctx["timings"]에 기록된다.
+    """
+
+    def __init__(self, stages: list):
+        self.stages = {stage.name: stage for stage in stages}
+        self.order = self._toposort()
+
+    def _toposort(self) -> list:
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"단계 '{stage.name}'의 의존성 '{dep}'이(가) 정의되지 않았습니다.")
+
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"순환 의존성 발견: {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    async def run(self, ctx: dict, on_stage_start=None, on_stage_end=None, slot=None) -> dict:
+        """
+        모든 단계 실행
+
+        Args:
+            ctx: 단계 간 공유 컨텍스트 (results/timings 키가 추가됨)
+            on_stage_start: 콜백 (ctx, stage_name)
+            on_stage_end: 콜백 (ctx, stage_name, duration, error)
+                (error: 성공이면 None, 다른 단계 실패로 취소되면 CancelledError)
+            slot: pool이 지정된 단계의 슬롯을 얻는 함수 slot(pool) → async context manager
+
+        Returns:
+            ctx["timings"]: {stage: {"start": 시작(초), "end": 종료(초), "duration": 소요(초), "queued": 슬롯 대기(초)}}
+            (시작/종료는 run 호출 시점 기준 상대 시간)
+
+        Raises:
+            StageError: 첫 번째로 실패한 단계 (나머지 단계는 취소됨)
+        """
+        ctx.setdefault("results", {})
+        ctx.setdefault("timings", {})
+        origin = time.monotonic()
+        tasks = {}
+
+        async def run_stage(stage: Stage):
+            if stage.deps:
+                await asyncio.gather(*(tasks[dep] for dep in stage.deps))
+
+            if stage.pool and slot:
+                ready = time.monotonic()
+                async with slot(stage.pool):
+                    await execute(stage, time.monotonic() - ready)
+            else:
+                await execute(stage, 0.0)
+
+        async def execute(stage: Stage, queued: float):
+            if on_stage_start:
+                on_stage_start(ctx, stage.name)
+            started = time.monotonic()
+            error = None
+            try:
+                ctx["results"][stage.name] = await stage.func(ctx)
+            except (asyncio.CancelledError, StageError) as e:
+                # 취소된 단계가 성공으로 기록되지 않도록 콜백에 그대로 전달
+                error = e
+                raise
+            except Exception as e:
+                error = e
+                raise StageError(stage.name, e) from e
+            finally:
+                ended = time.monotonic()
+                ctx["timings"][stage.name] = {
+                    "start": round(started - origin, 3),
+                    "end": round(ended - origin, 3),
+                    "duration": round(ended - started, 3),
+                    "queued": round(queued, 3),
+                }
+                if on_stage_end:
+                    on_stage_end(ctx, stage.name, ended - started, error)
+
+        for name in self.order:
+            tasks[name] = asyncio.ensure_future(run_stage(self.stages[name]))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return ctx["timings"]
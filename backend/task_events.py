@@ -0,0 +1,64 @@
+# backend/task_events.py
+import json
+import asyncio
+from contextlib import contextmanager
+
+# 구독자 한 명이 밀린 이벤트를 쌓아 둘 수 있는 최대 개수 (넘으면 오래된 것부터 버림)
+SUBSCRIBER_QUEUE_MAX = 100
+
+
+class TaskEventBus:
+    """
+    작업 상태 변화 → SSE 구독자 전달
+
+    process_image_in_background에서 상태/단계가 바뀔 때 publish하면
+    해당 task를 구독 중인 /task_events 연결의 큐에 이벤트가 들어간다.
+    이벤트 루프 안에서만 호출한다 (asyncio.Queue는 스레드 안전하지 않음).
+    """
+
+    def __init__(self, queue_max: int = SUBSCRIBER_QUEUE_MAX):
+        self.queue_max = queue_max
+        self._subscribers = {}  # {task_id: set(asyncio.Queue)}
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, task_id: str, event: str, data: dict):
+        queues = self._subscribers.get(task_id)
+        if not queues:
+            return
+        self.published += 1
+        for queue in queues:
+            if queue.full():
+                # 느린 구독자: 오래된 이벤트를 버리고 최신 상태 유지
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait((event, data))
+
+    @contextmanager
+    def subscribe(self, task_ids):
+        """task_ids의 이벤트를 받을 큐 (with 블록을 벗어나면 구독 해제)"""
+        queue = asyncio.Queue(maxsize=self.queue_max)
+        for task_id in task_ids:
+            self._subscribers.setdefault(task_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            for task_id in task_ids:
+                queues = self._subscribers.get(task_id)
+                if queues is not None:
+                    queues.discard(queue)
+                    if not queues:
+                        del self._subscribers[task_id]
+
+    def stats(self) -> dict:
+        return {
+            "subscribed_tasks": len(self._subscribers),
+            "subscribers": len({id(q) for queues in self._subscribers.values() for q in queues}),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+def format_sse(event: str, data: dict) -> str:
+    """SSE 메시지 한 건"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
@@ -0,0 +1,151 @@
+# backend/task_registry.py
+import os
+import time
+from itertools import islice
+from collections import OrderedDict, Counter
+
+# 완료/실패한 작업을 메모리에 유지하는 시간 (초, 이후에는 task_store에서 조회)
+TASK_REGISTRY_TTL = float(os.getenv("TASK_REGISTRY_TTL", "3600"))
+# 메모리에 유지하는 최대 작업 수
+TASK_REGISTRY_MAX = int(os.getenv("TASK_REGISTRY_MAX", "2000"))
+
+FINISHED_STATUSES = ("done", "error")
+
+
+class TaskRecord:
+    """작업 상태 한 건 (dict 대신 __slots__로 항목당 메모리 절약)"""
+
+    __slots__ = ("task_id", "status", "progress", "result", "error",
+                 "start_time", "finished_at", "stage_timings")
+
+    def __init__(self, task_id: str, status: str = "queued", progress: int = 0,
+                 result: dict = None, error: str = None, start_time: float = None):
+        self.task_id = task_id
+        self.status = status
+        self.progress = progress
+        self.result = result
+        self.error = error
+        self.start_time = start_time if start_time is not None else time.time()
+        self.finished_at = None
+        self.stage_timings = None
+
+    def summary(self) -> dict:
+        return {"task_id": self.task_id, "status": self.status, "progress": self.progress}
+
+
+class TaskRegistry:
+    """
+    메모리 상의 작업 상태 목록 (크기 제한)
+
+    - 완료/실패한 작업은 TTL이 지나면 제거
+    - 최대 개수를 넘으면 가장 먼저 끝난 작업부터 제거
+      진행 중인 작업은 제거하지 않음 (진행률/상태 갱신이 사라지므로)
+      → 진행 중인 작업만으로 가득 차면 최대 개수를 넘겨서 유지하고 경고
+    - 상태별 개수는 갱신 시점에 카운터로 유지 (전체 순회 없음)
+
+    제거된 작업도 task_store에는 남아 있으므로 /task_status로 조회할 수 있다.
+    """
+
+    def __init__(self, ttl: float = TASK_REGISTRY_TTL, max_tasks: int = TASK_REGISTRY_MAX):
+        self.ttl = ttl
+        self.max_tasks = max(1, max_tasks)
+        self._tasks = {}                # {task_id: TaskRecord} (등록 순서)
+        self._finished = OrderedDict()  # {task_id: finished_at} (끝난 순서)
+        self._counts = Counter()
+        self._over_capacity = False
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._tasks
+
+    def add(self, task_id: str, **fields) -> TaskRecord:
+        self._expire()
+        if task_id in self._tasks:
+            self._remove(task_id)
+        record = TaskRecord(task_id, **fields)
+        self._tasks[task_id] = record
+        self._counts[record.status] += 1
+        if record.status in FINISHED_STATUSES:
+            self._mark_finished(record)
+        self._trim()
+        return record
+
+    def get(self, task_id: str) -> TaskRecord:
+        """조회 (없으면 None)"""
+        return self._tasks.get(task_id)
+
+    def update(self, task_id: str, **fields) -> TaskRecord:
+        """필드 갱신 (이미 제거된 작업이면 None)"""
+        record = self._tasks.get(task_id)
+        if record is None:
+            return None
+        status = fields.get("status")
+        if status is not None and status != record.status:
+            self._counts[record.status] -= 1
+            self._counts[status] += 1
+        for key, value in fields.items():
+            setattr(record, key, value)
+        if status in FINISHED_STATUSES and record.finished_at is None:
+            self._mark_finished(record)
+            # 최대 개수를 넘겨 유지하던 중이면 이제 제거할 수 있는 작업이 생김
+            self._trim()
+        return record
+
+    def counts(self) -> dict:
+        """상태별 작업 수"""
+        self._expire()
+        return {status: count for status, count in self._counts.items() if count}
+
+    def page(self, offset: int = 0, limit: int = 50, status: str = None) -> list:
+        """
+        등록 순(오래된 순)으로 offset부터 limit개 (status로 필터링 가능)
+
+        /task_status 폴링(get)으로 순서가 바뀌지 않으므로 페이지가 밀리지 않는다.
+        """
+        self._expire()
+        records = self._tasks.values()
+        if status is not None:
+            records = (record for record in records if record.status == status)
+        return list(islice(records, max(0, offset), max(0, offset) + max(0, limit)))
+
+    def stats(self) -> dict:
+        return {
+            "tasks": len(self._tasks),
+            "max_tasks": self.max_tasks,
+            "ttl": self.ttl,
+            "evictions": self.evictions,
+            "by_status": self.counts(),
+        }
+
+    def _mark_finished(self, record: TaskRecord):
+        record.finished_at = time.time()
+        self._finished[record.task_id] = record.finished_at
+
+    def _expire(self):
+        """TTL이 지난 완료 작업 제거 (끝난 순서대로 앞에서부터 확인)"""
+        deadline = time.time() - self.ttl
+        while self._finished:
+            task_id, finished_at = next(iter(self._finished.items()))
+            if finished_at > deadline:
+                break
+            self._remove(task_id)
+            self.evictions += 1
+
+    def _trim(self):
+        """최대 개수를 넘으면 먼저 끝난 작업부터 제거 (진행 중인 작업은 남김)"""
+        while len(self._tasks) > self.max_tasks and self._finished:
+            self._remove(next(iter(self._finished)))
+            self.evictions += 1
+        over = len(self._tasks) > self.max_tasks
+        if over and not self._over_capacity:
+            print(f"[TaskRegistry] ⚠️ 진행 중인 작업이 최대 개수({self.max_tasks})를 넘음: {len(self._tasks)}개 유지")
+        self._over_capacity = over
+
+    def _remove(self, task_id: str):
+        record = self._tasks.pop(task_id, None)
+        self._finished.pop(task_id, None)
+        if record is not None:
+            self._counts[record.status] -= 1
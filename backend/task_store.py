@@ -0,0 +1,183 @@
+# backend/task_store.py
+import os
+import json
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+TASK_STORE_PATH = os.getenv(
+    "TASK_STORE_PATH",
+    os.path.join(os.path.dirname(__file__), "../data/cache/tasks.sqlite3"),
+)
+
+# 컬럼 중 JSON으로 저장하는 필드
+_JSON_FIELDS = ("vision", "checkpoints", "result", "payload", "deliveries")
+_COLUMNS = (
+    "task_id", "status", "progress", "stage", "tripo_task_id", "image_token",
+    "vision", "checkpoints", "result", "payload", "error", "image_path",
+    "delivered", "deliveries", "created_at", "updated_at",
+)
+
+
+class TaskStore:
+    """
+    /analyze 작업 상태를 SQLite(WAL)에 기록하는 영속 저장소
+
+    서버가 재시작(--reload 포함)되어도 각 작업의 마지막 완료 단계와
+    Tripo task ID, image_token, Vision 결과가 남아 있으므로
+    진행 중이던 Tripo 생성에 다시 붙어 이어서 처리할 수 있다.
+
+    이벤트 루프의 동기 콜백(진행률, 단계 종료)에서는 defer()로 쓰기를 넘기면
+    전용 스레드 하나가 순서대로 반영한다.
+    """
+
+    def __init__(self, path: str = TASK_STORE_PATH):
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+        self._writer = None
+
+    def open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        # WAL: 쓰기 중에도 읽기 가능 + 커밋마다 fsync하지 않음 (NORMAL)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " task_id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " progress INTEGER NOT NULL DEFAULT 0,"
+            " stage TEXT,"                 # 마지막으로 완료된 단계
+            " tripo_task_id TEXT,"
+            " image_token TEXT,"
+            " vision TEXT,"                # {"design", "child_name"}
+            " checkpoints TEXT,"           # {stage: 결과} (재개용)
+            " result TEXT,"
+            " payload TEXT,"               # Unity 큐에 넣은 데이터
+            " error TEXT,"
+            " image_path TEXT,"            # 원본 캡처 경로 (재처리용)
+            " delivered INTEGER NOT NULL DEFAULT 0,"
+            " deliveries TEXT,"            # {"expected": [consumer], "received": [consumer]}
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(tasks)")}
+        if "deliveries" not in columns:
+            # 이전 버전 저장소 → consumer별 전달 기록 컬럼 추가
+            self._db.execute("ALTER TABLE tasks ADD COLUMN deliveries TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status)")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-store")
+        print(f"[TaskStore] ✅ 작업 저장소 열림 ({self.path})")
+
+    def close(self):
+        if self._writer is not None:
+            # 남은 쓰기를 모두 반영한 뒤 닫음
+            self._writer.shutdown(wait=True)
+            self._writer = None
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+                self._db = None
+
+    def create(self, task_id: str, image_path: str = None):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO tasks (task_id, status, progress, checkpoints, image_path, created_at, updated_at)"
+                " VALUES (?, 'queued', 0, '{}', ?, ?, ?)",
+                (task_id, image_path, now, now),
+            )
+
+    def defer(self, method, *args, **kwargs):
+        """
+        쓰기 메서드(update, checkpoint 등)를 쓰기 전용 스레드에서 실행 (완료를 기다리지 않음)
+
+        스레드가 하나이므로 같은 작업의 쓰기는 호출 순서대로 반영된다.
+        """
+        if self._writer is None:
+            return
+
+        def done(future):
+            if future.exception() is not None:
+                print(f"[TaskStore] ⚠️ {method.__name__} 실패: {future.exception()}")
+
+        self._writer.submit(method, *args, **kwargs).add_done_callback(done)
+
+    def update(self, task_id: str, **fields):
+        """지정한 컬럼만 갱신 (dict 값은 JSON으로 저장)"""
+        if self._db is None or not fields:
+            return
+        for key in fields:
+            if key not in _COLUMNS:
+                raise ValueError(f"알 수 없는 컬럼: {key}")
+        values = [json.dumps(v, ensure_ascii=False) if k in _JSON_FIELDS and v is not None else v
+                  for k, v in fields.items()]
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock:
+            self._db.execute(
+                f"UPDATE tasks SET {assignments}, updated_at = ? WHERE task_id = ?",
+                (*values, time.time(), task_id),
+            )
+
+    def checkpoint(self, task_id: str, stage: str, value, **fields):
+        """단계 완료 기록 (checkpoints JSON에 결과 추가)"""
+        if self._db is None:
+            return
+        with self._lock:
+            row = self._db.execute("SELECT checkpoints FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        checkpoints = json.loads(row[0]) if row and row[0] else {}
+        checkpoints[stage] = value
+        self.update(task_id, stage=stage, checkpoints=checkpoints, **fields)
+
+    def mark_delivered(self, task_id: str, consumer: str, recipients: list):
+        """
+        consumer의 수신 기록 → 수신자(recipients) 전원이 받았으면 delivered=1
+
+        recipients가 비어 있으면 (수신자 지정 없이 전달된 모델) 이번 수신으로 완료.
+        """
+        if self._db is None:
+            return
+        with self._lock:
+            row = self._db.execute("SELECT deliveries FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        deliveries = json.loads(row[0]) if row and row[0] else {}
+        expected = set(deliveries.get("expected", ())) | set(recipients or ())
+        received = set(deliveries.get("received", ())) | {consumer}
+        self.update(
+            task_id,
+            deliveries={"expected": sorted(expected), "received": sorted(received)},
+            delivered=int(expected <= received),
+        )
+
+    def get(self, task_id: str) -> dict:
+        if self._db is None:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def unfinished(self) -> list:
+        """재시작 시 이어서 처리할 작업 (생성 순)"""
+        return self._select("status IN ('queued', 'processing') ORDER BY created_at")
+
+    def undelivered(self) -> list:
+        """완료됐지만 Unity가 아직 가져가지 않은 작업 (생성 순)"""
+        return self._select("status = 'done' AND delivered = 0 AND payload IS NOT NULL ORDER BY updated_at")
+
+    def _select(self, where: str) -> list:
+        if self._db is None:
+            return []
+        with self._lock:
+            rows = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM tasks WHERE {where}").fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        record = dict(zip(_COLUMNS, row))
+        for key in _JSON_FIELDS:
+            if record[key]:
+                record[key] = json.loads(record[key])
+        return record
@@ -0,0 +1,175 @@
+# backend/template_matcher.py
+import os
+import re
+import time
+
+import cv2
+import numpy as np
+
+TEMPLATE_DIR = os.getenv(
+    "TEMPLATE_DIR",
+    os.path.join(os.path.dirname(__file__), "../data/Mesh_Image"),
+)
+TEMPLATE_MATCH_FEATURES = int(os.getenv("TEMPLATE_MATCH_FEATURES", "1000"))
+TEMPLATE_MATCH_MAX_SIDE = int(os.getenv("TEMPLATE_MATCH_MAX_SIDE", "800"))
+TEMPLATE_MATCH_MIN_INLIERS = int(os.getenv("TEMPLATE_MATCH_MIN_INLIERS", "15"))
+
+_IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def label_from_filename(filename: str) -> str:
+    """'SingleCharacter.png' → 'Single Character' (Vision 결과와 같은 표기)"""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    stem = stem.replace("_", " ").replace("-", " ")
+    return re.sub(r"(?<=[a-z])(?=[A-Z])", " ", stem).strip()
+
+
+def _resize_max_side(gray: np.ndarray, max_side: int) -> tuple:
+    """긴 변을 max_side 이하로 축소 (축소 배율도 함께 반환)"""
+    height, width = gray.shape[:2]
+    scale = min(1.0, max_side / max(width, height))
+    if scale < 1.0:
+        gray = cv2.resize(gray, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+    return gray, scale
+
+
+class TemplateMatcher:
+    """
+    도안 템플릿 이미지와 ORB 특징점 매칭으로 캡처의 도안을 로컬에서 분류.
+
+    템플릿 디스크립터는 시작 시 한 번만 계산하고, 캡처마다 모든 템플릿과
+    매칭해 RANSAC 호모그래피의 inlier 수로 가장 그럴듯한 도안을 고른다.
+    반환되는 호모그래피는 캡처 좌표를 템플릿 좌표로 옮기므로 시트 정렬(rectify)에
+    그대로 사용할 수 있다.
+    """
+
+    def __init__(
+        self,
+        template_dir: str = TEMPLATE_DIR,
+        nfeatures: int = TEMPLATE_MATCH_FEATURES,
+        max_side: int = TEMPLATE_MATCH_MAX_SIDE,
+        min_inliers: int = TEMPLATE_MATCH_MIN_INLIERS,
+        ratio: float = 0.75,
+    ):
+        self.template_dir = template_dir
+        self.max_side = max_side
+        self.min_inliers = min_inliers
+        self.ratio = ratio
+        self.nfeatures = nfeatures
+        self.templates = []  # [{"label", "size", "keypoints", "descriptors"}]
+        self.loaded = False
+
+    def _detector(self):
+        # ORB 객체는 스레드 간 공유하지 않고 호출마다 생성 (생성 비용은 무시할 수준)
+        return cv2.ORB_create(nfeatures=self.nfeatures)
+
+    def load(self) -> int:
+        """템플릿 이미지를 읽어 특징점/디스크립터를 미리 계산"""
+        start = time.time()
+        self.templates = []
+
+        if not os.path.isdir(self.template_dir):
+            print(f"[TemplateMatcher] ⚠️ 템플릿 폴더 없음: {self.template_dir}")
+            self.loaded = True
+            return 0
+
+        detector = self._detector()
+        for filename in sorted(os.listdir(self.template_dir)):
+            if not filename.lower().endswith(_IMAGE_EXTENSIONS):
+                continue
+            path = os.path.join(self.template_dir, filename)
+            gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if gray is None:
+                print(f"[TemplateMatcher] ⚠️ 템플릿 읽기 실패: {path}")
+                continue
+
+            gray, _ = _resize_max_side(gray, self.max_side)
+            keypoints, descriptors = detector.detectAndCompute(gray, None)
+            if descriptors is None or len(keypoints) < self.min_inliers:
+                print(f"[TemplateMatcher] ⚠️ 특징점 부족으로 제외: {filename}")
+                continue
+
+            self.templates.append({
+                "label": label_from_filename(filename),
+                "size": (gray.shape[1], gray.shape[0]),
+                "points": np.float32([kp.pt for kp in keypoints]),
+                "descriptors": descriptors,
+            })
+
+        self.loaded = True
+        labels = [t["label"] for t in self.templates]
+        print(f"[TemplateMatcher] ✅ 템플릿 {len(labels)}개 준비 ({time.time() - start:.2f}초): {labels}")
+        return len(self.templates)
+
+    def match(self, gray: np.ndarray) -> dict:
+        """
+        캡처(그레이스케일)를 모든 템플릿과 매칭
+
+        Args:
+            gray: 회전이 끝난 캡처 이미지 (uint8 그레이스케일, 크기 무관)
+
+        Returns:
+            {
+                "design": "Spaceship" 또는 None,
+                "confidence": 0~1,
+                "inliers": best inlier 수,
+                "homography": 3x3 (원본 캡처 좌표 → 템플릿 좌표) 또는 None,
+                "template_size": (w, h),
+                "elapsed_ms": ...,
+            }
+        """
+        start = time.time()
+        result = {"design": None, "confidence": 0.0, "inliers": 0,
+                  "homography": None, "template_size": None, "elapsed_ms": 0.0}
+
+        if not self.loaded:
+            self.load()
+        if not self.templates:
+            return result
+
+        small, scale = _resize_max_side(gray, self.max_side)
+        keypoints, descriptors = self._detector().detectAndCompute(small, None)
+        if descriptors is None or len(keypoints) < self.min_inliers:
+            result["elapsed_ms"] = (time.time() - start) * 1000
+            return result
+        query_points = np.float32([kp.pt for kp in keypoints])
+
+        matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+        scores = []
+        for template in self.templates:
+            pairs = matcher.knnMatch(descriptors, template["descriptors"], k=2)
+            good = [p[0] for p in pairs if len(p) == 2 and p[0].distance < self.ratio * p[1].distance]
+            if len(good) < 4:
+                scores.append((0, None, template))
+                continue
+
+            src = query_points[[m.queryIdx for m in good]].reshape(-1, 1, 2)
+            dst = template["points"][[m.trainIdx for m in good]].reshape(-1, 1, 2)
+            homography, mask = cv2.findHomography(src, dst, cv2.RANSAC, 5.0)
+            inliers = int(mask.sum()) if mask is not None else 0
+            scores.append((inliers, homography, template))
+
+        scores.sort(key=lambda s: s[0], reverse=True)
+        best_inliers, homography, template = scores[0]
+        second_inliers = scores[1][0] if len(scores) > 1 else 0
+
+        if best_inliers >= self.min_inliers and homography is not None:
+            # 2등과의 차이(구별력)와 절대 inlier 수(신뢰도)를 함께 반영
+            separation = best_inliers / (best_inliers + second_inliers)
+            strength = min(1.0, best_inliers / (self.min_inliers * 3))
+            # 축소 좌표계 호모그래피를 원본 캡처 좌표 기준으로 변환
+            to_small = np.diag([scale, scale, 1.0])
+            result.update(
+                design=template["label"],
+                confidence=round(separation * strength, 3),
+                homography=homography @ to_small,
+                template_size=template["size"],
+            )
+        result["inliers"] = best_inliers
+        result["elapsed_ms"] = round((time.time() - start) * 1000, 1)
+        return result
+
+    @staticmethod
+    def rectify(image: np.ndarray, match: dict) -> np.ndarray:
+        """매칭 결과의 호모그래피로 캡처를 템플릿(시트) 좌표계에 정렬"""
+        return cv2.warpPerspective(image, match["homography"], match["template_size"], flags=cv2.INTER_LINEAR)
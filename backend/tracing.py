@@ -0,0 +1,189 @@
+# backend/tracing.py
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "1") == "1"
+# 메모리에 보관할 최대 span 수 (오래된 것부터 버림, span 하나 ≈ 300바이트)
+TRACE_BUFFER = int(os.getenv("TRACE_BUFFER", "50000"))
+# 이벤트 루프가 이 시간(ms) 이상 늦게 깨어나면 loop stall span으로 기록 (0이면 감시 안 함)
+TRACE_LOOP_STALL_MS = float(os.getenv("TRACE_LOOP_STALL_MS", "50"))
+
+# 현재 코드가 속한 트랙 (작업 ID 또는 "tripo poller" 등)
+# asyncio task와 asyncio.to_thread는 생성 시점의 context를 복사하므로 하위 단계/스레드로 전파된다.
+_track = contextvars.ContextVar("trace_track", default=None)
+
+BACKGROUND_TRACK = "background"
+LOOP_TRACK = "event loop"
+
+# perf_counter → 벽시계 시각 변환 기준 (export 시간 창 필터용)
+_ORIGIN_WALL = time.time()
+_ORIGIN_PERF = time.perf_counter()
+
+
+def now() -> float:
+    """span 시각 기준 (perf_counter)"""
+    return time.perf_counter()
+
+
+def bind_track(track: str):
+    """현재 context(와 이후 만드는 하위 task/스레드)의 span을 track에 기록"""
+    return _track.set(track)
+
+
+class Tracer:
+    """
+    span을 고정 크기 ring에 보관하고 Chrome trace-event JSON으로 내보냄
+
+    span: (track, name, category, start, duration, args)
+    시각은 perf_counter 기준이며 export 시 벽시계 μs로 변환한다.
+    """
+
+    def __init__(self, capacity: int = TRACE_BUFFER, enabled: bool = TRACE_ENABLED):
+        self.enabled = enabled
+        self._spans = deque(maxlen=capacity)
+        self.recorded = 0
+
+    def record(self, name: str, category: str, start: float, duration: float, track: str = None, args: dict = None):
+        """이미 끝난 구간 기록 (start: perf_counter 값, duration: 초)"""
+        if not self.enabled:
+            return
+        if track is None:
+            track = _track.get() or BACKGROUND_TRACK
+        if threading.current_thread() is not threading.main_thread():
+            args = dict(args or {}, thread=threading.current_thread().name)
+        self._spans.append((track, name, category, start, duration, args))
+        self.recorded += 1
+
+    @contextmanager
+    def span(self, name: str, category: str = "", **args):
+        """
+        with 블록 구간 기록 (async 함수 안에서도 사용 가능)
+
+        yield한 dict에 값을 넣으면 span args에 포함된다 (예: 응답 status)
+        """
+        if not self.enabled:
+            yield args
+            return
+        start = time.perf_counter()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(name, category, start, time.perf_counter() - start, args=args or None)
+
+    def clear(self):
+        self._spans.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "spans": len(self._spans),
+            "capacity": self._spans.maxlen,
+            "recorded": self.recorded,
+            "dropped": self.recorded - len(self._spans),
+        }
+
+    def export(self, seconds: float = None, tracks: set = None) -> dict:
+        """
+        Chrome trace-event JSON (Perfetto / chrome://tracing에서 열기)
+
+        작업(track)마다 프로세스 하나로 표시하고, 같은 작업 안에서 겹치는
+        단계(예: vision과 upload)는 서로 다른 lane(스레드)에 배치한다.
+
+        Args:
+            seconds: 최근 몇 초만 (None이면 보관 중인 전체)
+            tracks: 포함할 track 이름 (None이면 전체)
+        """
+        spans = list(self._spans)
+        if seconds is not None:
+            cutoff = time.perf_counter() - seconds
+            spans = [span for span in spans if span[3] + span[4] >= cutoff]
+        if tracks is not None:
+            spans = [span for span in spans if span[0] in tracks]
+        spans.sort(key=lambda span: (span[3], -span[4]))
+
+        events = []
+        pids = {}
+        lanes = {}  # {track: [lane별 열린 span 종료 시각 stack]}
+        named = set()  # 이름을 붙인 (track, lane)
+        for track, name, category, start, duration, args in spans:
+            if track not in pids:
+                pid = pids[track] = len(pids) + 1
+                lanes[track] = []
+                events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": track}})
+                events.append({"name": "process_sort_index", "ph": "M", "pid": pid, "args": {"sort_index": pid}})
+            end = start + duration
+            tid = self._assign_lane(lanes[track], start, end)
+            if (track, tid) not in named:
+                named.add((track, tid))
+                events.append({"name": "thread_name", "ph": "M", "pid": pids[track], "tid": tid,
+                               "args": {"name": f"lane {tid}"}})
+            event = {
+                "name": name,
+                "cat": category or "span",
+                "ph": "X",
+                "pid": pids[track],
+                "tid": tid,
+                "ts": round((_ORIGIN_WALL + start - _ORIGIN_PERF) * 1e6, 1),
+                "dur": round(duration * 1e6, 1),
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    @staticmethod
+    def _assign_lane(lanes: list, start: float, end: float) -> int:
+        """완전히 포함되거나 겹치지 않는 첫 lane 선택 (Chrome trace는 같은 스레드의 span이 중첩 구조여야 함)"""
+        for tid, stack in enumerate(lanes):
+            while stack and stack[-1] <= start:
+                stack.pop()
+            if not stack or end <= stack[-1]:
+                stack.append(end)
+                return tid
+        lanes.append([end])
+        return len(lanes) - 1
+
+
+class LoopStallMonitor:
+    """이벤트 루프가 예정보다 늦게 깨어난 구간을 "event loop" 트랙에 기록"""
+
+    def __init__(self, tracer: Tracer, threshold_ms: float = TRACE_LOOP_STALL_MS, interval: float = 0.1):
+        self.tracer = tracer
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self._task = None
+        self.stalls = 0
+
+    def start(self):
+        if self._task is None and self.threshold > 0 and self.tracer.enabled:
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    async def _run(self):
+        while True:
+            scheduled = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - scheduled
+            if lag >= self.threshold:
+                self.stalls += 1
+                self.tracer.record("loop stall", "loop", scheduled, lag, track=LOOP_TRACK,
+                                   args={"lag_ms": round(lag * 1000, 1)})
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# 프로세스 전체 기본 tracer
+tracer = Tracer()
+span = tracer.span
+record = tracer.record
@@ -1,13 +1,115 @@
 import os
+import time
+import asyncio
+import importlib.util
 import requests
+import httpx
 import base64
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
+from backend import metrics
+from backend import tracing
+
 load_dotenv()
 
 TRIPO_API_KEY = os.getenv("TRIPO_API_KEY")
-TRIPO_API_URL = "https://api.tripo3d.ai/v2/openapi/task"
-TRIPO_UPLOAD_URL = "https://api.tripo3d.ai/v2/openapi/upload/sts"
+# 로컬 시뮬레이터(simulator.py)를 쓰려면 http://localhost:9000/v2/openapi
+TRIPO_API_BASE = os.getenv("TRIPO_API_BASE", "https://api.tripo3d.ai/v2/openapi").rstrip("/")
+TRIPO_API_URL = f"{TRIPO_API_BASE}/task"
+TRIPO_UPLOAD_URL = f"{TRIPO_API_BASE}/upload/sts"
+
+
+def build_image_to_model_payload(image_token: str, model_version: str = "v2.5-20250123", file_type: str = "png") -> dict:
+    """image_to_model 요청 payload 구성 (file_type은 업로드한 이미지 포맷과 일치해야 함)"""
+    return {
+        "type": "image_to_model",
+        "file": {
+            "type": file_type,
+            "file_token": image_token
+        },
+        "texture": True,
+        "pbr": True,
+        "model_version": model_version,
+    }
+
+
+def build_texture_model_payload(
+    original_model_task_id: str,
+    image_token: str = None,
+    texture_image_url: str = None,
+    texture_prompt_text: str = None,
+    model_version: str = "v2.5-20250123",
+    file_type: str = "jpg",
+) -> dict:
+    """texture_model 요청 payload 구성 (문서 기준, file_type은 업로드한 이미지 포맷과 일치해야 함)"""
+    texture_prompt = {}
+
+    if image_token:
+        # 업로드된 이미지 토큰 사용
+        texture_prompt["image"] = {
+            "type": file_type,
+            "file_token": image_token
+        }
+        print(f"[TripoClient] texture_prompt: file_token 사용")
+    elif texture_image_url:
+        # URL 사용 (폴백)
+        texture_prompt["image"] = {
+            "type": "jpg",
+            "url": texture_image_url
+        }
+        print(f"[TripoClient] texture_prompt: URL 사용")
+    elif texture_prompt_text:
+        # 텍스트 프롬프트
+        texture_prompt["text"] = texture_prompt_text
+        print(f"[TripoClient] texture_prompt: 텍스트 사용")
+    else:
+        raise ValueError("texture_image_bytes/url 또는 texture_prompt_text 중 하나는 필요합니다.")
+
+    return {
+        "type": "texture_model",
+        "original_model_task_id": original_model_task_id,
+        "texture_prompt": texture_prompt,
+        "texture_quality": "detailed",
+        "model_version": model_version,
+    }
+
+
+def extract_model_urls(data: dict) -> dict:
+    """
+    성공한 Task 응답(data)에서 GLB URL 추출
+
+    Task 타입에 따라 응답 구조가 다름:
+    texture_model: result.model.url 또는 output.model
+    image_to_model: result.pbr_model.url 또는 output.pbr_model
+    렌더 미리보기 이미지: result.rendered_image.url 또는 output.rendered_image
+
+    Returns:
+        {"model_url": "...", "texture_url": "..." 또는 None} 또는 None
+    """
+    result = data.get("result", {})
+    output = data.get("output", {})
+
+    model_url = (
+        result.get("model", {}).get("url")       # texture_model
+        or result.get("pbr_model", {}).get("url") # image_to_model
+        or output.get("model")                    # texture_model fallback
+        or output.get("pbr_model")                # image_to_model fallback
+    )
+
+    texture_url = (
+        result.get("rendered_image", {}).get("url")
+        or output.get("rendered_image")
+    )
+
+    if model_url:
+        print(f"[TripoClient] ✅ GLB 모델 URL: {model_url[:100]}...")
+        return {"model_url": model_url, "texture_url": texture_url}
+
+    print(f"[TripoClient] ⚠️ 모델 URL을 찾을 수 없습니다")
+    print(f"[TripoClient] result keys: {list(result.keys())}")
+    print(f"[TripoClient] output keys: {list(output.keys())}")
+    return None
 
 
 class Tripo3DClient:
@@ -69,16 +171,7 @@ class Tripo3DClient:
             image_token: 업로드된 이미지의 image_token
             model_version: 모델 버전
         """
-        payload = {
-            "type": "image_to_model",
-            "file": {
-                "type": "png",
-                "file_token": image_token
-            },
-            "texture": True,
-            "pbr": True,
-            "model_version": model_version,
-        }
+        payload = build_image_to_model_payload(image_token, model_version)
 
         print(f"[TripoClient] image_to_model 요청 전송...")
         print(f"[TripoClient] 요청 payload: {payload}")
@@ -125,38 +218,14 @@ class Tripo3DClient:
         if texture_image_bytes:
             image_token = self.upload_image(texture_image_bytes, file_type="jpg")
 
-        # texture_prompt 구성
-        texture_prompt = {}
-
-        if image_token:
-            # 업로드된 이미지 토큰 사용
-            texture_prompt["image"] = {
-                "type": "jpg",
-                "file_token": image_token
-            }
-            print(f"[TripoClient] texture_prompt: file_token 사용")
-        elif texture_image_url:
-            # URL 사용 (폴백)
-            texture_prompt["image"] = {
-                "type": "jpg",
-                "url": texture_image_url
-            }
-            print(f"[TripoClient] texture_prompt: URL 사용")
-        elif texture_prompt_text:
-            # 텍스트 프롬프트
-            texture_prompt["text"] = texture_prompt_text
-            print(f"[TripoClient] texture_prompt: 텍스트 사용")
-        else:
-            raise ValueError("texture_image_bytes/url 또는 texture_prompt_text 중 하나는 필요합니다.")
-
         # Payload 구성 (문서 기준)
-        payload = {
-            "type": "texture_model",
-            "original_model_task_id": original_model_task_id,
-            "texture_prompt": texture_prompt,
-            "texture_quality": "detailed",
-            "model_version": model_version,
-        }
+        payload = build_texture_model_payload(
+            original_model_task_id,
+            image_token=image_token,
+            texture_image_url=texture_image_url,
+            texture_prompt_text=texture_prompt_text,
+            model_version=model_version,
+        )
 
         print(f"[TripoClient] 요청 payload: {payload}")
 
@@ -182,7 +251,7 @@ class Tripo3DClient:
 
     def get_task_status(self, task_id: str):
         """Tripo3D에서 현재 태스크 상태 확인"""
-        status_url = f"https://api.tripo3d.ai/v2/openapi/task/{task_id}"
+        status_url = f"{TRIPO_API_URL}/{task_id}"
         try:
             response = requests.get(status_url, headers=self.headers, timeout=30)
             print(f"[TripoClient] Task Status ({task_id}): {response.status_code}")
@@ -207,9 +276,6 @@ class Tripo3DClient:
         Returns:
             {"model_url": "..."} 또는 None
         """
-        import time
-        import asyncio
-
         print(f"[TripoClient] ⏳ Task {task_id} 완료 대기 중...")
 
         start_time = time.time()
@@ -231,28 +297,7 @@ class Tripo3DClient:
 
                 if task_status == "success":
                     print(f"\n[TripoClient] ✅ Task {task_id} 완료!")
-
-                    # Task 타입에 따라 응답 구조가 다름:
-                    # texture_model: result.model.url 또는 output.model
-                    # image_to_model: result.pbr_model.url 또는 output.pbr_model
-                    result = data.get("result", {})
-                    output = data.get("output", {})
-
-                    model_url = (
-                        result.get("model", {}).get("url")       # texture_model
-                        or result.get("pbr_model", {}).get("url") # image_to_model
-                        or output.get("model")                    # texture_model fallback
-                        or output.get("pbr_model")                # image_to_model fallback
-                    )
-
-                    if model_url:
-                        print(f"[TripoClient] ✅ GLB 모델 URL: {model_url[:100]}...")
-                        return {"model_url": model_url}
-                    else:
-                        print(f"[TripoClient] ⚠️ 모델 URL을 찾을 수 없습니다")
-                        print(f"[TripoClient] result keys: {list(result.keys())}")
-                        print(f"[TripoClient] output keys: {list(output.keys())}")
-                        return None
+                    return extract_model_urls(data)
 
                 elif task_status in ["failed", "error"]:
                     print(f"\n[TripoClient] ❌ Task {task_id} 실패!")
@@ -269,3 +314,248 @@ class Tripo3DClient:
 
         print(f"\n[TripoClient] ⏱️ Task {task_id} 타임아웃 (최대 {max_wait}초)")
         return None
+
+
+# --------------------------------------------------------
+# ⚡ 비동기 클라이언트 (공유 커넥션 풀)
+# --------------------------------------------------------
+TRIPO_HTTP_MAX_CONNECTIONS = int(os.getenv("TRIPO_HTTP_MAX_CONNECTIONS", "20"))
+TRIPO_HTTP_MAX_KEEPALIVE = int(os.getenv("TRIPO_HTTP_MAX_KEEPALIVE", "10"))
+TRIPO_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("TRIPO_HTTP_KEEPALIVE_EXPIRY", "60"))
+TRIPO_HTTP_CONNECT_TIMEOUT = float(os.getenv("TRIPO_HTTP_CONNECT_TIMEOUT", "10"))
+TRIPO_HTTP_TIMEOUT = float(os.getenv("TRIPO_HTTP_TIMEOUT", "30"))
+TRIPO_DOWNLOAD_TIMEOUT = float(os.getenv("TRIPO_DOWNLOAD_TIMEOUT", "60"))
+# 429(요청 한도 초과) / 503 응답 시 재시도 횟수
+TRIPO_MAX_RETRIES = int(os.getenv("TRIPO_MAX_RETRIES", "3"))
+
+# h2 패키지가 설치되어 있을 때만 HTTP/2 사용 (없으면 HTTP/1.1 keep-alive)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+tripo_request_seconds = metrics.histogram(
+    "taone_tripo_request_seconds", "Tripo API 요청 응답 시간 (재시도 1회당)", ("endpoint",)
+)
+tripo_responses = metrics.counter(
+    "taone_tripo_responses_total", "Tripo API 응답 수 (status: HTTP 코드 또는 error)", ("endpoint", "status")
+)
+
+
+def _endpoint(url: str) -> str:
+    """메트릭 라벨용 엔드포인트 이름 (task ID가 라벨에 들어가지 않도록)"""
+    if url == TRIPO_UPLOAD_URL:
+        return "upload"
+    if url == TRIPO_API_URL:
+        return "task_create"
+    return "task_status"
+
+
+# 용도별(호스트별) 공유 클라이언트: "api" = api.tripo3d.ai, "download" = GLB CDN
+_http_clients = {}
+
+
+def get_http_client(purpose: str = "api") -> httpx.AsyncClient:
+    """
+    용도별 공유 httpx.AsyncClient 반환 (최초 호출 시 생성).
+
+    API 호출과 GLB 다운로드는 서로 다른 호스트로 가므로 풀을 분리해서
+    호스트별로 커넥션 수를 제한한다. 같은 풀 안에서는 keep-alive/HTTP2로
+    TLS 핸드셰이크를 재사용한다.
+    """
+    client = _http_clients.get(purpose)
+    if client is None or client.is_closed:
+        read_timeout = TRIPO_DOWNLOAD_TIMEOUT if purpose == "download" else TRIPO_HTTP_TIMEOUT
+        client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=TRIPO_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=TRIPO_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=TRIPO_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=TRIPO_HTTP_CONNECT_TIMEOUT),
+            follow_redirects=True,
+        )
+        _http_clients[purpose] = client
+        print(f"[TripoClient] 🔌 공유 HTTP 클라이언트 생성 ({purpose}, http2={HTTP2_AVAILABLE})")
+    return client
+
+
+async def close_http_clients():
+    """서버 종료 시 공유 클라이언트 정리"""
+    for purpose, client in list(_http_clients.items()):
+        await client.aclose()
+        print(f"[TripoClient] 🔌 공유 HTTP 클라이언트 종료 ({purpose})")
+    _http_clients.clear()
+
+
+class AsyncTripo3DClient:
+    """
+    Tripo3DClient의 비동기 버전.
+
+    requests 대신 공유 httpx.AsyncClient를 사용하므로 이벤트 루프를 막지 않고,
+    여러 캡처가 동시에 처리되어도 커넥션을 재사용한다.
+    메서드 이름과 반환값은 Tripo3DClient와 동일하다.
+    (완료 대기는 제외: 서버에서는 TripoTaskPoller.wait가 모든 task를 한 루프에서 폴링)
+    """
+
+    def __init__(self, api_key: str = None):
+        self.api_key = api_key or TRIPO_API_KEY
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+        }
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        return get_http_client("api")
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """요청 전송 (429/503이면 Retry-After 또는 지수 백오프 후 재시도)"""
+        endpoint = _endpoint(url)
+        for attempt in range(TRIPO_MAX_RETRIES + 1):
+            started = time.perf_counter()
+            with tracing.span(f"tripo {endpoint}", "http", method=method, attempt=attempt) as span_args:
+                try:
+                    response = await self.http.request(method, url, **kwargs)
+                except httpx.HTTPError:
+                    tripo_responses.inc(endpoint=endpoint, status="error")
+                    raise
+                finally:
+                    tripo_request_seconds.observe(time.perf_counter() - started, endpoint=endpoint)
+                span_args["status"] = response.status_code
+            tripo_responses.inc(endpoint=endpoint, status=response.status_code)
+            if response.status_code not in (429, 503) or attempt == TRIPO_MAX_RETRIES:
+                return response
+            retry_after = response.headers.get("Retry-After")
+            try:
+                delay = float(retry_after) if retry_after else 2 ** attempt
+            except ValueError:
+                delay = 2 ** attempt
+            print(f"[TripoClient] ⏳ {response.status_code} 응답, {delay:.1f}초 후 재시도 ({attempt + 1}/{TRIPO_MAX_RETRIES})")
+            await asyncio.sleep(delay)
+        return response
+
+    async def upload_image(self, image_bytes: bytes, file_type: str = "png") -> str:
+        """
+        이미지를 Tripo3D 서버에 업로드하고 image_token 획득
+
+        Returns:
+            image_token (str) 또는 None
+        """
+        try:
+            files = {"file": (f"image.{file_type}", image_bytes, f"image/{file_type}")}
+            upload_headers = {"Authorization": f"Bearer {self.api_key}"}
+
+            response = await self._send("POST", TRIPO_UPLOAD_URL, headers=upload_headers, files=files)
+
+            print(f"[TripoClient] 이미지 업로드 응답: {response.status_code}")
+
+            if response.status_code != 200:
+                print(f"[TripoClient] 업로드 실패: {response.text}")
+                return None
+
+            result = response.json()
+            if result.get("code") == 0:
+                image_token = result.get("data", {}).get("image_token")
+                if image_token:
+                    print(f"[TripoClient] ✅ 이미지 업로드 완료! Token: {image_token}")
+                    return image_token
+
+        except Exception as e:
+            print(f"[TripoClient] 업로드 오류: {str(e)}")
+
+        return None
+
+    async def _post_task(self, payload: dict) -> dict:
+        """task 생성 요청 공통 처리"""
+        print(f"[TripoClient] 요청 payload: {payload}")
+        try:
+            response = await self._send("POST", TRIPO_API_URL, headers=self.headers, json=payload)
+            print(f"[TripoClient] 응답 상태: {response.status_code}")
+            print(f"[TripoClient] 응답 내용: {response.text}")
+
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            print(f"[TripoClient] HTTP 오류: {e.response.status_code}")
+            print(f"[TripoClient] 오류 상세: {e.response.text}")
+            raise
+        except Exception as e:
+            print(f"[TripoClient] 예상치 못한 오류: {str(e)}")
+            raise
+
+    async def image_to_model(self, image_token: str, model_version: str = "v2.5-20250123", file_type: str = "png"):
+        """이미지에서 바로 3D 모델 생성 (Tripo3DClient.image_to_model 참고)"""
+        print(f"[TripoClient] image_to_model 요청 전송...")
+        return await self._post_task(build_image_to_model_payload(image_token, model_version, file_type))
+
+    async def texture_existing_model(
+        self,
+        original_model_task_id: str,
+        texture_image_bytes: bytes = None,
+        texture_image_url: str = None,
+        texture_prompt_text: str = None,
+        model_version: str = "v2.5-20250123",
+        image_token: str = None,
+        file_type: str = "jpg",
+    ):
+        """
+        기존 모델에 새 텍스처를 입힘 (Tripo3DClient.texture_existing_model 참고)
+
+        image_token: 이미 업로드한 이미지의 토큰 (있으면 texture_image_bytes 업로드 생략)
+        """
+        if texture_image_bytes and not image_token:
+            image_token = await self.upload_image(texture_image_bytes, file_type=file_type)
+
+        print(f"[TripoClient] texture_model 요청 전송...")
+        payload = build_texture_model_payload(
+            original_model_task_id,
+            image_token=image_token,
+            texture_image_url=texture_image_url,
+            texture_prompt_text=texture_prompt_text,
+            model_version=model_version,
+            file_type=file_type,
+        )
+        return await self._post_task(payload)
+
+    async def get_task_status(self, task_id: str):
+        """Tripo3D에서 현재 태스크 상태 확인"""
+        try:
+            response = await self._send("GET", f"{TRIPO_API_URL}/{task_id}", headers=self.headers)
+            print(f"[TripoClient] Task Status ({task_id}): {response.status_code}")
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            print(f"[TripoClient] Task Status HTTP 오류: {e.response.status_code}")
+            print(f"[TripoClient] 오류 상세: {e.response.text}")
+            raise
+        except Exception as e:
+            print(f"[TripoClient] Task Status 조회 오류: {str(e)}")
+            raise
+
+    async def download(self, url: str) -> bytes:
+        """완성된 GLB 등 결과 파일 다운로드 (다운로드 전용 풀 사용)"""
+        with tracing.span("tripo download", "http") as span_args:
+            response = await get_http_client("download").get(url)
+            span_args["status"] = response.status_code
+            span_args["bytes"] = len(response.content)
+        response.raise_for_status()
+        return response.content
+
+    @asynccontextmanager
+    async def stream_download(self, url: str):
+        """
+        결과 파일 스트리밍 다운로드 (메모리에 전체를 올리지 않음)
+
+        span은 async with 블록이 끝날 때(본문까지 다 받은 뒤) 기록된다.
+
+        사용법:
+            async with client.stream_download(url) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(): ...
+        """
+        with tracing.span("tripo download", "http", stream=True) as span_args:
+            async with get_http_client("download").stream("GET", url) as response:
+                span_args["status"] = response.status_code
+                try:
+                    yield response
+                finally:
+                    span_args["bytes"] = response.num_bytes_downloaded
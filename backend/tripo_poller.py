@@ -0,0 +1,284 @@
+# backend/tripo_poller.py
+import os
+import time
+import asyncio
+from collections import deque
+
+from backend.tripo_client import extract_model_urls
+from backend import tracing
+
+TRIPO_POLL_MIN_INTERVAL = float(os.getenv("TRIPO_POLL_MIN_INTERVAL", "1.0"))
+TRIPO_POLL_MAX_INTERVAL = float(os.getenv("TRIPO_POLL_MAX_INTERVAL", "15.0"))
+TRIPO_POLL_FRACTION = float(os.getenv("TRIPO_POLL_FRACTION", "0.3"))
+TRIPO_EXPECTED_DURATION = float(os.getenv("TRIPO_EXPECTED_DURATION", "90"))
+TRIPO_POLL_CONCURRENCY = int(os.getenv("TRIPO_POLL_CONCURRENCY", "8"))
+
+
+class _Watch:
+    """폴러가 관리하는 Tripo task 하나의 상태"""
+
+    __slots__ = (
+        "task_id", "future", "started_at", "next_poll_at", "status",
+        "progress", "errors", "polls", "callbacks", "waiters",
+    )
+
+    def __init__(self, task_id: str, started_at: float):
+        self.task_id = task_id
+        self.future = asyncio.get_running_loop().create_future()
+        self.started_at = started_at
+        self.next_poll_at = time.monotonic()
+        self.status = "queued"
+        self.progress = 0
+        self.errors = 0
+        self.polls = 0
+        self.callbacks = []
+        self.waiters = 0
+
+
+class TripoTaskPoller:
+    """
+    진행 중인 모든 Tripo task를 하나의 백그라운드 루프에서 폴링하는 멀티플렉서.
+
+    task마다 3초 sleep 루프를 돌리는 대신, 각 task의 다음 조회 시각을
+    보고된 progress와 최근 완료 시간 분포로 예측한 남은 시간에 맞춰 잡는다.
+    (초반에는 드물게, 예상 완료 시점 근처에서는 촘촘하게)
+    대기자는 future로 완료 결과를 받는다.
+    """
+
+    def __init__(
+        self,
+        client,
+        min_interval: float = TRIPO_POLL_MIN_INTERVAL,
+        max_interval: float = TRIPO_POLL_MAX_INTERVAL,
+        poll_fraction: float = TRIPO_POLL_FRACTION,
+        expected_duration: float = TRIPO_EXPECTED_DURATION,
+        max_concurrent_polls: int = TRIPO_POLL_CONCURRENCY,
+        history_size: int = 50,
+    ):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.poll_fraction = poll_fraction
+        self.expected_duration = expected_duration
+        self.max_concurrent_polls = max_concurrent_polls
+
+        self._watches = {}  # {tripo_task_id: _Watch}
+        self._durations = deque(maxlen=history_size)  # 최근 완료 소요 시간 (초)
+        self._loop_task = None
+        self._wakeup = None
+
+        self.total_polls = 0
+        self.total_completed = 0
+        self.total_failed = 0
+
+    # ----------------------------------------------------
+    # 대기자 API
+    # ----------------------------------------------------
+    async def wait(self, task_id: str, max_wait: int = 600, on_progress=None, started_at: float = None) -> dict:
+        """
+        Task 완료까지 대기하고 GLB URL 반환 (wait_for_task_completion 대체)
+
+        Args:
+            task_id: Tripo task ID
+            max_wait: 최대 대기 시간 (초)
+            on_progress: 폴링마다 호출되는 콜백 (status, progress)
+            started_at: task 생성 시각 (time.monotonic 기준, 재연결 시 사용)
+
+        Returns:
+            {"model_url": "..."} 또는 None
+        """
+        watch = self._watches.get(task_id)
+        if watch is None:
+            watch = _Watch(task_id, started_at or time.monotonic())
+            self._watches[task_id] = watch
+            print(f"[TripoPoller] 👀 Task {task_id} 감시 시작 (감시 중: {len(self._watches)}개)")
+        if on_progress:
+            watch.callbacks.append(on_progress)
+        watch.waiters += 1
+
+        self._ensure_loop()
+
+        try:
+            data = await asyncio.wait_for(asyncio.shield(watch.future), timeout=max_wait)
+        except asyncio.TimeoutError:
+            print(f"[TripoPoller] ⏱️ Task {task_id} 타임아웃 (최대 {max_wait}초)")
+            return None
+        finally:
+            watch.waiters -= 1
+            if on_progress in watch.callbacks:
+                watch.callbacks.remove(on_progress)
+            if watch.waiters <= 0 and not watch.future.done():
+                # 더 이상 기다리는 쪽이 없으면 감시 종료
+                self._watches.pop(task_id, None)
+                watch.future.cancel()
+
+        if data is None:
+            return None
+        return extract_model_urls(data)
+
+    def stats(self) -> dict:
+        """폴러 상태 (디버깅용)"""
+        now = time.monotonic()
+        return {
+            "watching": len(self._watches),
+            "total_polls": self.total_polls,
+            "completed": self.total_completed,
+            "failed": self.total_failed,
+            "predicted_duration": round(self._predicted_duration(), 1),
+            "tasks": [
+                {
+                    "task_id": w.task_id,
+                    "status": w.status,
+                    "progress": w.progress,
+                    "polls": w.polls,
+                    "elapsed": round(now - w.started_at, 1),
+                    "next_poll_in": round(max(0.0, w.next_poll_at - now), 1),
+                }
+                for w in self._watches.values()
+            ],
+        }
+
+    async def close(self):
+        """서버 종료 시 폴링 루프 정리"""
+        if self._loop_task and not self._loop_task.done():
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+        for watch in self._watches.values():
+            if not watch.future.done():
+                watch.future.cancel()
+        self._watches.clear()
+
+    # ----------------------------------------------------
+    # 스케줄링
+    # ----------------------------------------------------
+    def _predicted_duration(self) -> float:
+        """최근 완료 시간 분포의 중앙값 (기록이 없으면 기본값)"""
+        if not self._durations:
+            return self.expected_duration
+        ordered = sorted(self._durations)
+        return ordered[len(ordered) // 2]
+
+    def _estimate_remaining(self, watch: _Watch, now: float) -> float:
+        """task의 남은 시간 추정 (초)"""
+        elapsed = now - watch.started_at
+
+        # 1️⃣ 분포 기반: 아직 끝나지 않은 과거 사례들 중 중앙값
+        longer = sorted(d - elapsed for d in self._durations if d > elapsed)
+        if longer:
+            remaining_hist = longer[len(longer) // 2]
+        elif self._durations:
+            # 이미 과거 어떤 사례보다 오래 걸리고 있음 → 곧 끝날 가능성이 높음
+            remaining_hist = self.min_interval
+        else:
+            remaining_hist = max(self.expected_duration - elapsed, self.min_interval)
+
+        # 2️⃣ progress 기반: 지금까지의 진행 속도로 외삽
+        if 0 < watch.progress < 100 and elapsed > 0:
+            remaining_prog = elapsed * (100 - watch.progress) / watch.progress
+            return (remaining_hist + remaining_prog) / 2
+
+        return remaining_hist
+
+    def _schedule_next(self, watch: _Watch, now: float):
+        if watch.errors:
+            # 오류가 나면 지수 백오프
+            interval = min(self.max_interval, self.min_interval * (2 ** watch.errors))
+        else:
+            remaining = self._estimate_remaining(watch, now)
+            interval = remaining * self.poll_fraction
+            interval = max(self.min_interval, min(self.max_interval, interval))
+        watch.next_poll_at = now + interval
+
+    # ----------------------------------------------------
+    # 폴링 루프
+    # ----------------------------------------------------
+    def _ensure_loop(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run())
+        else:
+            # 새 task가 들어왔으니 대기 중인 루프를 깨워 스케줄을 다시 계산
+            self._wakeup.set()
+
+    async def _run(self):
+        # 루프를 처음 깨운 작업의 트랙을 물려받으므로, 폴링 요청은 별도 트랙에 기록
+        tracing.bind_track("tripo poller")
+        print(f"[TripoPoller] 🔄 폴링 루프 시작")
+        semaphore = asyncio.Semaphore(self.max_concurrent_polls)
+
+        async def poll_limited(watch):
+            async with semaphore:
+                await self._poll(watch)
+
+        try:
+            while self._watches:
+                now = time.monotonic()
+                due = [w for w in self._watches.values() if w.next_poll_at <= now]
+
+                if due:
+                    await asyncio.gather(*(poll_limited(w) for w in due))
+                    continue
+
+                next_at = min(w.next_poll_at for w in self._watches.values())
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, next_at - now))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            print(f"[TripoPoller] 💤 폴링 루프 종료 (감시할 task 없음)")
+
+    async def _poll(self, watch: _Watch):
+        self.total_polls += 1
+        watch.polls += 1
+        now = time.monotonic()
+
+        try:
+            status_response = await self.client.get_task_status(watch.task_id)
+        except Exception as e:
+            watch.errors += 1
+            print(f"[TripoPoller] ⚠️ Task {watch.task_id} 조회 오류 ({watch.errors}회): {str(e)}")
+            self._schedule_next(watch, time.monotonic())
+            return
+
+        watch.errors = 0
+
+        if status_response.get("code") != 0:
+            print(f"[TripoPoller] ❌ Task 조회 실패: {status_response}")
+            self._finish(watch, None)
+            return
+
+        data = status_response.get("data", {})
+        watch.status = data.get("status")
+        watch.progress = data.get("progress", 0) or 0
+
+        for callback in list(watch.callbacks):
+            try:
+                callback(watch.status, watch.progress)
+            except Exception as e:
+                print(f"[TripoPoller] ⚠️ progress 콜백 오류: {e}")
+
+        if watch.status == "success":
+            duration = now - watch.started_at
+            if watch.polls > 1:
+                # 첫 조회부터 완료 상태면 (이미 끝난 task 재사용 등) 실제 생성 시간을 알 수 없으므로
+                # 분포에 넣지 않음 (0초가 쌓이면 이후 task를 min_interval로 과하게 폴링하게 됨)
+                self._durations.append(duration)
+            self.total_completed += 1
+            print(f"[TripoPoller] ✅ Task {watch.task_id} 완료! ({duration:.1f}초, 조회 {watch.polls}회)")
+            self._finish(watch, data)
+        elif watch.status in ["failed", "error", "cancelled", "banned", "expired"]:
+            self.total_failed += 1
+            print(f"[TripoPoller] ❌ Task {watch.task_id} 실패! (상태: {watch.status})")
+            self._finish(watch, None)
+        else:
+            self._schedule_next(watch, time.monotonic())
+
+    def _finish(self, watch: _Watch, data):
+        self._watches.pop(watch.task_id, None)
+        if not watch.future.done():
+            watch.future.set_result(data)
@@ -1,9 +1,50 @@
-# backend/unity_bridge.py
-import json
+# backend/unity_receiver.py
+import os
+import time
+import asyncio
 import aiohttp
 
 # Unity 쪽에서 열어둔 HTTP 수신 엔드포인트 주소
-UNITY_ENDPOINT = "http://localhost:8080/unity_receive"
+UNITY_ENDPOINT = os.getenv("UNITY_ENDPOINT", "http://localhost:8080/unity_receive")
+UNITY_PUSH_TIMEOUT = float(os.getenv("UNITY_PUSH_TIMEOUT", "5"))
+# 전송 대기열 최대 길이 (가득 차면 폴링 큐로 넘김)
+UNITY_PUSH_QUEUE_MAX = int(os.getenv("UNITY_PUSH_QUEUE_MAX", "200"))
+# 이 시간(초) 안에 들어온 모델은 한 번의 POST로 묶어서 전송
+UNITY_PUSH_BATCH_WINDOW = float(os.getenv("UNITY_PUSH_BATCH_WINDOW", "0.05"))
+UNITY_PUSH_BATCH_MAX = int(os.getenv("UNITY_PUSH_BATCH_MAX", "16"))
+UNITY_PUSH_RETRIES = int(os.getenv("UNITY_PUSH_RETRIES", "3"))
+UNITY_PUSH_BACKOFF = float(os.getenv("UNITY_PUSH_BACKOFF", "0.5"))
+# 재시도까지 모두 실패하면 이 시간(초) 동안은 push하지 않고 바로 폴링 큐 사용
+UNITY_PUSH_COOLDOWN = float(os.getenv("UNITY_PUSH_COOLDOWN", "30"))
+
+_session = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Unity 전송용 공유 세션 (keep-alive 연결 재사용)"""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=UNITY_PUSH_TIMEOUT),
+        )
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+async def _post(body) -> str:
+    async with get_session().post(UNITY_ENDPOINT, json=body) as resp:
+        text = await resp.text()
+        if resp.status != 200:
+            raise RuntimeError(f"Unity 전송 실패 ({resp.status}): {text}")
+        return text
+
 
 async def send_to_unity(payload: dict):
     """
@@ -12,13 +53,138 @@ async def send_to_unity(payload: dict):
     Args:
         payload (dict): Unity로 보낼 데이터 (예: 도안 정보, task_id 등)
     """
-    async with aiohttp.ClientSession() as session:
+    try:
+        text = await _post(payload)
+        print(f"[UnityBridge] Unity 응답: {text}")
+        return text
+    except Exception as e:
+        print(f"[UnityBridge] 전송 오류: {e}")
+
+
+class UnityPusher:
+    """
+    완성된 모델을 Unity 수신 엔드포인트로 바로 보내는 push 전달
+
+    - 모델은 제한된 대기열에 들어가고, 워커 하나가 batch_window 동안 모인
+      모델을 한 번에 POST한다 (1개면 payload 그대로, 여러 개면 {"models": [...]})
+    - 실패하면 지수 백오프로 재시도하고, 끝내 실패하면 on_failure로 넘겨
+      폴링 큐(/get_latest_model)로 전달되게 한다
+    - 수신 엔드포인트가 죽어 있으면 cooldown 동안 offer가 바로 거절된다
+    """
+
+    def __init__(
+        self,
+        on_delivered=None,
+        on_failure=None,
+        queue_max: int = UNITY_PUSH_QUEUE_MAX,
+        batch_window: float = UNITY_PUSH_BATCH_WINDOW,
+        batch_max: int = UNITY_PUSH_BATCH_MAX,
+        retries: int = UNITY_PUSH_RETRIES,
+        backoff: float = UNITY_PUSH_BACKOFF,
+        cooldown: float = UNITY_PUSH_COOLDOWN,
+    ):
+        self.on_delivered = on_delivered  # async def (payloads)
+        self.on_failure = on_failure      # async def (payloads)
+        self.queue_max = queue_max
+        self.batch_window = batch_window
+        self.batch_max = max(1, batch_max)
+        self.retries = retries
+        self.backoff = backoff
+        self.cooldown = cooldown
+
+        self._queue = None
+        self._worker = None
+        self._down_until = 0.0
+
+        self.delivered = 0
+        self.batches = 0
+        self.retried = 0
+        self.fallbacks = 0
+        self.rejected = 0
+
+    def start(self):
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_max)
+            self._worker = asyncio.create_task(self._run())
+            print(f"[UnityBridge] 🚀 push 전달 시작 → {UNITY_ENDPOINT}")
+
+    def offer(self, payload: dict) -> bool:
+        """전송 대기열에 추가 (실행 중이 아니거나, 가득 찼거나, 수신측이 다운 상태면 False)"""
+        if self._worker is None or time.monotonic() < self._down_until:
+            self.rejected += 1
+            return False
         try:
-            async with session.post(UNITY_ENDPOINT, json=payload) as resp:
-                text = await resp.text()
-                if resp.status != 200:
-                    raise RuntimeError(f"Unity 전송 실패 ({resp.status}): {text}")
-                print(f"[UnityBridge] Unity 응답: {text}")
-                return text
-        except Exception as e:
-            print(f"[UnityBridge] 전송 오류: {e}")
+            self._queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        return True
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_max:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._deliver(batch)
+
+    async def _deliver(self, batch: list):
+        body = batch[0] if len(batch) == 1 else {"models": batch}
+        for attempt in range(self.retries + 1):
+            try:
+                await _post(body)
+                self.delivered += len(batch)
+                self.batches += 1
+                print(f"[UnityBridge] ✅ Unity로 {len(batch)}개 전송")
+                if self.on_delivered:
+                    await self.on_delivered(batch)
+                return
+            except Exception as e:
+                if attempt < self.retries:
+                    self.retried += 1
+                    delay = self.backoff * (2 ** attempt)
+                    print(f"[UnityBridge] ⚠️ 전송 실패 ({e}), {delay:.1f}초 후 재시도 ({attempt + 1}/{self.retries})")
+                    await asyncio.sleep(delay)
+                else:
+                    print(f"[UnityBridge] ❌ 전송 실패 ({e}), 폴링 큐로 전환 ({self.cooldown:.0f}초)")
+
+        self._down_until = time.monotonic() + self.cooldown
+        await self._fallback(batch)
+
+    async def _fallback(self, batch: list):
+        self.fallbacks += len(batch)
+        if self.on_failure:
+            await self.on_failure(batch)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._worker is not None,
+            "endpoint": UNITY_ENDPOINT,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "receiver_down": time.monotonic() < self._down_until,
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "retried": self.retried,
+            "fallbacks": self.fallbacks,
+            "rejected": self.rejected,
+        }
+
+    async def close(self):
+        """워커 중지 (보내지 못한 모델은 폴링 큐로)"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+        leftover = []
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+        if leftover:
+            await self._fallback(leftover)
+        await close_session()
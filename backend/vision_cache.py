@@ -0,0 +1,221 @@
+# backend/vision_cache.py
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from Utils.image_hash import hamming, color_distance, to_hex, from_hex
+
+VISION_CACHE_PATH = os.getenv(
+    "VISION_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), "../data/cache/vision_cache.sqlite3"),
+)
+VISION_CACHE_MAX_ENTRIES = int(os.getenv("VISION_CACHE_MAX_ENTRIES", "5000"))
+VISION_CACHE_TTL = float(os.getenv("VISION_CACHE_TTL", str(7 * 24 * 3600)))  # 기본 7일
+# 재촬영 근접 일치 임계값: 헤더 띠 pHash 해밍 거리 (좁게)
+VISION_CACHE_MAX_DISTANCE = int(os.getenv("VISION_CACHE_MAX_DISTANCE", "6"))
+# 근접 일치 2차 확인: 그림 영역 pHash 해밍 거리 / 격자별 색차 최대 차이 (중복 감지와 같은 기준)
+VISION_CACHE_DRAWING_MAX_DISTANCE = int(os.getenv("VISION_CACHE_DRAWING_MAX_DISTANCE", "8"))
+VISION_CACHE_COLOR_MAX_DIFF = int(os.getenv("VISION_CACHE_COLOR_MAX_DIFF", "8"))
+
+
+class VisionCache:
+    """
+    Vision 입력(헤더 띠 JPEG)의 SHA-256 → Vision OCR 결과 캐시 (SQLite에 영속 저장)
+
+    - 정확히 일치: OpenAI에 보낼 입력이 바이트 단위로 같음 (같은 사진 재전송, 재시도)
+    - 근접 일치: 같은 시트를 다시 찍음 (흐린 사진 재촬영 등)
+      헤더 띠는 대부분 인쇄된 도안 제목이라 pHash만으로는 이름이 다른 아이끼리도
+      가까우므로, 그림 영역 pHash와 색 시그니처까지 모두 임계값 이내일 때만 인정한다.
+      아이마다 색칠이 다르므로 다른 아이의 시트가 이 조건을 통과하지 않는다.
+
+    조회는 메모리(LRU 순서)에서, 저장/삭제는 SQLite에 반영해 서버 재시작 후에도 유지된다.
+    """
+
+    def __init__(
+        self,
+        path: str = VISION_CACHE_PATH,
+        max_entries: int = VISION_CACHE_MAX_ENTRIES,
+        ttl: float = VISION_CACHE_TTL,
+        max_distance: int = VISION_CACHE_MAX_DISTANCE,
+        drawing_max_distance: int = VISION_CACHE_DRAWING_MAX_DISTANCE,
+        color_max_diff: int = VISION_CACHE_COLOR_MAX_DIFF,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.drawing_max_distance = drawing_max_distance
+        self.color_max_diff = color_max_diff
+
+        # {sha256 hex: {"result", "header_hash", "drawing_hash", "color", "created_at", "last_used"}} (LRU 순서)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ----------------------------------------------------
+    # 영속화
+    # ----------------------------------------------------
+    def open(self):
+        """DB 열기 및 메모리 인덱스 적재 (만료 항목은 정리)"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(vision_cache)")}
+        if columns and "drawing_hash" not in columns:
+            # 이전 형식(근접 일치 2차 확인 정보 없음)은 버림 (캐시이므로 다시 채워짐)
+            self._db.execute("DROP TABLE vision_cache")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS vision_cache ("
+            " hash TEXT PRIMARY KEY, result TEXT NOT NULL,"
+            " header_hash TEXT, drawing_hash TEXT, color TEXT,"
+            " created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("DELETE FROM vision_cache WHERE created_at < ?", (time.time() - self.ttl,))
+        self._db.commit()
+
+        rows = self._db.execute(
+            "SELECT hash, result, header_hash, drawing_hash, color, created_at, last_used"
+            " FROM vision_cache ORDER BY last_used"
+        ).fetchall()
+        with self._lock:
+            self._entries.clear()
+            for key, result, header_hash, drawing_hash, color, created_at, last_used in rows:
+                self._entries[key] = {
+                    "result": json.loads(result),
+                    "header_hash": from_hex(header_hash) if header_hash else None,
+                    "drawing_hash": from_hex(drawing_hash) if drawing_hash else None,
+                    "color": bytes.fromhex(color) if color else None,
+                    "created_at": created_at,
+                    "last_used": last_used,
+                }
+        print(f"[VisionCache] ✅ 캐시 로드: {len(rows)}개 ({self.path})")
+
+    def close(self):
+        if self._db is None:
+            return
+        with self._lock:
+            # 조회 시각은 메모리에서만 갱신했으므로 종료 시 한 번에 반영
+            self._db.executemany(
+                "UPDATE vision_cache SET last_used = ? WHERE hash = ?",
+                [(e["last_used"], k) for k, e in self._entries.items()],
+            )
+            self._db.commit()
+            self._db.close()
+            self._db = None
+
+    # ----------------------------------------------------
+    # 조회 / 저장
+    # ----------------------------------------------------
+    def get(self, key: str, header_hash: int = None, drawing_hash: int = None, color: bytes = None) -> dict:
+        """
+        캐시 조회 (정확히 일치 → 근접 일치 중 최근접 순, 만료 항목은 삭제)
+
+        Args:
+            key: Vision 입력 bytes의 SHA-256
+            header_hash: 헤더 띠 pHash
+            drawing_hash, color: 그림 영역 pHash / color_signature (근접 일치 2차 확인)
+                                 셋 중 하나라도 없으면 정확히 일치할 때만 재사용
+
+        Returns:
+            {"design", "child_name"} 또는 None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            near = False
+
+            if entry is None and None not in (header_hash, drawing_hash, color):
+                found = self._nearest(header_hash, drawing_hash, color)
+                if found:
+                    key, entry = found
+                    near = True
+
+            if entry is not None and now - entry["created_at"] > self.ttl:
+                self._remove(key)
+                if self._db is not None:
+                    self._db.commit()
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            entry["last_used"] = now
+            self._entries.move_to_end(key)
+            if near:
+                self.near_hits += 1
+            else:
+                self.hits += 1
+            return dict(entry["result"])
+
+    def _nearest(self, header_hash: int, drawing_hash: int, color: bytes):
+        """헤더·그림 pHash와 색 시그니처가 모두 임계값 이내인 항목 중 최근접 → (key, entry)"""
+        best = None
+        for candidate, entry in self._entries.items():
+            if entry["drawing_hash"] is None:
+                continue
+            header_distance = hamming(header_hash, entry["header_hash"])
+            drawing_distance = hamming(drawing_hash, entry["drawing_hash"])
+            if (header_distance > self.max_distance or drawing_distance > self.drawing_max_distance
+                    or color_distance(color, entry["color"]) > self.color_max_diff):
+                continue
+            distance = header_distance + drawing_distance
+            if best is None or distance < best[0]:
+                best = (distance, candidate, entry)
+        return best[1:] if best else None
+
+    def put(self, key: str, result: dict, header_hash: int = None, drawing_hash: int = None, color: bytes = None):
+        """결과 저장 (최대 개수 초과 시 가장 오래 안 쓴 항목부터 제거)"""
+        now = time.time()
+        complete = None not in (header_hash, drawing_hash, color)
+        with self._lock:
+            self._entries[key] = {
+                "result": dict(result),
+                "header_hash": header_hash if complete else None,
+                "drawing_hash": drawing_hash if complete else None,
+                "color": color if complete else None,
+                "created_at": now,
+                "last_used": now,
+            }
+            self._entries.move_to_end(key)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO vision_cache"
+                    " (hash, result, header_hash, drawing_hash, color, created_at, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, json.dumps(result, ensure_ascii=False),
+                     to_hex(header_hash) if complete else None,
+                     to_hex(drawing_hash) if complete else None,
+                     color.hex() if complete else None, now, now),
+                )
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            if self._db is not None:
+                self._db.commit()
+
+    def _remove(self, key: str):
+        """메모리와 DB에서 삭제 (commit은 호출한 쪽에서)"""
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM vision_cache WHERE hash = ?", (key,))
+
+    def stats(self) -> dict:
+        """히트/미스 카운터 (메트릭용)"""
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.near_hits) / lookups, 3) if lookups else 0.0,
+        }
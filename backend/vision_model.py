@@ -1,52 +1,80 @@
 # backend/vision_model.py
 import os
+import time
 from openai import OpenAI
 import base64
 import re
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from backend import metrics
+from backend import tracing
 
-def analyze_drawing_text(image_b64: str) -> dict:
+# OPENAI_BASE_URL: 로컬 시뮬레이터(simulator.py)를 쓰려면 http://localhost:9000/v1
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=os.getenv("OPENAI_BASE_URL") or None)
+
+openai_request_seconds = metrics.histogram("taone_openai_request_seconds", "OpenAI Vision 요청 응답 시간")
+openai_responses = metrics.counter(
+    "taone_openai_responses_total", "OpenAI Vision 응답 수 (status: HTTP 코드 또는 error)", ("status",)
+)
+
+
+def record_openai_call(started: float, status):
+    duration = time.perf_counter() - started
+    openai_request_seconds.observe(duration)
+    openai_responses.inc(status=status)
+    # to_thread로 호출되어도 호출한 작업의 트랙에 기록됨
+    tracing.record("openai chat.completions", "http", started, duration, args={"status": status})
+
+
+def analyze_drawing_text(image_b64: str, detail: str = "auto") -> dict:
     """
     그림의 상단 텍스트를 읽어 도안명과 아이 이름을 추출.
+    Args:
+        image_b64: 헤더(텍스트) 영역 JPEG의 base64
+        detail: OpenAI 이미지 detail ("low", "high", "auto")
     Returns:
         dict: {"design": "Spaceship", "child_name": "Minjun"}
     """
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-        {
-            "role": "system",
-            "content": (
-                "너는 이미지 안의 텍스트를 정확히 읽는 OCR 분석가야. "
-                "이미지의 상단에 글씨가 거꾸로 되어 있거나 작게 써있을 수 있으니, "
-                "필요하면 이미지를 회전시켜서 모든 글씨를 읽어야 해. "
-                "반드시 다음 JSON 형식으로만 응답해: "
-                '{"design": "Spaceship", "child_name": "Minjun"} '
-                "도안명은 spaceship, locket, single character 중 하나만 가능해."
-            ),
-        },
-        {
-            "role": "user",
-            "content": [
-                {
-                    "type": "text",
-                    "text": (
-                        "이 그림의 텍스트에서 도안명과 어린이 이름을 추출해. "
-                        "다음 형식의 JSON만 반환해. 다른 글은 절대 쓰지마. "
-                        '{"design": "...", "child_name": "..."}'
-                    ),
-                },
-                {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/jpeg;base64,{image_b64}"}
-                },
-            ],
-        },
-    ],
-    max_tokens=200,
-    temperature=0,  # 더 결정적인 응답
-    )
+    started = time.perf_counter()
+    try:
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+            {
+                "role": "system",
+                "content": (
+                    "너는 이미지 안의 텍스트를 정확히 읽는 OCR 분석가야. "
+                    "이미지의 상단에 글씨가 거꾸로 되어 있거나 작게 써있을 수 있으니, "
+                    "필요하면 이미지를 회전시켜서 모든 글씨를 읽어야 해. "
+                    "반드시 다음 JSON 형식으로만 응답해: "
+                    '{"design": "Spaceship", "child_name": "Minjun"} '
+                    "도안명은 spaceship, locket, single character 중 하나만 가능해."
+                ),
+            },
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": (
+                            "이 그림의 텍스트에서 도안명과 어린이 이름을 추출해. "
+                            "다음 형식의 JSON만 반환해. 다른 글은 절대 쓰지마. "
+                            '{"design": "...", "child_name": "..."}'
+                        ),
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {"url": f"data:image/jpeg;base64,{image_b64}", "detail": detail}
+                    },
+                ],
+            },
+        ],
+        max_tokens=200,
+        temperature=0,  # 더 결정적인 응답
+        )
+    except Exception as e:
+        record_openai_call(started, getattr(e, "status_code", None) or "error")
+        raise
+    record_openai_call(started, 200)
 
     text = response.choices[0].message.content.strip()
     print(f"[VisionModel] GPT 원본 응답: {text}")
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+이미지 처리 CPU 단계 마이크로벤치마크 + 회귀 감지
+
+캡처 이미지 처리에서 CPU를 쓰는 단계(디코드, 회전, 크롭, RGB 변환,
+JPEG/PNG/WebP 인코딩, base64, crop_top_section 전체)를 입력 크기 x 포맷
+조합별로 측정한다.
+
+- 시간: 단계마다 warmup 후 --repeat번 실행해서 min/median/mean (ms)
+- 메모리: tracemalloc 최대 사용량 (Python 할당자 기준)
+  Pillow의 픽셀 버퍼는 Python 할당자를 거치지 않으므로 tracemalloc에 잡히지 않는다.
+  그래서 이미지를 만드는 단계는 결과 픽셀 버퍼 크기(pixel_bytes)를 함께 기록한다.
+- 입력: data/TEST.png를 각 해상도로 리사이즈해서 포맷별로 인코딩 (없으면 합성 이미지)
+
+사용법:
+    python3 -m benchmarks.image_benchmarks                                # 측정 + 결과 JSON
+    python3 -m benchmarks.image_benchmarks --save-baseline                # 기준값 저장
+    python3 -m benchmarks.image_benchmarks --compare --threshold 0.2      # 기준보다 20% 이상 느려지면 실패
+    python3 -m benchmarks.image_benchmarks --sizes 1080p,4k --formats jpeg --stages decode,encode_jpeg
+
+기준값(benchmarks/baselines/<호스트>.json)은 같은 머신에서 만든 것과만 비교할 것.
+회귀 판정은 잡음이 가장 적은 min 시간과 tracemalloc 최대치로 한다.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import base64
+import socket
+import argparse
+import platform
+import statistics
+import contextlib
+import tracemalloc
+
+import PIL
+from PIL import Image
+
+# python3 benchmarks/image_benchmarks.py 로 실행해도 Utils를 찾을 수 있도록
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from Utils.image_cropper import crop_top_section
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+SAMPLE_IMAGE = os.path.join(ROOT_DIR, "data", "TEST.png")
+
+# 입력 해상도 (가로 x 세로, 카메라가 가로로 찍은 캡처 기준)
+SIZES = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+    "12mp": (4032, 3024),   # 휴대폰 카메라 (4:3)
+}
+FORMATS = {
+    "jpeg": ("JPEG", {"quality": 92}),
+    "png": ("PNG", {}),
+    "webp": ("WEBP", {"quality": 90}),
+}
+# 회귀 판정 기본 임계치 (기준 대비 증가율)
+BENCH_THRESHOLD = float(os.getenv("BENCH_THRESHOLD", "0.2"))
+# 기준이 이보다 짧은 단계는 시간 회귀 판정에서 제외 (타이머 잡음)
+BENCH_MIN_MS = float(os.getenv("BENCH_MIN_MS", "0.5"))
+
+
+def make_source(size: tuple) -> Image.Image:
+    """해상도별 RGB 입력 이미지 (실제 캡처 리사이즈, 없으면 그라디언트 + 선 합성)"""
+    if os.path.exists(SAMPLE_IMAGE):
+        with Image.open(SAMPLE_IMAGE) as img:
+            return img.convert("RGB").resize(size, Image.Resampling.LANCZOS)
+
+    width, height = size
+    gradient = Image.linear_gradient("L").resize(size)
+    img = Image.merge("RGB", (gradient, gradient.transpose(Image.Transpose.ROTATE_90).resize(size),
+                              Image.effect_noise(size, 40)))
+    for x in range(0, width, max(1, width // 40)):
+        img.paste((20, 20, 20), (x, 0, x + 3, height))
+    return img
+
+
+# --------------------------------------------------------
+# 🧪 측정 대상 단계
+#
+# setup(inputs) → 인자, run(인자) → 결과. setup은 측정에 포함되지 않는다.
+# inputs: {"encoded": 입력 포맷 bytes, "decoded": RGB 이미지, "rotated": 회전 결과,
+#          "rgba": RGBA 이미지, "jpeg": 업로드용 JPEG bytes}
+# --------------------------------------------------------
+def _decode(data: bytes) -> Image.Image:
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    return img
+
+
+def _encode(img: Image.Image, fmt: str, **params) -> bytes:
+    output = io.BytesIO()
+    img.save(output, format=fmt, **params)
+    return output.getvalue()
+
+
+def _crop_box(img: Image.Image, ratio: float = 0.15) -> tuple:
+    width, height = img.size
+    return (0, int(height * ratio), width, height)
+
+
+def _quiet_crop_top_section(data: bytes) -> bytes:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return crop_top_section(data, ratio=0.15, rotate_cw=90)
+
+
+STAGES = {
+    "decode": (lambda inputs: inputs["encoded"], _decode),
+    "rotate": (lambda inputs: inputs["decoded"], lambda img: img.transpose(Image.Transpose.ROTATE_270)),
+    "crop": (lambda inputs: inputs["rotated"], lambda img: img.crop(_crop_box(img))),
+    "convert_rgb": (lambda inputs: inputs["rgba"], lambda img: img.convert("RGB")),
+    "encode_jpeg": (lambda inputs: inputs["rotated"], lambda img: _encode(img, "JPEG", quality=95)),
+    "encode_png": (lambda inputs: inputs["rotated"], lambda img: _encode(img, "PNG")),
+    "encode_webp": (lambda inputs: inputs["rotated"], lambda img: _encode(img, "WEBP", quality=85)),
+    "base64": (lambda inputs: inputs["jpeg"], base64.b64encode),
+    "crop_top_section": (lambda inputs: inputs["encoded"], _quiet_crop_top_section),
+}
+# 입력 포맷과 무관한 단계 (디코드된 이미지로 시작) → 포맷마다 반복 측정하지 않음
+FORMAT_INDEPENDENT = {"rotate", "crop", "convert_rgb", "encode_jpeg", "encode_png", "encode_webp", "base64"}
+
+
+def measure(run, arg, repeat: int) -> dict:
+    """단계 하나 측정: warmup 1회 → repeat회 시간 → tracemalloc 1회"""
+    result = run(arg)
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(arg)
+        times.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    try:
+        run(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    report = {
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "repeat": repeat,
+        "peak_traced_bytes": peak,
+    }
+    if isinstance(result, Image.Image):
+        report["output_size"] = list(result.size)
+        report["pixel_bytes"] = result.width * result.height * len(result.getbands())
+    elif isinstance(result, (bytes, bytearray)):
+        report["output_bytes"] = len(result)
+    return report
+
+
+def run_benchmarks(sizes: list, formats: list, stages: list, repeat: int) -> dict:
+    """크기 x 포맷 x 단계 측정 → {"size/format/stage": report}"""
+    results = {}
+    for size_name in sizes:
+        source = make_source(SIZES[size_name])
+        rotated = source.transpose(Image.Transpose.ROTATE_270)
+        shared = {
+            "decoded": source,
+            "rotated": rotated,
+            "rgba": source.convert("RGBA"),
+            "jpeg": _encode(rotated.crop(_crop_box(rotated)), "JPEG", quality=95),
+        }
+        measured_independent = set()
+        for format_name in formats:
+            fmt, params = FORMATS[format_name]
+            inputs = dict(shared, encoded=_encode(source, fmt, **params))
+            for stage in stages:
+                if stage in FORMAT_INDEPENDENT:
+                    if stage in measured_independent:
+                        continue
+                    measured_independent.add(stage)
+                    key = f"{size_name}/any/{stage}"
+                else:
+                    key = f"{size_name}/{format_name}/{stage}"
+                setup, run = STAGES[stage]
+                report = measure(run, setup(inputs), repeat)
+                if stage not in FORMAT_INDEPENDENT:
+                    report["input_bytes"] = len(inputs["encoded"])
+                results[key] = report
+                print(f"   {key:<32} min {report['min_ms']:9.2f}ms  median {report['median_ms']:9.2f}ms  "
+                      f"peak {report['peak_traced_bytes'] / 1024 / 1024:7.2f}MB")
+    return results
+
+
+def environment() -> dict:
+    return {
+        "host": socket.gethostname(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """기준 대비 회귀 목록 [(key, 지표, 기준, 현재, 증가율)]"""
+    regressions = []
+    for key, report in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        if base["min_ms"] >= BENCH_MIN_MS and report["min_ms"] > base["min_ms"] * (1 + threshold):
+            regressions.append((key, "min_ms", base["min_ms"], report["min_ms"],
+                                report["min_ms"] / base["min_ms"] - 1))
+        if base["peak_traced_bytes"] and \
+                report["peak_traced_bytes"] > base["peak_traced_bytes"] * (1 + threshold):
+            regressions.append((key, "peak_traced_bytes", base["peak_traced_bytes"], report["peak_traced_bytes"],
+                                report["peak_traced_bytes"] / base["peak_traced_bytes"] - 1))
+    return regressions
+
+
+def default_baseline_path() -> str:
+    return os.path.join(BASELINE_DIR, f"{socket.gethostname()}.json")
+
+
+def parse_list(value: str, choices) -> list:
+    items = [v.strip().lower() for v in value.split(",") if v.strip()]
+    unknown = [item for item in items if item not in choices]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"알 수 없는 값 {unknown} (가능: {', '.join(choices)})")
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이미지 처리 CPU 단계 마이크로벤치마크")
+    parser.add_argument("--sizes", default="1080p,4k,12mp", type=lambda v: parse_list(v, SIZES))
+    parser.add_argument("--formats", default="jpeg,png,webp", type=lambda v: parse_list(v, FORMATS))
+    parser.add_argument("--stages", default=",".join(STAGES), type=lambda v: parse_list(v, STAGES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="benchmark_result.json")
+    parser.add_argument("--save-baseline", nargs="?", const="", default=None, metavar="PATH",
+                        help="결과를 기준값으로 저장 (기본: benchmarks/baselines/<호스트>.json)")
+    parser.add_argument("--compare", nargs="?", const="", default=None, metavar="PATH",
+                        help="기준값과 비교해서 회귀가 있으면 종료 코드 1")
+    parser.add_argument("--threshold", type=float, default=BENCH_THRESHOLD, help="허용 증가율 (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"⏱️  이미지 처리 벤치마크 ({', '.join(args.sizes)} x {', '.join(args.formats)}, repeat {args.repeat})")
+    print("=" * 80)
+    started = time.perf_counter()
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "sample_image": SAMPLE_IMAGE if os.path.exists(SAMPLE_IMAGE) else "synthetic",
+        "results": run_benchmarks(args.sizes, args.formats, args.stages, args.repeat),
+    }
+    print(f"\n✅ 측정 완료 ({time.perf_counter() - started:.1f}초)")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"💾 결과 저장: {args.output}")
+
+    if args.save_baseline is not None:
+        path = args.save_baseline or default_baseline_path()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"📌 기준값 저장: {path}")
+
+    if args.compare is not None:
+        path = args.compare or default_baseline_path()
+        if not os.path.exists(path):
+            print(f"❌ 기준값 없음: {path} (--save-baseline으로 먼저 생성)")
+            sys.exit(2)
+        with open(path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["environment"] != report["environment"]:
+            print(f"⚠️ 기준값과 측정 환경이 다릅니다: {baseline['environment']}")
+
+        regressions = compare(report, baseline, args.threshold)
+        compared = len(set(report["results"]) & set(baseline["results"]))
+        if regressions:
+            print(f"\n❌ 회귀 {len(regressions)}건 (기준 {path}, 허용 +{args.threshold * 100:.0f}%)")
+            for key, metric, before, after, ratio in regressions:
+                print(f"   {key:<32} {metric:<18} {before:>12g} → {after:>12g} (+{ratio * 100:.1f}%)")
+            sys.exit(1)
+        print(f"\n✅ 회귀 없음 ({compared}개 항목 비교, 허용 +{args.threshold * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 TRIPO_API_KEY = os.getenv("TRIPO_API_KEY")
-TRIPO_BASE_URL = "https://api.tripo3d.ai/v2/openapi"
+TRIPO_BASE_URL = os.getenv("TRIPO_API_BASE", "https://api.tripo3d.ai/v2/openapi").rstrip("/")
 
 # 우리의 Task ID들
 TASK_IDS = {
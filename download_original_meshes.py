@@ -18,7 +18,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 TRIPO_API_KEY = os.getenv("TRIPO_API_KEY")
-TRIPO_BASE_URL = "https://api.tripo3d.ai/v2/openapi"
+TRIPO_BASE_URL = os.getenv("TRIPO_API_BASE", "https://api.tripo3d.ai/v2/openapi").rstrip("/")
 
 # Task ID 매핑
 MESH_CONFIGS = {
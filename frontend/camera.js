@@ -75,8 +75,8 @@ captureBtn.addEventListener("click", async () => {
         childName: "Unknown",
       });
 
-      // 🔄 폴링 시작 (상태 확인)
-      startPollingTask(taskId, statusUrl);
+      // 📡 진행 상황 구독 시작
+      watchTask(taskId, statusUrl);
 
       // ✨ 즉시 "다시 찍기" 활성화
       setTimeout(() => {
@@ -94,7 +94,92 @@ captureBtn.addEventListener("click", async () => {
   }
 });
 
-// 🔄 Task 상태 폴링
+// 📡 진행 상황 구독 (SSE 하나로 진행 중인 모든 Task를 받음)
+let taskEvents = null;
+
+function watchTask(taskId, statusUrl) {
+  if (!window.EventSource) {
+    // EventSource 미지원 브라우저는 기존 폴링 사용
+    startPollingTask(taskId, statusUrl);
+    return;
+  }
+  // 구독 대상이 바뀌었으므로 새 목록으로 다시 연결 (연결 직후 현재 상태를 받으므로 누락 없음)
+  openTaskEvents();
+}
+
+function openTaskEvents() {
+  if (taskEvents) {
+    taskEvents.close();
+    taskEvents = null;
+  }
+  if (activeTasks.size === 0) return;
+
+  const ids = [...activeTasks.keys()].join(",");
+  console.log(`📡 진행 상황 구독: ${activeTasks.size}개 Task`);
+  taskEvents = new EventSource(`/task_events?task_id=${encodeURIComponent(ids)}`);
+
+  taskEvents.addEventListener("status", (e) => {
+    const data = JSON.parse(e.data);
+    if (activeTasks.has(data.task_id)) {
+      handleTaskUpdate(data.task_id, data);
+    }
+  });
+
+  taskEvents.addEventListener("stage", (e) => {
+    const data = JSON.parse(e.data);
+    console.log(`[${data.task_id}] 단계 ${data.stage}: ${data.state}${data.duration != null ? ` (${data.duration}s)` : ""}`);
+  });
+
+  taskEvents.addEventListener("end", () => {
+    // 구독한 Task가 모두 끝남 → 서버가 스트림을 닫기 전에 재연결하지 않도록 닫기
+    taskEvents.close();
+    taskEvents = null;
+    openTaskEvents();
+  });
+
+  taskEvents.onerror = () => {
+    // 연결이 끊기면 EventSource가 자동 재연결 (retry: 3초)
+    console.warn("⚠️ 진행 상황 스트림 연결 끊김, 재연결 중...");
+  };
+}
+
+// 🔄 Task 상태 반영 (SSE 이벤트 / 폴링 응답 공통)
+function handleTaskUpdate(taskId, data) {
+  // 상태 업데이트
+  const label = data.result?.label || activeTasks.get(taskId)?.label || "Unknown";
+  const childName = data.result?.child_name || activeTasks.get(taskId)?.childName || "Unknown";
+
+  activeTasks.set(taskId, {
+    status: data.status,
+    progress: data.progress,
+    label: label,
+    childName: childName,
+  });
+
+  console.log(`[${taskId}] 상태: ${data.status}, 진행률: ${data.progress}%, 도안: ${label}, 아이: ${childName}`);
+
+  // 진행률 업데이트
+  if (data.status === "processing") {
+    resultText.innerText = `⏳ 작업 중... ${data.progress}% (${childName}님의 ${label})`;
+  }
+
+  if (data.status === "done") {
+    // ✅ 완료!
+    console.log(`✅ Task ${taskId} 완료!`);
+    resultText.innerText = `✅ 작업 완료! ${childName}님의 ${label} 준비됨 🎉`;
+    activeTasks.delete(taskId);
+    return true;
+  } else if (data.status === "error" || data.status === "not_found") {
+    // ❌ 오류
+    console.error(`❌ Task ${taskId} 오류: ${data.error}`);
+    resultText.innerText = `❌ 오류 발생: ${data.error}`;
+    activeTasks.delete(taskId);
+    return true;
+  }
+  return false;
+}
+
+// 🔄 Task 상태 폴링 (EventSource를 쓸 수 없을 때)
 async function startPollingTask(taskId, statusUrl) {
   console.log(`⏳ Task ${taskId} 폴링 시작...`);
 
@@ -102,38 +187,8 @@ async function startPollingTask(taskId, statusUrl) {
     try {
       const response = await fetch(statusUrl);
       const data = await response.json();
-
-      // 상태 업데이트
-      const label = data.result?.label || activeTasks.get(taskId)?.label || "Unknown";
-      const childName = data.result?.child_name || activeTasks.get(taskId)?.childName || "Unknown";
-
-      activeTasks.set(taskId, {
-        status: data.status,
-        progress: data.progress,
-        label: label,
-        childName: childName,
-      });
-
-      console.log(`[${taskId}] 상태: ${data.status}, 진행률: ${data.progress}%, 도안: ${label}, 아이: ${childName}`);
-
-      // 진행률 업데이트
-      if (data.status === "processing") {
-        resultText.innerText = `⏳ 작업 중... ${data.progress}% (${childName}님의 ${label})`;
-      }
-
-      if (data.status === "done") {
-        // ✅ 완료!
-        console.log(`✅ Task ${taskId} 완료!`);
-        const taskInfo = activeTasks.get(taskId);
-        resultText.innerText = `✅ 작업 완료! ${taskInfo.childName}님의 ${taskInfo.label} 준비됨 🎉`;
-        clearInterval(pollInterval);
-        activeTasks.delete(taskId);
-      } else if (data.status === "error") {
-        // ❌ 오류
-        console.error(`❌ Task ${taskId} 오류: ${data.error}`);
-        resultText.innerText = `❌ 오류 발생: ${data.error}`;
+      if (handleTaskUpdate(taskId, data)) {
         clearInterval(pollInterval);
-        activeTasks.delete(taskId);
       }
     } catch (err) {
       console.error(`⚠️ 폴링 오류: ${err}`);
@@ -148,7 +203,7 @@ retryBtn.addEventListener("click", () => {
   resultText.innerText = "";
   loadingDiv.classList.remove("hidden");
 
-  // ✨ 여전히 활성 Task가 있으면 계속 폴링됨 (백그라운드에서)
+  // ✨ 여전히 활성 Task가 있으면 계속 구독됨 (백그라운드에서)
   console.log(`📊 현재 처리 중인 Task: ${activeTasks.size}개`);
 });
 
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+/analyze 엔드투엔드 부하 테스트
+
+실행 중인 서버(uvicorn backend.main:app)에 캡처 이미지를 보내고, 각 작업을
+/task_status로 끝날 때까지 따라가며 처리량, 지연 시간 분위수(p50/p95/p99),
+단계별 소요 시간, 오류율을 측정한다.
+
+모드:
+    sweep  - 동시성 수준별로 N개 캡처를 닫힌 루프로 전송 (예: 1,2,4,8)
+    replay - 기록된 도착 시각 트레이스를 그대로 재생 (예: 토요일 오후 몰림)
+
+트레이스 파일 (JSON Lines, at은 첫 요청 기준 초):
+    {"at": 0.0, "image": "data/TEST.png"}
+    {"at": 1.8, "image": "data/Mesh_Image/Locket.png", "priority": 1}
+    숫자만 있는 줄(도착 시각)도 허용하며, 이때 이미지는 --images에서 순서대로 사용
+
+사용법:
+    python3 load_test.py sweep --concurrency 1,2,4 --requests 8
+    python3 load_test.py replay --trace traces/saturday.jsonl --speed 2
+    python3 load_test.py sweep --base-url http://localhost:8000 --output load_test_result.json
+
+주의:
+    같은 그림을 반복해서 보내면 서버의 중복 감지(DEDUP_ENABLED)가 기존 Tripo task를
+    재사용하므로, 실제 생성 부하를 재려면 서버를 DEDUP_ENABLED=0으로 실행할 것
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import asyncio
+import argparse
+
+import httpx
+
+BASE_URL = os.getenv("LOAD_TEST_BASE_URL", "http://localhost:8000")
+# /task_status 폴링 간격 / 작업 하나의 최대 대기 시간 (초)
+POLL_INTERVAL = float(os.getenv("LOAD_TEST_POLL_INTERVAL", "1.0"))
+TASK_TIMEOUT = float(os.getenv("LOAD_TEST_TASK_TIMEOUT", "900"))
+
+MIME_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".webp": "image/webp"}
+
+
+def load_images(patterns: list) -> list:
+    """glob 패턴 → [(파일명, bytes, mime)] (같은 파일은 한 번만 읽음)"""
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern, recursive=True)
+                    if os.path.splitext(path)[1].lower() in MIME_TYPES})
+    images = []
+    for path in paths:
+        with open(path, "rb") as f:
+            images.append((path, f.read(), MIME_TYPES[os.path.splitext(path)[1].lower()]))
+    return images
+
+
+def load_trace(path: str, images: list) -> list:
+    """트레이스 파일 → [(도착 시각, 이미지, priority)] (도착 시각 순)"""
+    by_path = {image[0]: image for image in images}
+    arrivals = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = json.loads(line)
+            if not isinstance(entry, dict):
+                entry = {"at": entry}
+            image_path = entry.get("image")
+            if image_path:
+                if image_path not in by_path:
+                    by_path[image_path] = load_images([image_path])[0] if os.path.exists(image_path) else None
+                image = by_path[image_path]
+                if image is None:
+                    raise ValueError(f"{path}:{line_no} 이미지 없음: {image_path}")
+            elif images:
+                image = images[len(arrivals) % len(images)]
+            else:
+                raise ValueError(f"{path}:{line_no} 이미지가 지정되지 않았고 --images에도 이미지가 없습니다.")
+            arrivals.append((float(entry["at"]), image, int(entry.get("priority", 0))))
+    arrivals.sort(key=lambda arrival: arrival[0])
+    return arrivals
+
+
+async def run_capture(client: httpx.AsyncClient, image: tuple, priority: int = 0) -> dict:
+    """캡처 하나 전송 후 /task_status로 완료까지 추적"""
+    name, data, mime = image
+    record = {"image": name, "status": None, "error": None, "stages": {}}
+    started = time.perf_counter()
+    try:
+        response = await client.post(
+            "/analyze", files={"file": (os.path.basename(name), data, mime)}, params={"priority": priority}
+        )
+    except httpx.HTTPError as e:
+        record.update(status="error", error=f"submit: {type(e).__name__}: {e}")
+        return record
+    record["submit_seconds"] = time.perf_counter() - started
+
+    if response.status_code == 503:
+        record.update(status="rejected", error="503 대기열 가득 참")
+        return record
+    if response.status_code != 200:
+        record.update(status="error", error=f"submit: HTTP {response.status_code}")
+        return record
+    task_id = response.json()["task_id"]
+    record["task_id"] = task_id
+
+    snapshot = None
+    while time.perf_counter() - started < TASK_TIMEOUT:
+        await asyncio.sleep(POLL_INTERVAL)
+        try:
+            response = await client.get(f"/task_status/{task_id}")
+            snapshot = response.json()
+        except (httpx.HTTPError, ValueError):
+            continue  # 일시적인 폴링 실패는 다음 폴링에서 다시 확인
+        if snapshot["status"] == "processing" and "queued_seconds" not in record:
+            record["queued_seconds"] = time.perf_counter() - started
+        if snapshot["status"] in ("done", "error", "not_found"):
+            break
+    else:
+        record.update(status="timeout", error=f"{TASK_TIMEOUT:.0f}초 안에 끝나지 않음",
+                      latency_seconds=time.perf_counter() - started)
+        return record
+
+    record["latency_seconds"] = time.perf_counter() - started
+    record["status"] = "ok" if snapshot["status"] == "done" else "error"
+    if snapshot["status"] != "done":
+        record["error"] = snapshot.get("error") or snapshot["status"]
+    for stage, timing in (snapshot.get("stage_timings") or {}).items():
+        record["stages"][stage] = timing["duration"]
+    generation = (snapshot.get("result") or {}).get("generation")
+    if generation:
+        record["generation_path"] = generation.get("path")
+    return record
+
+
+async def run_closed_loop(client: httpx.AsyncClient, images: list, concurrency: int, total: int) -> list:
+    """동시성 concurrency로 total개 캡처 전송 (하나가 끝나면 다음 캡처 시작)"""
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(images[i % len(images)])
+    records = []
+
+    async def worker():
+        while not queue.empty():
+            image = queue.get_nowait()
+            records.append(await run_capture(client, image))
+            print_progress(records, total)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return records
+
+
+async def run_replay(client: httpx.AsyncClient, arrivals: list, speed: float) -> list:
+    """트레이스의 도착 시각대로 캡처 전송 (speed배 빠르게)"""
+    records = []
+    start = time.perf_counter()
+
+    async def arrive(at, image, priority):
+        await asyncio.sleep(max(0.0, start + at / speed - time.perf_counter()))
+        record = await run_capture(client, image, priority)
+        record["arrival"] = at
+        records.append(record)
+        print_progress(records, len(arrivals))
+
+    await asyncio.gather(*(arrive(*arrival) for arrival in arrivals))
+    return records
+
+
+def print_progress(records: list, total: int):
+    errors = sum(1 for record in records if record["status"] != "ok")
+    print(f"   진행: {len(records)}/{total} (실패 {errors})", end="\r", flush=True)
+
+
+def percentile(values: list, q: float):
+    """선형 보간 분위수 (값이 없으면 None)"""
+    if not values:
+        return None
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def distribution(values: list) -> dict:
+    def rounded(value):
+        return round(value, 3) if value is not None else None
+    return {
+        "count": len(values),
+        "mean": rounded(sum(values) / len(values)) if values else None,
+        "p50": rounded(percentile(values, 50)),
+        "p95": rounded(percentile(values, 95)),
+        "p99": rounded(percentile(values, 99)),
+        "max": rounded(max(values)) if values else None,
+    }
+
+
+def summarize(records: list, wall_seconds: float) -> dict:
+    """작업별 기록 → 처리량/분위수/단계별 요약"""
+    ok = [record for record in records if record["status"] == "ok"]
+    by_status = {}
+    for record in records:
+        by_status[record["status"]] = by_status.get(record["status"], 0) + 1
+
+    stages = {}
+    for record in ok:
+        for stage, duration in record["stages"].items():
+            stages.setdefault(stage, []).append(duration)
+
+    errors = {}
+    for record in records:
+        if record["error"]:
+            errors[record["error"]] = errors.get(record["error"], 0) + 1
+
+    paths = {}
+    for record in ok:
+        if record.get("generation_path"):
+            paths.setdefault(record["generation_path"], []).append(record["latency_seconds"])
+
+    return {
+        "requests": len(records),
+        "completed": len(ok),
+        "by_status": by_status,
+        "error_rate": round(1 - len(ok) / len(records), 4) if records else None,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_minute": round(len(ok) / wall_seconds * 60, 3) if wall_seconds > 0 else None,
+        "latency_seconds": distribution([record["latency_seconds"] for record in ok]),
+        "submit_seconds": distribution([record["submit_seconds"] for record in records if "submit_seconds" in record]),
+        "queued_seconds": distribution([record["queued_seconds"] for record in ok if "queued_seconds" in record]),
+        "stages": {stage: distribution(values) for stage, values in stages.items()},
+        "generation_paths": {path: distribution(values) for path, values in paths.items()},
+        "errors": errors,
+    }
+
+
+def print_table(runs: list):
+    """콘솔 요약 표"""
+    print("\n" + "=" * 96)
+    print("📊 부하 테스트 결과")
+    print("=" * 96)
+    print(f"{'run':<16}{'요청':>6}{'완료':>6}{'오류율':>8}{'처리량/분':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    print("-" * 96)
+
+    def fmt(value):
+        return f"{value:.1f}s" if value is not None else "-"
+
+    for run in runs:
+        s = run["summary"]
+        latency = s["latency_seconds"]
+        throughput = f"{s['throughput_per_minute']:.2f}" if s["throughput_per_minute"] is not None else "-"
+        error_rate = f"{s['error_rate'] * 100:.1f}%" if s["error_rate"] is not None else "-"
+        print(f"{run['name']:<16}{s['requests']:>6}{s['completed']:>6}{error_rate:>8}{throughput:>10}"
+              f"{fmt(latency['p50']):>9}{fmt(latency['p95']):>9}{fmt(latency['p99']):>9}{fmt(latency['max']):>9}")
+
+    for run in runs:
+        stages = run["summary"]["stages"]
+        if not stages:
+            continue
+        print(f"\n⏱️  단계별 소요 시간 ({run['name']})")
+        print(f"   {'stage':<14}{'p50':>9}{'p95':>9}{'p99':>9}")
+        for stage, dist in stages.items():
+            print(f"   {stage:<14}{fmt(dist['p50']):>9}{fmt(dist['p95']):>9}{fmt(dist['p99']):>9}")
+        for error, count in run["summary"]["errors"].items():
+            print(f"   ❌ {count}회: {error}")
+    print("=" * 96)
+
+
+async def main(args):
+    images = load_images(args.images)
+    if not images and args.mode == "sweep":
+        print(f"❌ 이미지 없음: {args.images}")
+        sys.exit(1)
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=64)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        try:
+            await client.get("/queue_status")
+        except httpx.HTTPError as e:
+            print(f"❌ 서버에 연결할 수 없습니다 ({args.base_url}): {e}")
+            sys.exit(1)
+
+        runs = []
+        if args.mode == "sweep":
+            for concurrency in args.concurrency:
+                total = args.requests or concurrency * 2
+                print(f"\n🚀 동시성 {concurrency}: 캡처 {total}개 전송 ({len(images)}개 이미지 순환)")
+                started = time.perf_counter()
+                records = await run_closed_loop(client, images, concurrency, total)
+                wall = time.perf_counter() - started
+                runs.append({"name": f"concurrency={concurrency}", "concurrency": concurrency,
+                             "summary": summarize(records, wall), "records": records})
+                if args.cooldown and concurrency != args.concurrency[-1]:
+                    await asyncio.sleep(args.cooldown)
+        else:
+            arrivals = load_trace(args.trace, images)
+            duration = arrivals[-1][0] / args.speed if arrivals else 0
+            print(f"\n🚀 트레이스 재생: {len(arrivals)}개 도착, {duration:.0f}초 동안 (x{args.speed:g})")
+            started = time.perf_counter()
+            records = await run_replay(client, arrivals, args.speed)
+            wall = time.perf_counter() - started
+            runs.append({"name": os.path.basename(args.trace), "trace": args.trace, "speed": args.speed,
+                         "summary": summarize(records, wall), "records": records})
+
+        server = (await client.get("/queue_status")).json()
+
+    print_table(runs)
+    report = {
+        "base_url": args.base_url,
+        "mode": args.mode,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "poll_interval": POLL_INTERVAL,
+        "runs": runs,
+        "server": server,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"💾 결과 저장: {args.output}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="/analyze 엔드투엔드 부하 테스트")
+    parser.add_argument("mode", choices=["sweep", "replay"])
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--images", nargs="+", default=["data/*.png", "data/*.jpg"],
+                        help="캡처 이미지 glob (기본: data/*.png data/*.jpg)")
+    parser.add_argument("--concurrency", default="1,2,4",
+                        type=lambda value: [int(v) for v in value.split(",") if v.strip()],
+                        help="sweep 동시성 수준 (쉼표 구분)")
+    parser.add_argument("--requests", type=int, default=0,
+                        help="동시성 수준별 캡처 수 (기본: 동시성 x 2)")
+    parser.add_argument("--cooldown", type=float, default=0, help="동시성 수준 사이 대기 시간 (초)")
+    parser.add_argument("--trace", help="replay 트레이스 파일 (JSON Lines)")
+    parser.add_argument("--speed", type=float, default=1.0, help="트레이스 재생 배속")
+    parser.add_argument("--output", default="load_test_result.json")
+    args = parser.parse_args()
+    if args.mode == "replay" and not args.trace:
+        parser.error("replay 모드에는 --trace가 필요합니다.")
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
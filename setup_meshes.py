@@ -18,8 +18,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 TRIPO_API_KEY = os.getenv("TRIPO_API_KEY")
-TRIPO_API_URL = "https://api.tripo3d.ai/v2/openapi/task"
-TRIPO_UPLOAD_URL = "https://api.tripo3d.ai/v2/openapi/upload/sts"
+TRIPO_API_BASE = os.getenv("TRIPO_API_BASE", "https://api.tripo3d.ai/v2/openapi").rstrip("/")
+TRIPO_API_URL = f"{TRIPO_API_BASE}/task"
+TRIPO_UPLOAD_URL = f"{TRIPO_API_BASE}/upload/sts"
 
 if not TRIPO_API_KEY:
     print("❌ TRIPO_API_KEY가 설정되어 있지 않습니다!")
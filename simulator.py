@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Tripo3D / OpenAI 로컬 시뮬레이터
+
+API 크레딧과 인터넷 없이 Tripo3DClient, analyze_drawing_text,
+process_image_in_background를 벤치마크/회귀 테스트하기 위한 가짜 서버.
+
+구현된 엔드포인트:
+    POST /v2/openapi/upload/sts          이미지 업로드 → image_token
+    POST /v2/openapi/task                image_to_model / texture_model task 생성
+    GET  /v2/openapi/task/{task_id}      queued → running(progress) → success/failed
+    GET  /files/{task_id}/model.glb      결과 GLB (샘플 파일, 다운로드 속도 제한 가능)
+    GET  /files/{task_id}/rendered.png   rendered_image 미리보기
+    POST /v1/chat/completions            OpenAI Vision 응답 (도안명/이름 JSON)
+    GET  /_sim/stats, POST /_sim/config  호출 통계 / 실행 중 설정 변경
+
+사용법:
+    python3 simulator.py                                   # 0.0.0.0:9000
+    TRIPO_API_BASE=http://localhost:9000/v2/openapi \\
+    OPENAI_BASE_URL=http://localhost:9000/v1 uvicorn backend.main:app
+
+    # 설정 예시 (환경 변수 또는 POST /_sim/config {"generation_time": "fixed:5"})
+    SIM_GENERATION_TIME=normal:60,15 SIM_RATE_LIMIT=2 SIM_TASK_FAILURE_RATE=0.05 python3 simulator.py
+
+지연 시간 분포 형식 (초):
+    0.5 또는 fixed:0.5 | uniform:0.2,1.0 | normal:60,15 | lognormal:1.2,0.4 (중앙값, sigma)
+"""
+
+import os
+import json
+import math
+import time
+import uuid
+import zlib
+import struct
+import random
+import asyncio
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from Utils.glb import write_glb
+
+SIM_HOST = os.getenv("SIM_HOST", "0.0.0.0")
+SIM_PORT = int(os.getenv("SIM_PORT", "9000"))
+
+# 실행 중 POST /_sim/config로 바꿀 수 있는 설정 (환경 변수 SIM_<KEY 대문자>로 초기값 지정)
+DEFAULT_CONFIG = {
+    "api_latency": "lognormal:0.15,0.5",          # upload/task 생성/상태 조회 응답 지연
+    "upload_latency": "lognormal:0.6,0.4",        # 업로드 추가 지연
+    "queue_time": "uniform:0,3",                  # task가 queued로 머무는 시간
+    "generation_time": "normal:60,15",            # image_to_model 생성 시간
+    "texture_generation_time": "normal:25,5",     # texture_model 생성 시간
+    "openai_latency": "lognormal:1.5,0.4",        # chat.completions 응답 지연
+    "download_kbps": 0.0,                         # 결과 파일 다운로드 속도 제한 (0이면 제한 없음)
+    "rate_limit": 0.0,                            # 서비스별 초당 요청 수 한도 (0이면 없음, 넘으면 429)
+    "rate_burst": 5,
+    "rate_limit_probability": 0.0,                # 한도와 관계없이 429를 돌려줄 확률
+    "error_probability": 0.0,                     # API 호출이 500으로 실패할 확률
+    "task_failure_rate": 0.0,                     # 생성 task가 failed로 끝날 확률
+    "vision_design": "",                          # 비우면 세 도안 중 무작위
+    "vision_names": "Minjun,Seoyeon,Jiho,Haeun",
+    "sample_glb": "frontend/meshes/spaceship.glb",  # 없으면 텍스처 입힌 삼각형 GLB 생성
+    "sample_rendered": "data/TEST.png",
+    "seed": "",
+}
+
+DESIGNS = ["Spaceship", "Locket", "Single Character"]
+
+app = FastAPI(title="Tripo3D / OpenAI Simulator")
+
+
+def load_config() -> dict:
+    config = {}
+    for key, default in DEFAULT_CONFIG.items():
+        value = os.getenv(f"SIM_{key.upper()}")
+        config[key] = type(default)(value) if value is not None else default
+    return config
+
+
+config = load_config()
+rng = random.Random(config["seed"] or None)
+
+tasks = {}    # {task_id: dict}
+uploads = {}  # {image_token: (크기, content_type)}
+buckets = {}  # {service: (tokens, last_refill)}
+stats = {"requests": {}, "rate_limited": 0, "errors": 0, "tasks_created": 0, "tasks_failed": 0, "bytes_served": 0}
+
+
+# --------------------------------------------------------
+# 🎲 분포 / 장애 주입
+# --------------------------------------------------------
+def sample(spec) -> float:
+    """지연 시간 분포 문자열 → 샘플 (초, 0 이상)"""
+    spec = str(spec).strip()
+    kind, _, params = spec.partition(":")
+    if not params:
+        kind, params = "fixed", spec
+    values = [float(v) for v in params.split(",") if v.strip()]
+    if kind == "fixed":
+        value = values[0]
+    elif kind == "uniform":
+        value = rng.uniform(values[0], values[1])
+    elif kind == "normal":
+        value = rng.gauss(values[0], values[1])
+    elif kind == "lognormal":
+        value = values[0] * math.exp(rng.gauss(0, values[1]))
+    else:
+        raise ValueError(f"알 수 없는 분포: {spec}")
+    return max(0.0, value)
+
+
+def rate_limited(service: str) -> bool:
+    """서비스별 토큰 버킷 (rate_limit 초당 요청 수, rate_burst 버스트)"""
+    if rng.random() < config["rate_limit_probability"]:
+        return True
+    limit = float(config["rate_limit"])
+    if limit <= 0:
+        return False
+    now = time.monotonic()
+    tokens, last = buckets.get(service, (float(config["rate_burst"]), now))
+    tokens = min(float(config["rate_burst"]), tokens + (now - last) * limit)
+    if tokens < 1:
+        buckets[service] = (tokens, now)
+        return True
+    buckets[service] = (tokens - 1, now)
+    return False
+
+
+async def inject(service: str, latency_key: str):
+    """지연 + 429/500 장애 주입 (정상이면 None, 장애면 응답)"""
+    stats["requests"][service] = stats["requests"].get(service, 0) + 1
+    await asyncio.sleep(sample(config[latency_key]))
+    if rate_limited(service):
+        stats["rate_limited"] += 1
+        retry_after = "1" if float(config["rate_limit"]) <= 0 else f"{1 / float(config['rate_limit']):.2f}"
+        if service == "openai":
+            body = {"error": {"message": "Rate limit reached (simulated)", "type": "rate_limit_error", "code": "rate_limit_exceeded"}}
+        else:
+            body = {"code": 2000, "message": "You have exceeded the limit of generation (simulated)"}
+        return JSONResponse(body, status_code=429, headers={"Retry-After": retry_after})
+    if rng.random() < config["error_probability"]:
+        stats["errors"] += 1
+        if service == "openai":
+            body = {"error": {"message": "The server had an error (simulated)", "type": "server_error"}}
+        else:
+            body = {"code": 1000, "message": "Internal server error (simulated)"}
+        return JSONResponse(body, status_code=500)
+    return None
+
+
+# --------------------------------------------------------
+# 📦 샘플 결과 파일
+# --------------------------------------------------------
+def _png(width: int, height: int, rgb: tuple) -> bytes:
+    """단색 PNG (PIL 없이 생성)"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    raw = b"".join(b"\0" + bytes(rgb) * width for _ in range(height))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b""))
+
+
+def _triangle_glb() -> bytes:
+    """샘플 GLB가 없을 때 쓰는 baseColor 텍스처가 있는 삼각형 하나"""
+    positions = struct.pack("<9f", 0, 0, 0, 1, 0, 0, 0, 1, 0)
+    uvs = struct.pack("<6f", 0, 0, 1, 0, 0, 1)
+    indices = struct.pack("<3H", 0, 1, 2) + b"\0\0"
+    image = _png(64, 64, (200, 120, 40))
+    bin_chunk = positions + uvs + indices + image
+    gltf = {
+        "asset": {"version": "2.0", "generator": "tripo-simulator"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"mesh": 0}],
+        "meshes": [{"primitives": [{"attributes": {"POSITION": 0, "TEXCOORD_0": 1}, "indices": 2, "material": 0}]}],
+        "materials": [{"pbrMetallicRoughness": {"baseColorTexture": {"index": 0}}}],
+        "textures": [{"source": 0}],
+        "images": [{"bufferView": 3, "mimeType": "image/png"}],
+        "accessors": [
+            {"bufferView": 0, "componentType": 5126, "count": 3, "type": "VEC3", "min": [0, 0, 0], "max": [1, 1, 0]},
+            {"bufferView": 1, "componentType": 5126, "count": 3, "type": "VEC2"},
+            {"bufferView": 2, "componentType": 5123, "count": 3, "type": "SCALAR"},
+        ],
+        "bufferViews": [
+            {"buffer": 0, "byteOffset": 0, "byteLength": 36, "target": 34962},
+            {"buffer": 0, "byteOffset": 36, "byteLength": 24, "target": 34962},
+            {"buffer": 0, "byteOffset": 60, "byteLength": 6, "target": 34963},
+            {"buffer": 0, "byteOffset": 68, "byteLength": len(image)},
+        ],
+        "buffers": [{"byteLength": len(bin_chunk)}],
+    }
+    return write_glb(gltf, bin_chunk)
+
+
+_samples = {}
+
+
+def sample_file(kind: str) -> tuple:
+    """("glb" | "rendered") → (bytes, media_type) (설정된 파일이 없으면 생성한 샘플)"""
+    path = config["sample_glb"] if kind == "glb" else config["sample_rendered"]
+    if (kind, path) not in _samples:
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            print(f"[Simulator] 📦 샘플 파일 사용: {path} ({len(data) / 1024:.0f} KB)")
+        else:
+            data = _triangle_glb() if kind == "glb" else _png(256, 256, (200, 120, 40))
+            print(f"[Simulator] 📦 샘플 파일이 없어 생성한 {kind} 사용 ({path or '-'})")
+        media_type = "model/gltf-binary" if kind == "glb" else (
+            "image/png" if data.startswith(b"\x89PNG") else "image/jpeg" if data.startswith(b"\xff\xd8") else "image/webp"
+        )
+        _samples[(kind, path)] = (data, media_type)
+    return _samples[(kind, path)]
+
+
+# --------------------------------------------------------
+# 🧊 Tripo3D
+# --------------------------------------------------------
+@app.post("/v2/openapi/upload/sts")
+async def upload(request: Request):
+    failure = await inject("tripo", "api_latency")
+    if failure:
+        return failure
+    await asyncio.sleep(sample(config["upload_latency"]))
+    form = await request.form()
+    file = form.get("file")
+    if file is None:
+        return JSONResponse({"code": 2002, "message": "file is required"}, status_code=400)
+    data = await file.read()
+    image_token = str(uuid.uuid4())
+    uploads[image_token] = (len(data), file.content_type)
+    return {"code": 0, "data": {"image_token": image_token}}
+
+
+@app.post("/v2/openapi/task")
+async def create_task(request: Request):
+    failure = await inject("tripo", "api_latency")
+    if failure:
+        return failure
+    payload = await request.json()
+    task_type = payload.get("type")
+    if task_type == "image_to_model":
+        token = payload.get("file", {}).get("file_token")
+        duration_key = "generation_time"
+    elif task_type == "texture_model":
+        # 템플릿 task ID는 실제 Tripo 계정의 것이므로 존재 여부는 확인하지 않음
+        if not payload.get("original_model_task_id"):
+            return JSONResponse({"code": 2002, "message": "original_model_task_id is required"}, status_code=400)
+        token = payload.get("texture_prompt", {}).get("image", {}).get("file_token")
+        duration_key = "texture_generation_time"
+    else:
+        return JSONResponse({"code": 2002, "message": f"unsupported task type: {task_type}"}, status_code=400)
+    if token is not None and token not in uploads:
+        return JSONResponse({"code": 2003, "message": "invalid file_token"}, status_code=400)
+
+    task_id = str(uuid.uuid4())
+    now = time.time()
+    queue_time = sample(config["queue_time"])
+    tasks[task_id] = {
+        "type": task_type,
+        "created": now,
+        "start": now + queue_time,
+        "end": now + queue_time + max(1.0, sample(config[duration_key])),
+        "fails": rng.random() < config["task_failure_rate"],
+    }
+    stats["tasks_created"] += 1
+    return {"code": 0, "data": {"task_id": task_id}}
+
+
+@app.get("/v2/openapi/task/{task_id}")
+async def get_task(task_id: str, request: Request):
+    failure = await inject("tripo", "api_latency")
+    if failure:
+        return failure
+    task = tasks.get(task_id)
+    if task is None:
+        return JSONResponse({"code": 2001, "message": "task not found"}, status_code=404)
+
+    now = time.time()
+    data = {"task_id": task_id, "type": task["type"], "create_time": int(task["created"]),
+            "input": {}, "output": {}, "result": {}}
+    if now < task["start"]:
+        data.update(status="queued", progress=0)
+    elif now < task["end"]:
+        progress = int((now - task["start"]) / (task["end"] - task["start"]) * 100)
+        data.update(status="running", progress=min(99, progress))
+    elif task["fails"]:
+        if not task.get("counted"):
+            task["counted"] = True
+            stats["tasks_failed"] += 1
+        data.update(status="failed", progress=100)
+    else:
+        base = str(request.base_url).rstrip("/")
+        model_url = f"{base}/files/{task_id}/model.glb"
+        rendered_url = f"{base}/files/{task_id}/rendered.png"
+        model_key = "pbr_model" if task["type"] == "image_to_model" else "model"
+        data.update(status="success", progress=100)
+        data["output"] = {model_key: model_url, "rendered_image": rendered_url}
+        data["result"] = {model_key: {"type": "glb", "url": model_url},
+                          "rendered_image": {"type": "png", "url": rendered_url}}
+    return {"code": 0, "data": data}
+
+
+@app.get("/files/{task_id}/{name}")
+async def download(task_id: str, name: str):
+    if task_id not in tasks or name not in ("model.glb", "rendered.png"):
+        return Response(status_code=404)
+    data, media_type = sample_file("glb" if name == "model.glb" else "rendered")
+    kbps = float(config["download_kbps"])
+    stats["bytes_served"] += len(data)
+    if kbps <= 0:
+        return Response(data, media_type=media_type)
+
+    async def throttled(chunk_size=16 * 1024):
+        for offset in range(0, len(data), chunk_size):
+            chunk = data[offset:offset + chunk_size]
+            await asyncio.sleep(len(chunk) / 1024 / kbps)
+            yield chunk
+
+    return StreamingResponse(throttled(), media_type=media_type, headers={"Content-Length": str(len(data))})
+
+
+# --------------------------------------------------------
+# 👁️ OpenAI
+# --------------------------------------------------------
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    failure = await inject("openai", "openai_latency")
+    if failure:
+        return failure
+    payload = await request.json()
+    design = config["vision_design"] or rng.choice(DESIGNS)
+    names = [name.strip() for name in config["vision_names"].split(",") if name.strip()] or ["Unknown"]
+    content = json.dumps({"design": design, "child_name": rng.choice(names)}, ensure_ascii=False)
+    return {
+        "id": f"chatcmpl-sim-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "gpt-4o-mini"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 500, "completion_tokens": 20, "total_tokens": 520},
+    }
+
+
+# --------------------------------------------------------
+# 🛠️ 시뮬레이터 제어
+# --------------------------------------------------------
+@app.get("/_sim/stats")
+async def sim_stats():
+    now = time.time()
+    states = {"queued": 0, "running": 0, "finished": 0}
+    for task in tasks.values():
+        states["queued" if now < task["start"] else "running" if now < task["end"] else "finished"] += 1
+    return {**stats, "tasks": states, "uploads": len(uploads), "config": config}
+
+
+@app.post("/_sim/config")
+async def sim_config(request: Request):
+    """설정 일부 변경 (예: {"rate_limit": 1, "generation_time": "fixed:5"}), 잘못된 키는 400"""
+    global rng
+    updates = await request.json()
+    unknown = [key for key in updates if key not in DEFAULT_CONFIG]
+    if unknown:
+        return JSONResponse({"error": f"알 수 없는 설정: {unknown}"}, status_code=400)
+    for key, value in updates.items():
+        config[key] = type(DEFAULT_CONFIG[key])(value)
+    if "seed" in updates:
+        rng = random.Random(config["seed"] or None)
+    print(f"[Simulator] ⚙️ 설정 변경: {updates}")
+    return config
+
+
+@app.post("/_sim/reset")
+async def sim_reset():
+    """task/업로드/통계 초기화"""
+    tasks.clear()
+    uploads.clear()
+    buckets.clear()
+    stats.update(requests={}, rate_limited=0, errors=0, tasks_created=0, tasks_failed=0, bytes_served=0)
+    return {"status": "reset"}
+
+
+if __name__ == "__main__":
+    import uvicorn
+    print(f"[Simulator] 🚀 http://{SIM_HOST}:{SIM_PORT}")
+    print(f"[Simulator]    TRIPO_API_BASE=http://localhost:{SIM_PORT}/v2/openapi")
+    print(f"[Simulator]    OPENAI_BASE_URL=http://localhost:{SIM_PORT}/v1")
+    uvicorn.run(app, host=SIM_HOST, port=SIM_PORT)
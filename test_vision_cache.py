@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Vision 캐시 근접 일치 테스트
+- 같은 시트를 다시 찍으면 (흔들림/밝기/흐림/JPEG) 캐시 히트
+- 이름이 다른 아이의 시트는 헤더가 비슷해도 캐시 미스 (다른 아이 이름을 돌려주지 않음)
+
+data/TEST.png 그림으로 도안 시트를 합성해서 사용 (python test_vision_cache.py 또는 pytest)
+"""
+
+import io
+import os
+import tempfile
+
+from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
+
+from Utils.image_hash import phash, color_signature
+from backend.vision_cache import VisionCache
+
+DRAWING_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data/TEST.png")
+HEADER_HEIGHT = 280
+
+
+def make_sheet(child_name: str, hue_shift: int = 0) -> Image.Image:
+    """도안 제목(인쇄) + 아이 이름(손글씨 자리) 헤더와 색칠한 그림으로 시트 합성"""
+    page = Image.new("RGB", (1200, 1600), (245, 245, 240))
+    draw = ImageDraw.Draw(page)
+    draw.text((60, 50), "SPACESHIP", fill=(20, 20, 20), font=ImageFont.load_default(size=64))
+    draw.text((60, 150), "Name:", fill=(20, 20, 20), font=ImageFont.load_default(size=48))
+    draw.text((260, 150), child_name, fill=(40, 40, 160), font=ImageFont.load_default(size=48))
+
+    drawing = Image.open(DRAWING_PATH).convert("RGB")
+    if hue_shift:
+        # 같은 도안을 다른 색으로 칠한 그림
+        h, s, v = drawing.convert("HSV").split()
+        drawing = Image.merge("HSV", (h.point(lambda x: (x + hue_shift) % 256), s, v)).convert("RGB")
+    page.paste(drawing.resize((1080, 920)), (60, 400))
+    return page
+
+
+def reshoot(sheet: Image.Image) -> Image.Image:
+    """재촬영 흉내: 약간 기울이고 밀고, 어둡고 흐리게, JPEG 재압축"""
+    shot = sheet.rotate(1.2, resample=Image.Resampling.BICUBIC, fillcolor=(245, 245, 240), translate=(8, -6))
+    shot = ImageEnhance.Brightness(shot).enhance(0.9).filter(ImageFilter.GaussianBlur(1.5))
+    output = io.BytesIO()
+    shot.save(output, format="JPEG", quality=80)
+    return Image.open(io.BytesIO(output.getvalue())).convert("RGB")
+
+
+def signature(sheet: Image.Image) -> tuple:
+    """prepare_capture_images와 같은 (헤더 pHash, 그림 pHash, 색 시그니처)"""
+    header = sheet.crop((0, 0, sheet.width, HEADER_HEIGHT))
+    drawing = sheet.crop((0, HEADER_HEIGHT, sheet.width, sheet.height))
+    drawing.thumbnail((256, 256))
+    return phash(header), phash(drawing), color_signature(drawing)
+
+
+def open_cache(directory: str) -> VisionCache:
+    cache = VisionCache(path=os.path.join(directory, "vision_cache.sqlite3"))
+    cache.open()
+    return cache
+
+
+def test_reshoot_of_same_name_hits():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = open_cache(directory)
+        result = {"design": "Spaceship", "child_name": "Minjun"}
+        cache.put("first", result, *signature(make_sheet("Minjun")))
+
+        assert cache.get("second", *signature(reshoot(make_sheet("Minjun")))) == result
+        assert cache.stats()["near_hits"] == 1
+        cache.close()
+
+
+def test_different_name_misses():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = open_cache(directory)
+        cache.put("first", {"design": "Spaceship", "child_name": "Minjun"}, *signature(make_sheet("Minjun")))
+
+        assert cache.get("other", *signature(make_sheet("Seoyeon", hue_shift=60))) is None
+        assert cache.get("other-shot", *signature(reshoot(make_sheet("Seoyeon", hue_shift=40)))) is None
+        assert cache.stats()["misses"] == 2
+        cache.close()
+
+
+def test_near_match_survives_restart():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = open_cache(directory)
+        result = {"design": "Spaceship", "child_name": "Minjun"}
+        cache.put("first", result, *signature(make_sheet("Minjun")))
+        cache.close()
+
+        cache = open_cache(directory)
+        assert cache.get("first") == result
+        assert cache.get("second", *signature(reshoot(make_sheet("Minjun")))) == result
+        cache.close()
+
+
+if __name__ == "__main__":
+    for test in (test_reshoot_of_same_name_hits, test_different_name_misses, test_near_match_survives_restart):
+        test()
+        print(f"✅ {test.__name__}")